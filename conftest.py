@@ -0,0 +1,12 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Start each test with an empty cache. Test databases reuse primary keys
+    (e.g. those of fixtures) from one test to another, entries cached by a
+    previous test must not leak into the next one.
+    """
+    cache.clear()
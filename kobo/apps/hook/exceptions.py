@@ -1,2 +1,6 @@
 class HookRemoteServerDownError(Exception):
     pass
+
+
+class HookEndpointBusyError(Exception):
+    pass
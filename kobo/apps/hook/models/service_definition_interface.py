@@ -2,6 +2,7 @@ import json
 import os
 import re
 from abc import ABCMeta, abstractmethod
+from typing import Callable, Optional
 
 import constance
 import requests
@@ -18,25 +19,40 @@ from ..constants import (
     RETRIABLE_STATUS_CODES,
 )
 from ..exceptions import HookRemoteServerDownError
+from ..utils.endpoint import get_session, wait_for_rate_limit
 
 
 class ServiceDefinitionInterface(metaclass=ABCMeta):
 
-    def __init__(self, hook, submission_id):
+    # Whether submissions can be sent as a batch to endpoints which opt in
+    # with `Hook.settings['send_in_batches']`
+    supports_batches = False
+
+    def __init__(self, hook, submission_id, submissions: Optional[dict] = None):
+        """
+        `submissions` are submissions fetched beforehand, by id. If they are
+        not provided, the submission is retrieved from the deployment backend.
+        """
         self._hook = hook
         self._submission_id = submission_id
-        self._data = self._get_data()
+        self._data = self._get_data(submissions)
 
-    def _get_data(self):
+    def _get_data(self, submissions: Optional[dict] = None):
         """
         Retrieves data from deployment backend of the asset.
         """
+        if submissions is not None and self._submission_id not in submissions:
+            return None
+
         try:
-            submission = self._hook.asset.deployment.get_submission(
-                self._submission_id,
-                user=self._hook.asset.owner,
-                format_type=self._hook.export_type,
-            )
+            if submissions is not None:
+                submission = submissions[self._submission_id]
+            else:
+                submission = self._hook.asset.deployment.get_submission(
+                    self._submission_id,
+                    user=self._hook.asset.owner,
+                    format_type=self._hook.export_type,
+                )
             return self._parse_data(submission, self._hook.subset_fields)
         except Exception as e:
             logging.error(
@@ -74,6 +90,21 @@ class ServiceDefinitionInterface(metaclass=ABCMeta):
         """
         pass
 
+    @classmethod
+    def _get_submissions(cls, hook, submission_ids: list) -> Optional[dict]:
+        """
+        Fetch `submission_ids` at once and return them by id, or return `None`
+        to let each submission be retrieved on its own.
+        """
+        return None
+
+    def _prepare_batch_request_kwargs(self, data: list) -> dict:
+        """
+        Prepares params to pass to `Requests.post` to send the data of several
+        submissions at once. Only required if `supports_batches` is `True`.
+        """
+        raise NotImplementedError
+
     def send(self) -> bool:
         """
         Sends data to external endpoint.
@@ -90,15 +121,101 @@ class ServiceDefinitionInterface(metaclass=ABCMeta):
             )
             return False
 
+        return self._post([self], self._prepare_request_kwargs())
+
+    @classmethod
+    def send_many(
+        cls,
+        hook,
+        submission_ids: list,
+        keep_alive: Optional[Callable[[], None]] = None,
+    ) -> list:
+        """
+        Sends `submission_ids` to the external endpoint of `hook`, one request
+        per submission, or all of them in one JSON array if the hook opted in
+        for batches.
+
+        Submissions are fetched at once when the service supports it.
+        `keep_alive` is called before each request, e.g. to keep holding the
+        endpoint slot (see `kobo.apps.hook.utils.endpoint.endpoint_slot()`).
+
+        Return the ids of the submissions which should be retried because the
+        remote server is down. Sending stops at the first of them: the ids of
+        the submissions which have not been sent yet are returned as well.
+        """
+        submissions = cls._get_submissions(hook, submission_ids)
+        service_definitions = [
+            cls(hook, submission_id, submissions)
+            for submission_id in submission_ids
+        ]
+
+        if cls.supports_batches and hook.settings.get('send_in_batches'):
+            deliverable = []
+            for service_definition in service_definitions:
+                if service_definition._data:
+                    deliverable.append(service_definition)
+                else:
+                    # Log the deleted submission
+                    service_definition.send()
+
+            if not deliverable:
+                return []
+
+            request_kwargs = deliverable[0]._prepare_batch_request_kwargs(
+                [service_definition._data for service_definition in deliverable]
+            )
+            if keep_alive:
+                keep_alive()
+            try:
+                cls._post(deliverable, request_kwargs)
+            except HookRemoteServerDownError:
+                return [
+                    service_definition._submission_id
+                    for service_definition in deliverable
+                ]
+            except Exception:
+                # Already logged
+                pass
+            return []
+
+        for idx, service_definition in enumerate(service_definitions):
+            if keep_alive:
+                keep_alive()
+            try:
+                service_definition.send()
+            except HookRemoteServerDownError:
+                # Do not wait for the timeout of each remaining submission
+                return submission_ids[idx:]
+            except Exception:
+                # Already logged, go on with the next submission
+                pass
+
+        return []
+
+    @classmethod
+    def _post(cls, service_definitions: list, request_kwargs: dict) -> bool:
+        """
+        Posts `request_kwargs` to the external endpoint through the pooled
+        session, and saves the response in the log of each of
+        `service_definitions`.
+        """
+        hook = service_definitions[0]._hook
+        submission_ids = ', '.join(
+            str(service_definition._submission_id)
+            for service_definition in service_definitions
+        )
+
+        def save_logs(*args, **kwargs):
+            for service_definition in service_definitions:
+                service_definition.save_log(*args, **kwargs)
+
         # Need to declare response before requests.post assignment in case of
         # RequestException
         response = None
         try:
-            request_kwargs = self._prepare_request_kwargs()
-
             # Add custom headers
             request_kwargs.get('headers').update(
-                self._hook.settings.get('custom_headers', {})
+                hook.settings.get('custom_headers', {})
             )
 
             # Add user agent
@@ -110,19 +227,19 @@ class ServiceDefinitionInterface(metaclass=ABCMeta):
             request_kwargs.get('headers').update(
                 {
                     'User-Agent': 'KoboToolbox external service {}#{}'.format(
-                        public_domain, self._hook.uid
+                        public_domain, hook.uid
                     )
                 }
             )
 
             # If the request needs basic authentication with username and
             # password, let's provide them
-            if self._hook.auth_level == Hook.BASIC_AUTH:
+            if hook.auth_level == Hook.BASIC_AUTH:
                 request_kwargs.update(
                     {
                         'auth': (
-                            self._hook.settings.get('username'),
-                            self._hook.settings.get('password'),
+                            hook.settings.get('username'),
+                            hook.settings.get('password'),
                         )
                     }
                 )
@@ -142,11 +259,14 @@ class ServiceDefinitionInterface(metaclass=ABCMeta):
                     )
                 )
 
-            SSRFProtect.validate(self._hook.endpoint, options=ssrf_protect_options)
+            SSRFProtect.validate(hook.endpoint, options=ssrf_protect_options)
 
-            response = requests.post(self._hook.endpoint, timeout=30, **request_kwargs)
+            wait_for_rate_limit(hook.endpoint)
+            response = get_session().post(
+                hook.endpoint, timeout=30, **request_kwargs
+            )
             response.raise_for_status()
-            self.save_log(response.status_code, response.text, success=True)
+            save_logs(response.status_code, response.text, success=True)
 
             return True
 
@@ -161,32 +281,32 @@ class ServiceDefinitionInterface(metaclass=ABCMeta):
                 status_code = response.status_code
 
             if status_code in RETRIABLE_STATUS_CODES:
-                self.save_log(status_code, text, allow_retries=True)
+                save_logs(status_code, text, allow_retries=True)
                 raise HookRemoteServerDownError
 
-            self.save_log(status_code, text)
+            save_logs(status_code, text)
             raise
         except SSRFProtectException as e:
             logging.error(
                 'service_json.ServiceDefinition.send: '
-                f'Hook #{self._hook.uid} - '
-                f'Data #{self._submission_id} - '
+                f'Hook #{hook.uid} - '
+                f'Data #{submission_ids} - '
                 f'{str(e)}',
                 exc_info=True,
             )
-            self.save_log(
-                KOBO_INTERNAL_ERROR_STATUS_CODE, f'{self._hook.endpoint} is not allowed'
+            save_logs(
+                KOBO_INTERNAL_ERROR_STATUS_CODE, f'{hook.endpoint} is not allowed'
             )
             raise
         except Exception as e:
             logging.error(
                 'service_json.ServiceDefinition.send: '
-                f'Hook #{self._hook.uid} - '
-                f'Data #{self._submission_id} - '
+                f'Hook #{hook.uid} - '
+                f'Data #{submission_ids} - '
                 f'{str(e)}',
                 exc_info=True,
             )
-            self.save_log(
+            save_logs(
                 KOBO_INTERNAL_ERROR_STATUS_CODE,
                 'An error occurred when sending '
                 f'data to external endpoint: {str(e)}',
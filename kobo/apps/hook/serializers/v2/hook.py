@@ -72,4 +72,14 @@ class HookSerializer(serializers.ModelSerializer):
         except KeyError:
             pass
 
+        settings = attrs.get('settings') or {}
+        export_type = attrs.get(
+            'export_type', getattr(self.instance, 'export_type', Hook.JSON)
+        )
+        # Batches are sent as JSON arrays
+        if settings.get('send_in_batches') and export_type != Hook.JSON:
+            raise serializers.ValidationError({
+                'settings': t('Batches can be sent only with JSON submission format')
+            })
+
         return super().validate(attrs)
@@ -1,13 +1,33 @@
 # coding: utf-8
 import json
 import re
+from functools import lru_cache
 
 from ..constants import SUBMISSION_PLACEHOLDER
 from ..models.service_definition_interface import ServiceDefinitionInterface
 
 
+@lru_cache(maxsize=1024)
+def get_subset_fields_matcher(fields: tuple) -> re.Pattern:
+    """
+    Compile `fields` into one regular expression which matches the keys of a
+    submission to keep.
+
+    A field with a full group hierarchy (e.g. `group/question`) matches that
+    exact path only, otherwise it matches a question or a group of that name
+    at any level.
+    Hooks sharing the same `subset_fields` share the same compiled pattern.
+    """
+    patterns = [
+        f'^{field_}$' if '/' in field_ else f'(?:^|/){field_}(?:/|$)'
+        for field_ in fields
+    ]
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
 class ServiceDefinition(ServiceDefinitionInterface):
     id = 'json'
+    supports_batches = True
 
     def __add_payload_template(self, submission):
         if not self._hook.payload_template:
@@ -21,21 +41,31 @@ class ServiceDefinition(ServiceDefinitionInterface):
     def _parse_data(self, submission, fields):
 
         if len(fields) > 0:
-            parsed_submission = {}
-            submission_keys = submission.keys()
-
-            for field_ in fields:
-                pattern = r'^{}$' if '/' in field_ else r'(^|/){}(/|$)'
-                for key_ in submission_keys:
-                    if re.search(pattern.format(field_), key_):
-                        parsed_submission.update({
-                            key_: submission[key_]
-                        })
-
+            matcher = get_subset_fields_matcher(tuple(fields))
+            parsed_submission = {
+                key_: value
+                for key_, value in submission.items()
+                if matcher.search(key_)
+            }
             return self.__add_payload_template(parsed_submission)
 
         return self.__add_payload_template(submission)
 
+    @classmethod
+    def _get_submissions(cls, hook, submission_ids):
+        submissions = hook.asset.deployment.get_submissions(
+            user=hook.asset.owner,
+            format_type=hook.export_type,
+            submission_ids=submission_ids,
+        )
+        return {submission['_id']: submission for submission in submissions}
+
+    def _prepare_batch_request_kwargs(self, data):
+        return {
+            'headers': {'Content-Type': 'application/json'},
+            'json': data
+        }
+
     def _prepare_request_kwargs(self):
         return {
             'headers': {'Content-Type': 'application/json'},
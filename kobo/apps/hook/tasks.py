@@ -1,5 +1,6 @@
 # coding: utf-8
-import time
+import random
+from collections import defaultdict
 
 from celery import shared_task
 from django.conf import settings
@@ -11,8 +12,9 @@ from django_celery_beat.models import PeriodicTask
 from kobo.celery import celery_app
 from kpi.utils.log import logging
 from .constants import HOOK_LOG_FAILED
-from .exceptions import HookRemoteServerDownError
+from .exceptions import HookEndpointBusyError, HookRemoteServerDownError
 from .models import Hook, HookLog
+from .utils.endpoint import endpoint_slot
 from .utils.lazy import LazyMaxRetriesInt
 
 
@@ -37,12 +39,88 @@ def service_definition_task(hook_id: int, submission_id: int) -> bool:
     return service_definition.send()
 
 
+@celery_app.task(
+    bind=True,
+    max_retries=LazyMaxRetriesInt(),
+    queue='kpi_low_priority_queue',
+)
+def deliver_submissions_task(self, hook_id: int, submission_ids: list[int]):
+    """
+    Sends `submission_ids` to the endpoint of the hook.
+
+    Only `settings.HOOK_ENDPOINT_MAX_CONCURRENCY` tasks can send data to the
+    same remote server at a time, others are postponed. Submissions the
+    remote server could not receive are retried with an exponential backoff,
+    up to `constance.config.HOOK_MAX_RETRIES` times or until their logs fail.
+    """
+    try:
+        hook = Hook.objects.select_related('asset').get(id=hook_id)
+    except Hook.DoesNotExist:
+        return
+
+    # Use camelcase (even if it's not PEP-8 compliant)
+    # because variable represents the class, not the instance.
+    ServiceDefinition = hook.get_service_definition()  # noqa
+    try:
+        with endpoint_slot(hook.endpoint) as keep_alive:
+            retry_ids = ServiceDefinition.send_many(
+                hook, submission_ids, keep_alive
+            )
+    except HookEndpointBusyError:
+        # Do not count as a retry, nothing has been sent
+        deliver_submissions_task.apply_async(
+            args=(hook_id, submission_ids),
+            countdown=random.uniform(1, 5),
+        )
+        return
+
+    if retry_ids:
+        # Logs which reached `constance.config.HOOK_MAX_RETRIES` tries have
+        # failed, their submissions must not be sent again. Submissions which
+        # have not been sent yet have no logs and are kept.
+        failed_ids = set(
+            HookLog.objects.filter(
+                hook=hook, submission_id__in=retry_ids, status=HOOK_LOG_FAILED
+            ).values_list('submission_id', flat=True)
+        )
+        retry_ids = [
+            submission_id
+            for submission_id in retry_ids
+            if submission_id not in failed_ids
+        ]
+
+    if retry_ids and self.request.retries < self.max_retries:
+        # Same backoff as `service_definition_task`
+        countdown = min(60 * 2 ** self.request.retries, 1200)
+        raise self.retry(
+            args=(hook_id, retry_ids), countdown=random.uniform(0, countdown)
+        )
+
+
 @shared_task
-def retry_all_task(hooklogs_ids: int):
-    hook_logs = HookLog.objects.filter(id__in=hooklogs_ids)
-    for hook_log in hook_logs:
-        hook_log.retry()
-        time.sleep(0.2)
+def retry_all_task(hooklogs_ids: list[int]):
+    """
+    Resends the submissions of `hooklogs_ids`, hook by hook, like
+    `HookLog.retry()` does for one log.
+
+    Each hook receives them by batches of `settings.HOOK_DELIVERY_BATCH_SIZE`,
+    within `deliver_submissions_task()`, which also takes care of remote
+    servers which are busy or down.
+    """
+    submission_ids_by_hook_id = defaultdict(list)
+    for hook_id, submission_id in (
+        HookLog.objects.filter(id__in=hooklogs_ids)
+        .order_by('hook_id', 'submission_id')
+        .values_list('hook_id', 'submission_id')
+    ):
+        submission_ids_by_hook_id[hook_id].append(submission_id)
+
+    batch_size = settings.HOOK_DELIVERY_BATCH_SIZE
+    for hook_id, submission_ids in submission_ids_by_hook_id.items():
+        for idx in range(0, len(submission_ids), batch_size):
+            deliver_submissions_task.delay(
+                hook_id, submission_ids[idx:idx + batch_size]
+            )
 
     return True
 
@@ -1,10 +1,28 @@
+import json
+import time
+import uuid
 from ipaddress import ip_address
 from unittest.mock import MagicMock, patch
 
+import constance
+import pytest
 import responses
+from django.test import SimpleTestCase, override_settings
+from django_redis import get_redis_connection
 from rest_framework import status
 
-from ..utils.services import call_services
+from ..constants import HOOK_LOG_FAILED, HOOK_LOG_SUCCESS
+from ..exceptions import HookEndpointBusyError
+from ..models import Hook, HookLog
+from ..services.service_json import get_subset_fields_matcher
+from ..tasks import deliver_submissions_task, retry_all_task
+from ..utils.endpoint import (
+    ENDPOINT_CACHE_PREFIX,
+    SLOT_TIMEOUT,
+    endpoint_slot,
+    wait_for_rate_limit,
+)
+from ..utils.services import call_services, call_services_in_bulk
 from .hook_test_case import HookTestCase
 
 
@@ -52,3 +70,301 @@ class HookUtilsTestCase(HookTestCase):
         # But if we try again, it should return False (we cannot send the same
         # submission twice to the same external endpoint).
         assert call_services(self.asset.uid, submission_id) is False
+
+    @patch(
+        'ssrf_protect.ssrf_protect.SSRFProtect._get_ip_address',
+        new=MagicMock(return_value=ip_address('1.2.3.4')),
+    )
+    @responses.activate
+    def test_data_submission_in_batches(self):
+        self._add_submissions()
+        self._add_submissions()
+        hook = Hook.objects.create(
+            asset=self.asset,
+            name='dummy batch service',
+            endpoint='http://batch.service.local/',
+            settings={'send_in_batches': True},
+        )
+        responses.add(
+            responses.POST,
+            hook.endpoint,
+            status=status.HTTP_200_OK,
+            content_type='application/json',
+        )
+
+        submission_ids = [
+            submission['_id']
+            for submission in self.asset.deployment.get_submissions(
+                self.asset.owner
+            )
+        ]
+        assert len(submission_ids) == 2
+        assert call_services_in_bulk(self.asset.uid, submission_ids) == 2
+
+        # Both submissions are sent within the same request
+        assert len(responses.calls) == 1
+        payload = json.loads(responses.calls[0].request.body)
+        assert sorted(submission['_id'] for submission in payload) == sorted(
+            submission_ids
+        )
+        assert hook.logs.filter(status=HOOK_LOG_SUCCESS).count() == 2
+
+        # Submissions are not sent twice
+        assert call_services_in_bulk(self.asset.uid, submission_ids) == 0
+
+    @patch(
+        'ssrf_protect.ssrf_protect.SSRFProtect._get_ip_address',
+        new=MagicMock(return_value=ip_address('1.2.3.4')),
+    )
+    @responses.activate
+    def test_delivery_stops_when_log_fails(self):
+        self._add_submissions()
+        hook = Hook.objects.create(
+            asset=self.asset,
+            name='dummy service down',
+            endpoint='http://down.service.local/',
+        )
+        responses.add(
+            responses.POST,
+            hook.endpoint,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        submission_id = self.asset.deployment.get_submissions(
+            self.asset.owner
+        )[0]['_id']
+
+        # Retries run synchronously in tests
+        deliver_submissions_task.delay(hook.pk, [submission_id])
+
+        hook_log = hook.logs.get(submission_id=submission_id)
+        assert hook_log.status == HOOK_LOG_FAILED
+        assert len(responses.calls) == constance.config.HOOK_MAX_RETRIES + 1
+
+    @patch(
+        'ssrf_protect.ssrf_protect.SSRFProtect._get_ip_address',
+        new=MagicMock(return_value=ip_address('1.2.3.4')),
+    )
+    @responses.activate
+    def test_delivery_stops_when_server_is_down(self):
+        self._add_submissions()
+        self._add_submissions()
+        hook = Hook.objects.create(
+            asset=self.asset,
+            name='dummy service down',
+            endpoint='http://down.service.local/',
+        )
+        responses.add(
+            responses.POST,
+            hook.endpoint,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        submission_ids = [
+            submission['_id']
+            for submission in self.asset.deployment.get_submissions(
+                self.asset.owner
+            )
+        ]
+        keep_alive = MagicMock()
+
+        ServiceDefinition = hook.get_service_definition()  # noqa
+        retry_ids = ServiceDefinition.send_many(hook, submission_ids, keep_alive)
+
+        # The second submission is not sent to the same dead server
+        assert retry_ids == submission_ids
+        assert len(responses.calls) == 1
+        keep_alive.assert_called_once()
+        assert hook.logs.count() == 1
+
+    def _create_failed_logs(self, hook: Hook, submission_ids: list[int]) -> list:
+        return [
+            HookLog.objects.create(
+                hook=hook, submission_id=submission_id, status=HOOK_LOG_FAILED
+            ).pk
+            for submission_id in submission_ids
+        ]
+
+    @patch(
+        'ssrf_protect.ssrf_protect.SSRFProtect._get_ip_address',
+        new=MagicMock(return_value=ip_address('1.2.3.4')),
+    )
+    @responses.activate
+    def test_retry_all_by_hook(self):
+        self._add_submissions()
+        self._add_submissions()
+        batch_hook = Hook.objects.create(
+            asset=self.asset,
+            name='dummy batch service',
+            endpoint='http://batch.service.local/',
+            settings={'send_in_batches': True},
+        )
+        hook = Hook.objects.create(
+            asset=self.asset,
+            name='dummy service',
+            endpoint='http://single.service.local/',
+        )
+        for endpoint in [batch_hook.endpoint, hook.endpoint]:
+            responses.add(
+                responses.POST,
+                endpoint,
+                status=status.HTTP_200_OK,
+                content_type='application/json',
+            )
+        submission_ids = [
+            submission['_id']
+            for submission in self.asset.deployment.get_submissions(
+                self.asset.owner
+            )
+        ]
+        hooklog_ids = self._create_failed_logs(
+            batch_hook, submission_ids
+        ) + self._create_failed_logs(hook, submission_ids)
+
+        retry_all_task(hooklog_ids)
+
+        # Logs of the batch hook are retried within the same request
+        requested_urls = [call.request.url for call in responses.calls]
+        assert requested_urls.count(batch_hook.endpoint) == 1
+        assert requested_urls.count(hook.endpoint) == 2
+        assert not HookLog.objects.filter(pk__in=hooklog_ids).exclude(
+            status=HOOK_LOG_SUCCESS
+        ).exists()
+
+    @override_settings(HOOK_DELIVERY_BATCH_SIZE=2)
+    def test_retry_all_queues_deliveries_in_batches(self):
+        self._add_submissions()
+        self._add_submissions()
+        self._add_submissions()
+        hook = Hook.objects.create(
+            asset=self.asset,
+            name='dummy service',
+            endpoint='http://single.service.local/',
+        )
+        submission_ids = sorted(
+            submission['_id']
+            for submission in self.asset.deployment.get_submissions(
+                self.asset.owner
+            )
+        )
+        hooklog_ids = self._create_failed_logs(hook, submission_ids)
+
+        with patch.object(deliver_submissions_task, 'delay') as delay:
+            retry_all_task(hooklog_ids)
+
+        assert [call.args for call in delay.call_args_list] == [
+            (hook.pk, submission_ids[:2]),
+            (hook.pk, submission_ids[2:]),
+        ]
+
+    @override_settings(HOOK_ENDPOINT_MAX_CONCURRENCY=1)
+    @responses.activate
+    def test_delivery_is_postponed_when_endpoint_is_busy(self):
+        self._add_submissions()
+        # Redis is not flushed between runs, use a new host each time
+        hook = Hook.objects.create(
+            asset=self.asset,
+            name='dummy busy service',
+            endpoint=f'http://{uuid.uuid4().hex}.service.local/',
+        )
+        submission_id = self.asset.deployment.get_submissions(
+            self.asset.owner
+        )[0]['_id']
+        hooklog_ids = self._create_failed_logs(hook, [submission_id])
+
+        with patch.object(
+            deliver_submissions_task, 'apply_async'
+        ) as apply_async:
+            with endpoint_slot(hook.endpoint):
+                deliver_submissions_task(hook.pk, [submission_id])
+
+        assert len(responses.calls) == 0
+        apply_async.assert_called_once()
+        assert apply_async.call_args.kwargs['args'] == (hook.pk, [submission_id])
+        assert HookLog.objects.get(pk=hooklog_ids[0]).status == HOOK_LOG_FAILED
+
+
+class SubsetFieldsMatcherTestCase(SimpleTestCase):
+
+    def test_get_subset_fields_matcher(self):
+        matcher = get_subset_fields_matcher(('group_1/question_1', 'question_2'))
+
+        # Fields with a group hierarchy match that exact path only
+        assert matcher.search('group_1/question_1')
+        assert not matcher.search('group_2/group_1/question_1')
+        assert not matcher.search('group_1/question_10')
+
+        # Bare names match a question or a group at any level
+        assert matcher.search('question_2')
+        assert matcher.search('group_2/question_2')
+        assert matcher.search('question_2/question_3')
+        assert not matcher.search('question_20')
+        assert not matcher.search('group_2/my_question_2')
+
+        # Hooks with the same fields share the compiled pattern
+        assert matcher is get_subset_fields_matcher(
+            ('group_1/question_1', 'question_2')
+        )
+
+
+class EndpointLimitsTestCase(SimpleTestCase):
+
+    def setUp(self):
+        # Redis is not flushed between runs, use a new host each time
+        self.endpoint = f'https://{uuid.uuid4().hex}.service.local/'
+
+    @override_settings(HOOK_ENDPOINT_MAX_CONCURRENCY=1)
+    def test_endpoint_slot(self):
+        with endpoint_slot(self.endpoint):
+            with pytest.raises(HookEndpointBusyError):
+                with endpoint_slot(self.endpoint):
+                    pass
+
+        # Slot has been released
+        with endpoint_slot(self.endpoint):
+            pass
+
+    @override_settings(HOOK_ENDPOINT_MAX_CONCURRENCY=1)
+    def test_expired_endpoint_slot_is_released(self):
+        # A worker died while holding the only slot
+        host = self.endpoint.split('/')[2]
+        get_redis_connection('default').zadd(
+            f'{ENDPOINT_CACHE_PREFIX}:{host}:slots',
+            {'dead-worker': time.time() - 1},
+        )
+        with endpoint_slot(self.endpoint):
+            pass
+
+    @override_settings(HOOK_ENDPOINT_MAX_CONCURRENCY=1)
+    def test_endpoint_slot_keep_alive(self):
+        host = self.endpoint.split('/')[2]
+        key = f'{ENDPOINT_CACHE_PREFIX}:{host}:slots'
+        redis_client = get_redis_connection('default')
+
+        with endpoint_slot(self.endpoint) as keep_alive:
+            ((_, expires_at),) = redis_client.zrange(key, 0, -1, withscores=True)
+            with patch('kobo.apps.hook.utils.endpoint.time') as mock_time:
+                mock_time.time.return_value = expires_at - 1
+                keep_alive()
+
+                # The slot has been extended and is still held once its
+                # initial expiration time has passed
+                mock_time.time.return_value = expires_at + 1
+                with pytest.raises(HookEndpointBusyError):
+                    with endpoint_slot(self.endpoint):
+                        pass
+
+            assert redis_client.zscore(
+                key, redis_client.zrange(key, 0, -1)[0]
+            ) == pytest.approx(expires_at - 1 + SLOT_TIMEOUT)
+
+    @override_settings(HOOK_ENDPOINT_MAX_REQUESTS_PER_SECOND=2)
+    def test_wait_for_rate_limit(self):
+        with patch(
+            'kobo.apps.hook.utils.endpoint.time'
+        ) as mock_time:
+            mock_time.time.side_effect = [1000.2, 1000.4, 1000.6, 1001.1]
+            for _ in range(3):
+                wait_for_rate_limit(self.endpoint)
+
+        # Third request had to wait for the next second
+        mock_time.sleep.assert_called_once()
+        assert mock_time.sleep.call_args.args[0] == pytest.approx(0.4)
@@ -0,0 +1,114 @@
+import math
+import time
+from contextlib import contextmanager
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlparse
+from uuid import uuid4
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from requests.adapters import HTTPAdapter
+
+from ..exceptions import HookEndpointBusyError
+
+ENDPOINT_CACHE_PREFIX = 'hook_endpoint'
+# Number of remote servers whose connections are kept alive per process
+POOL_CONNECTIONS = 50
+# Slots of workers which died while sending data are released after that delay
+SLOT_TIMEOUT = 60 * 10
+
+_session = None
+
+
+def get_session() -> requests.Session:
+    """
+    Return the HTTP session shared by all deliveries of the current process.
+    Connections to remote servers are pooled and kept alive between requests.
+    """
+    global _session
+
+    if _session is None:
+        session = requests.Session()
+        # Hooks of different users can target the same server, never store
+        # cookies it sends back
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session = session
+
+    return _session
+
+
+@contextmanager
+def endpoint_slot(endpoint: str):
+    """
+    Hold one of the `HOOK_ENDPOINT_MAX_CONCURRENCY` slots of the remote server
+    of `endpoint` while sending data to it.
+
+    Yield a function which extends the slot by `SLOT_TIMEOUT`. It must be
+    called before each request, otherwise long deliveries would lose their
+    slot to other workers.
+
+    Raise `HookEndpointBusyError` if all slots are taken.
+    """
+    if not (limit := settings.HOOK_ENDPOINT_MAX_CONCURRENCY):
+        yield lambda: None
+        return
+
+    # Holders are stored in a sorted set, scored by the time their slot
+    # expires, to release slots of workers which died without doing it.
+    redis_client = get_redis_connection('default')
+    key = f'{ENDPOINT_CACHE_PREFIX}:{_get_host(endpoint)}:slots'
+    holder = uuid4().hex
+    now = time.time()
+    with redis_client.pipeline() as pipe:
+        pipe.zremrangebyscore(key, '-inf', now)
+        pipe.zadd(key, {holder: now + SLOT_TIMEOUT})
+        pipe.zcard(key)
+        pipe.expire(key, SLOT_TIMEOUT)
+        _, _, slots, _ = pipe.execute()
+
+    def keep_alive():
+        with redis_client.pipeline() as pipe:
+            pipe.zadd(key, {holder: time.time() + SLOT_TIMEOUT}, xx=True)
+            pipe.expire(key, SLOT_TIMEOUT)
+            pipe.execute()
+
+    try:
+        if slots > limit:
+            raise HookEndpointBusyError
+        yield keep_alive
+    finally:
+        redis_client.zrem(key, holder)
+
+
+def wait_for_rate_limit(endpoint: str):
+    """
+    Block until a request can be sent to the remote server of `endpoint`
+    without exceeding `HOOK_ENDPOINT_MAX_REQUESTS_PER_SECOND`.
+    """
+    if not (limit := settings.HOOK_ENDPOINT_MAX_REQUESTS_PER_SECOND):
+        return
+
+    host = _get_host(endpoint)
+    while True:
+        now = time.time()
+        key = f'{ENDPOINT_CACHE_PREFIX}:{host}:requests:{int(now)}'
+        cache.add(key, 0, 2)
+        try:
+            requests_count = cache.incr(key)
+        except ValueError:
+            return
+
+        if requests_count <= limit:
+            return
+
+        # Wait for the next window
+        time.sleep(math.floor(now) + 1 - now)
+
+
+def _get_host(endpoint: str) -> str:
+    return urlparse(endpoint).netloc.lower()
@@ -1,27 +1,60 @@
+from django.conf import settings
+
 from ..models.hook import Hook
 from ..models.hook_log import HookLog
-from ..tasks import service_definition_task
+from ..tasks import deliver_submissions_task
 
 
 def call_services(asset_uid: str, submission_id: int) -> bool:
     """
     Delegates to Celery data submission to remote servers
     """
+    # At least, one of the hooks must not have a log that corresponds to
+    # `submission_id`
+    # to make success equal True
+    return call_services_in_bulk(asset_uid, [submission_id]) > 0
+
+
+def call_services_in_bulk(asset_uid: str, submission_ids: list[int]) -> int:
+    """
+    Delegates to Celery data submission of `submission_ids` to remote servers.
+
+    Deliveries are grouped by hook: each task sends up to
+    `settings.HOOK_DELIVERY_BATCH_SIZE` submissions to the same endpoint.
+    Submissions which already have a log for a hook are not sent again.
+
+    Return the number of deliveries
+    """
+    if not submission_ids:
+        return 0
+
     # Retrieve `Hook` ids, to send data to their respective endpoint.
-    hooks_ids = (
+    hooks_ids = list(
         Hook.objects.filter(asset__uid=asset_uid, active=True)
         .values_list('id', flat=True)
         .distinct()
     )
-    # At least, one of the hooks must not have a log that corresponds to
-    # `submission_id`
-    # to make success equal True
-    success = False
+    if not hooks_ids:
+        return 0
+
+    logged = set(
+        HookLog.objects.filter(
+            hook_id__in=hooks_ids, submission_id__in=submission_ids
+        ).values_list('hook_id', 'submission_id')
+    )
 
+    deliveries = 0
+    batch_size = settings.HOOK_DELIVERY_BATCH_SIZE
     for hook_id in hooks_ids:
-        if not HookLog.objects.filter(
-            submission_id=submission_id, hook_id=hook_id
-        ).exists():
-            success = True
-            service_definition_task.delay(hook_id, submission_id)
-    return success
+        pending_ids = [
+            submission_id
+            for submission_id in submission_ids
+            if (hook_id, submission_id) not in logged
+        ]
+        for idx in range(0, len(pending_ids), batch_size):
+            deliver_submissions_task.delay(
+                hook_id, pending_ids[idx:idx + batch_size]
+            )
+        deliveries += len(pending_ids)
+
+    return deliveries
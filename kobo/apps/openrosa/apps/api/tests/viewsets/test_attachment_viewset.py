@@ -58,7 +58,9 @@ class TestAttachmentViewSet(TestAbstractViewSet):
             'xform': self.xform.pk,
             'instance': self.attachment.instance.pk,
             'mimetype': self.attachment.mimetype,
-            'filename': self.attachment.media_file.name
+            'filename': self.attachment.media_file.name,
+            # Thumbnails have not been generated yet, their status is unknown
+            'thumbnail_status': None,
         }
         request = self.factory.get('/', **auth_headers)
         response = self.retrieve_view(request, pk=pk)
@@ -351,7 +353,8 @@ class TestAttachmentViewSet(TestAbstractViewSet):
             'xform': self.xform.pk,
             'instance': instance.pk,
             'mimetype': attachment.mimetype,
-            'filename': attachment.media_file.name
+            'filename': attachment.media_file.name,
+            'thumbnail_status': None,
         }
         request = self.factory.get('/', **self.extra)
         response = self.list_view(request, pk=attachment.pk)
@@ -514,6 +514,27 @@ class TestXFormListApiWithAuthRequired(TestXFormListApiBase):
         self.assertTrue(response.has_header('Date'))
         self.assertEqual(response['Content-Type'], 'text/xml; charset=utf-8')
 
+    def test_retrieve_xform_manifest_not_modified(self):
+        self._load_metadata(self.xform)
+        self.view = XFormListApi.as_view({
+            'get': 'manifest'
+        })
+        request = self.factory.head('/')
+        challenge = self.view(request, pk=self.xform.pk)
+        auth = DigestAuth('bob', 'bobbob')
+        request = self.factory.get('/')
+        request.META.update(auth(request.META, challenge))
+        response = self.view(request, pk=self.xform.pk)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        request = self.factory.get('/', HTTP_IF_NONE_MATCH=etag)
+        request.META.update(auth(request.META, challenge))
+        response = self.view(request, pk=self.xform.pk)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertTrue(response.has_header('X-OpenRosa-Version'))
+
     def test_retrieve_xform_manifest_as_anonymous(self):
         self._load_metadata(self.xform)
         self.view = XFormListApi.as_view({
@@ -571,6 +592,23 @@ class TestXFormListApiWithAuthRequired(TestXFormListApiBase):
                              metadata=self.metadata.pk, format='png')
         self.assertEqual(response.status_code, 200)
 
+    def test_retrieve_xform_media_not_modified(self):
+        self._load_metadata(self.xform)
+        self.view = XFormListApi.as_view({
+            'get': 'media'
+        })
+        request = self.factory.head('/')
+        response = self.view(request, pk=self.xform.pk,
+                             metadata=self.metadata.pk, format='png')
+        auth = DigestAuth('bob', 'bobbob')
+        request = self.factory.get(
+            '/', HTTP_IF_NONE_MATCH=f'"{self.metadata.md5_hash}"'
+        )
+        request.META.update(auth(request.META, response))
+        response = self.view(request, pk=self.xform.pk,
+                             metadata=self.metadata.pk, format='png')
+        self.assertEqual(response.status_code, 304)
+
     def test_retrieve_xform_media_as_anonymous(self):
         self._load_metadata(self.xform)
         self.view = XFormListApi.as_view({
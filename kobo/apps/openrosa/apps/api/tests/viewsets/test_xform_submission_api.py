@@ -2,6 +2,7 @@ import multiprocessing
 import os
 from collections import defaultdict
 from functools import partial
+from unittest.mock import patch
 
 import pytest
 import requests
@@ -280,6 +281,95 @@ class TestXFormSubmissionApi(TestAbstractViewSet):
                 self.assertEqual(response['Location'],
                                  'http://testserver/submission')
 
+    def test_post_bulk_submissions(self):
+        self.xform.require_auth = False
+        self.xform.save(update_fields=['require_auth'])
+        view = XFormSubmissionApi.as_view({'post': 'bulk'})
+        count = self.xform.instances.count()
+        num_of_submissions = self.xform.num_of_submissions
+
+        xml_files = []
+        for s in self.surveys[0:2]:
+            submission_path = os.path.join(
+                self.main_directory,
+                'fixtures',
+                'transportation',
+                'instances',
+                s,
+                s + '.xml',
+            )
+            with open(submission_path, 'rb') as sf:
+                xml_files.append(ContentFile(sf.read(), name=f'{s}.xml'))
+        # Same submission twice
+        xml_files.append(ContentFile(xml_files[0].read(), name='duplicate.xml'))
+        xml_files[0].seek(0)
+
+        request = self.factory.post(
+            f'/{self.user.username}/submission/bulk',
+            {'xml_submission_file': xml_files},
+        )
+        request.user = AnonymousUser()
+        # Mongo is written once the transaction is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            response = view(request, username=self.user.username)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([c['index'] for c in response.data['created']], [0, 1])
+        self.assertEqual(response.data['duplicates'], [2])
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(self.xform.instances.count(), count + 2)
+        self.assertFalse(
+            self.xform.instances.filter(is_synced_with_mongo=False).exists()
+        )
+        self.xform.refresh_from_db()
+        self.assertEqual(self.xform.num_of_submissions, num_of_submissions + 2)
+
+        # Posting them again only reports duplicates
+        for xml_file in xml_files:
+            xml_file.seek(0)
+        request = self.factory.post(
+            f'/{self.user.username}/submission/bulk',
+            {'xml_submission_file': xml_files[0:2]},
+        )
+        request.user = AnonymousUser()
+        response = view(request, username=self.user.username)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], [])
+        self.assertEqual(response.data['duplicates'], [0, 1])
+        self.assertEqual(self.xform.instances.count(), count + 2)
+
+    def test_post_bulk_submissions_rolled_back(self):
+        xml_files = []
+        for s in self.surveys[0:2]:
+            submission_path = os.path.join(
+                self.main_directory,
+                'fixtures',
+                'transportation',
+                'instances',
+                s,
+                s + '.xml',
+            )
+            with open(submission_path, 'rb') as sf:
+                xml_files.append(ContentFile(sf.read(), name=f'{s}.xml'))
+        count = self.xform.instances.count()
+
+        with patch(
+            'kobo.apps.openrosa.apps.viewer.models.parsed_instance'
+            '.xform_instances'
+        ) as mock_xform_instances, patch.object(
+            logger_tools,
+            'update_xform_counters_in_bulk',
+            side_effect=Exception('Counters could not be updated'),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                with pytest.raises(Exception):
+                    logger_tools.bulk_create_instances(
+                        self.user.username, xml_files
+                    )
+
+        # Nothing is written to Mongo when the submissions are rolled back
+        mock_xform_instances.bulk_write.assert_not_called()
+        self.assertEqual(self.xform.instances.count(), count)
+
     def test_post_submission_require_auth_anonymous_user(self):
         count = Attachment.objects.count()
         s = self.surveys[0]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Iterable
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
@@ -24,6 +25,12 @@ from kobo.apps.openrosa.libs.serializers.xform_serializer import (
     XFormManifestSerializer,
 )
 from kpi.authentication import DigestAuthentication
+from kpi.utils.hash import calculate_hash
+from kpi.utils.http import (
+    add_conditional_headers,
+    get_etag,
+    get_not_modified_response,
+)
 from ..utils.rest_framework.viewsets import OpenRosaReadOnlyModelViewSet
 
 
@@ -165,15 +172,28 @@ class XFormListApi(OpenRosaReadOnlyModelViewSet):
         # would be different and EE would display:
         # > "A new version of this form has been downloaded"
         media_files = dict(sorted(media_files.items()))
+        require_auth = not bool(kwargs.get('username'))
+
+        # Most of the time, devices poll a manifest which has not changed since
+        # their last download. Let them know without sending it again.
+        etag = self._get_manifest_etag(media_files.values(), require_auth)
+        headers = self.get_openrosa_headers()
+        if not_modified_response := get_not_modified_response(
+            request, etag, headers=headers
+        ):
+            return not_modified_response
+
         context = self.get_serializer_context()
         serializer = XFormManifestSerializer(
             media_files.values(),
             many=True,
             context=context,
-            require_auth=not bool(kwargs.get('username')),
+            require_auth=require_auth,
         )
 
-        return Response(serializer.data, headers=self.get_openrosa_headers())
+        return add_conditional_headers(
+            Response(serializer.data, headers=headers), etag
+        )
 
     @action(detail=True, methods=['GET'])
     def media(self, request, *args, **kwargs):
@@ -193,7 +213,38 @@ class XFormListApi(OpenRosaReadOnlyModelViewSet):
         if request.method == 'HEAD':
             return self.get_response_for_head_request()
 
-        return get_media_file_response(meta_obj, request)
+        if not meta_obj.data_file:
+            # Remote URLs are redirected, and paired data handles conditional
+            # requests itself
+            return get_media_file_response(meta_obj, request)
+
+        etag = get_etag(meta_obj.md5_hash)
+        if not_modified_response := get_not_modified_response(
+            request, etag, meta_obj.date_modified
+        ):
+            return not_modified_response
+
+        response = get_media_file_response(meta_obj, request)
+        if response.status_code == status.HTTP_200_OK:
+            add_conditional_headers(response, etag, meta_obj.date_modified)
+        return response
+
+    @staticmethod
+    def _get_manifest_etag(
+        media_files: Iterable[MetaData], require_auth: bool
+    ) -> str:
+        """
+        Build the ETag of the manifest from the stored hashes of its files, to
+        avoid serializing the manifest when the client is up to date.
+        """
+        hashable = '|'.join(
+            [str(require_auth)]
+            + [
+                f'{obj.pk}:{obj.filename}:{obj.md5_hash}'
+                for obj in media_files
+            ]
+        )
+        return get_etag(calculate_hash(hashable, prefix=True))
 
     @staticmethod
     def _is_metadata_expired(obj: MetaData, request: Request) -> bool:
@@ -209,7 +260,7 @@ class XFormListApi(OpenRosaReadOnlyModelViewSet):
         timedelta = timezone.now() - obj.date_modified
         if timedelta.total_seconds() > settings.PAIRED_DATA_EXPIRATION:
             # Force external XML regeneration
-            get_media_file_response(obj, request)
+            get_media_file_response(obj, request).close()
 
             # We update the modification time here to avoid requesting that KPI
             # resynchronize this file multiple times per the
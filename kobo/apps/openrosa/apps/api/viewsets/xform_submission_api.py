@@ -1,9 +1,11 @@
 import io
 import re
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext as t
 from rest_framework import mixins, permissions, status
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotAuthenticated
 from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
@@ -18,7 +20,9 @@ from kobo.apps.openrosa.libs.renderers.renderers import TemplateXMLRenderer
 from kobo.apps.openrosa.libs.serializers.data_serializer import SubmissionSerializer
 from kobo.apps.openrosa.libs.utils.logger_tools import (
     UnauthenticatedEditAttempt,
+    bulk_create_instances,
     dict2xform,
+    http_open_rosa_error_handler,
     safe_create_instance,
 )
 from kobo.apps.openrosa.libs.utils.string import dict_lists2strings
@@ -119,6 +123,21 @@ class XFormSubmissionApi(
     >               "instanceID": "uuid:f3d8dc65-91a6-4d0f-9e97-802128083390"
     >           }
     >       }
+
+    ## Submit several XML submissions of the same form at once
+
+    <pre class="prettyprint">
+    <b>POST</b> /api/v1/submissions/bulk</pre>
+    > Example
+    >
+    >       curl -X POST -F xml_submission_file=@/path/to/submission1.xml \
+    -F xml_submission_file=@/path/to/submission2.xml \
+    https://example.com/api/v1/submissions/bulk
+
+    All submissions must belong to the same form. Edits and attachments are not
+    supported, use the endpoint above instead.
+    The response lists the created submissions, the duplicates and the errors
+    by index of the submitted files.
     """
     filter_backends = (filters.AnonDjangoObjectPermissionFilter,)
     model = Instance
@@ -154,20 +173,57 @@ class XFormSubmissionApi(
             and not issubclass(auth_class, SessionAuthentication)
         ]
 
-    def create(self, request, *args, **kwargs):
-        username = self.kwargs.get('username')
+    @action(
+        detail=False,
+        methods=['POST'],
+        renderer_classes=[JSONRenderer],
+    )
+    def bulk(self, request, *args, **kwargs):
+        username = self._get_username(request)
+        xml_files = request.FILES.getlist('xml_submission_file')
+        if len(xml_files) > settings.SUBMISSION_BULK_MAX_COUNT:
+            return self.error_response(
+                t('Too many submissions. The limit is ##limit##.').replace(
+                    '##limit##', str(settings.SUBMISSION_BULK_MAX_COUNT)
+                ),
+                True,
+                request,
+            )
 
-        if self.request.user.is_anonymous:
-            if not username:
-                # Authentication is mandatory when username is omitted from the
-                # submission URL
-                raise NotAuthenticated
-            else:
-                _ = get_object_or_404(User, username=username.lower())
-        elif not username:
-            # get the username from the user if not set
-            user = get_database_user(request.user)
-            username = user.username
+        with http_open_rosa_error_handler(
+            lambda: bulk_create_instances(username, xml_files, request=request),
+            request,
+        ) as handler:
+            if handler.http_error_response:
+                return self.error_response(
+                    handler.http_error_response, True, request
+                )
+            results = handler.func_return
+
+        created = [
+            {
+                'index': index,
+                'id': instance.pk,
+                'instanceID': f'uuid:{instance.uuid}',
+            }
+            for index, instance in results['instances'].items()
+        ]
+        errors = [
+            {'index': index, 'error': error}
+            for index, error in sorted(results['errors'].items())
+        ]
+        return Response(
+            {
+                'created': created,
+                'duplicates': results['duplicates'],
+                'errors': errors,
+            },
+            headers=self.get_openrosa_headers(request),
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    def create(self, request, *args, **kwargs):
+        username = self._get_username(request)
 
         if request.method.upper() == 'HEAD':
             return Response(
@@ -222,3 +278,20 @@ class XFormSubmissionApi(
         return Response({'error': error_msg},
                         headers=self.get_openrosa_headers(request),
                         status=status_code)
+
+    def _get_username(self, request) -> str:
+        username = self.kwargs.get('username')
+
+        if self.request.user.is_anonymous:
+            if not username:
+                # Authentication is mandatory when username is omitted from the
+                # submission URL
+                raise NotAuthenticated
+            else:
+                _ = get_object_or_404(User, username=username.lower())
+        elif not username:
+            # get the username from the user if not set
+            user = get_database_user(request.user)
+            username = user.username
+
+        return username
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.15 on 2026-10-18 18:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('logger', '0041_add_root_uuid_field_to_instance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionCounterDelta',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('date', models.DateField()),
+                ('counter', models.IntegerField(default=1)),
+                (
+                    'last_submission_time',
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    'xform',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to='logger.xform',
+                    ),
+                ),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        fields=['user', 'date'],
+                        name='counter_delta_user_date_idx',
+                    )
+                ],
+            },
+        ),
+    ]
@@ -10,3 +10,6 @@ from kobo.apps.openrosa.apps.logger.models.monthly_xform_submission_counter impo
 from kobo.apps.openrosa.apps.logger.models.note import Note
 from kobo.apps.openrosa.apps.logger.models.survey_type import SurveyType
 from kobo.apps.openrosa.apps.logger.models.xform import XForm
+from kobo.apps.openrosa.apps.logger.models.submission_counter_delta import (
+    SubmissionCounterDelta,
+)
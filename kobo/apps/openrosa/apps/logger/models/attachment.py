@@ -8,7 +8,14 @@ from django.core.files.base import ContentFile
 from django.db import models
 from django.utils.http import urlencode
 
-from kobo.apps.openrosa.libs.utils.image_tools import get_optimized_image_path, resize
+from kobo.apps.openrosa.libs.utils.image_tools import (
+    THUMBNAIL_STATUS_MISSING,
+    THUMBNAIL_STATUS_PENDING,
+    THUMBNAIL_STATUS_READY,
+    get_optimized_image_path,
+    get_thumbnail_status,
+    set_thumbnail_status,
+)
 from kpi.deployment_backends.kc_access.storage import KobocatFileSystemStorage
 from kpi.deployment_backends.kc_access.storage import (
     default_kobocat_storage as default_storage,
@@ -133,8 +140,12 @@ class Attachment(models.Model, AudioTranscodingMixin):
             optimized_image_path = get_optimized_image_path(
                 self.media_file.name, suffix
             )
-            if not default_storage.exists(optimized_image_path):
-                resize(self.media_file.name)
+            status = self.thumbnail_status
+            if status != THUMBNAIL_STATUS_READY:
+                # Serve the original file until thumbnails are ready
+                optimized_image_path = None
+                if status == THUMBNAIL_STATUS_MISSING:
+                    self.schedule_thumbnails()
 
         if isinstance(default_storage, KobocatFileSystemStorage):
             # Django normally sanitizes accented characters in file names during
@@ -185,6 +196,29 @@ class Attachment(models.Model, AudioTranscodingMixin):
             media_file=urlencode({'media_file': self.media_file.name})
         )
 
+    def schedule_thumbnails(self, overwrite: bool = True):
+        """
+        Generate the thumbnails of the image in background.
+
+        If `overwrite` is False, thumbnails which already exist are kept and
+        only their status is cached.
+        """
+        # Avoid circular import
+        from kobo.apps.openrosa.apps.logger.tasks import generate_thumbnails
+
+        set_thumbnail_status(self.media_file.name, THUMBNAIL_STATUS_PENDING)
+        generate_thumbnails.delay(self.pk, overwrite=overwrite)
+
     @property
     def storage_path(self):
         return str(self.media_file)
+
+    @property
+    def thumbnail_status(self) -> Optional[str]:
+        """
+        Return the status of the thumbnails of an image attachment, i.e.
+        `ready`, `pending`, `missing` or `failed`. Return `None` for other files.
+        """
+        if not self.mimetype.startswith('image/') or not self.media_file.name:
+            return None
+        return get_thumbnail_status(self.media_file.name)
@@ -1,5 +1,8 @@
 # coding: utf-8
+from __future__ import annotations
+
 from hashlib import sha256
+from typing import Optional
 
 import reversion
 from django.apps import apps
@@ -147,8 +150,9 @@ class Instance(AbstractTimeStampedModel):
 
     def _set_geom(self):
         xform = self.xform
-        data_dictionary = xform.data_dictionary()
-        geo_xpaths = data_dictionary.geopoint_xpaths()
+        # Reuse the data dictionary of the parser to avoid an extra query
+        self._set_parser()
+        geo_xpaths = self._parser.dd.geopoint_xpaths()
         doc = self.get_dict()
         points = []
 
@@ -183,14 +187,21 @@ class Instance(AbstractTimeStampedModel):
             if self.user is not None else None
         self.json = doc
 
-    def _set_parser(self):
+    def _set_parser(self, data_dictionary: Optional['DataDictionary'] = None):
         if not hasattr(self, '_parser'):
             self._parser = XFormInstanceParser(
-                self.xml, self.xform.data_dictionary())
+                self.xml, data_dictionary or self.xform.data_dictionary()
+            )
+
+    def _set_survey_type(self, survey_types: Optional[dict] = None):
+        slug = self.get_root_node_name()
+        if survey_types is not None and slug in survey_types:
+            self.survey_type = survey_types[slug]
+            return
 
-    def _set_survey_type(self):
-        self.survey_type, created = \
-            SurveyType.objects.get_or_create(slug=self.get_root_node_name())
+        self.survey_type, created = SurveyType.objects.get_or_create(slug=slug)
+        if survey_types is not None:
+            survey_types[slug] = self.survey_type
 
     def _set_uuid(self):
         if self.xml and not self.uuid:
@@ -333,14 +344,24 @@ class Instance(AbstractTimeStampedModel):
         if gc and len(gc):
             return gc[0]
 
-    def save(self, *args, **kwargs):
-        force = kwargs.pop('force', False)
-
-        self.check_active(force)
+    def populate_fields(
+        self,
+        data_dictionary: Optional['DataDictionary'] = None,
+        survey_types: Optional[dict] = None,
+    ):
+        """
+        Compute all the fields derived from `self.xml`.
 
+        It is called by `save()`, but it can be called directly to prepare
+        several instances for `bulk_create()`. In that case, `data_dictionary`
+        and `survey_types` (a dictionary of `SurveyType` objects per slug,
+        filled as they are retrieved) can be shared between instances to save
+        queries.
+        """
+        self._set_parser(data_dictionary)
         self._set_geom()
         self._set_json()
-        self._set_survey_type()
+        self._set_survey_type(survey_types)
         self._set_uuid()
         self._populate_xml_hash()
         self._populate_root_uuid()
@@ -349,6 +370,12 @@ class Instance(AbstractTimeStampedModel):
         if self.validation_status is None:
             self.validation_status = {}
 
+    def save(self, *args, **kwargs):
+        force = kwargs.pop('force', False)
+
+        self.check_active(force)
+        self.populate_fields()
+
         super().save(*args, **kwargs)
 
     def get_validation_status(self):
@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+from kobo.apps.kobo_auth.shortcuts import User
+
+
+class SubmissionCounterDelta(models.Model):
+    """
+    Append-only buffer of submission counter increments.
+
+    When `settings.BUFFERED_SUBMISSION_COUNTERS` is enabled, new submissions
+    insert a row here instead of updating the (highly contended) rows of
+    `DailyXFormSubmissionCounter`, `MonthlyXFormSubmissionCounter`,
+    `XForm.num_of_submissions` and `UserProfile.num_of_submissions`.
+    `fold_submission_counter_deltas()` merges them periodically.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Deltas of deleted projects are folded into the catch-all counters
+    # (`xform = NULL`)
+    xform = models.ForeignKey(
+        'logger.XForm', null=True, on_delete=models.SET_NULL
+    )
+    date = models.DateField()
+    counter = models.IntegerField(default=1)
+    last_submission_time = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('user', 'date'), name='counter_delta_user_date_idx'
+            ),
+        ]
@@ -1,6 +1,8 @@
 # coding: utf-8
 import logging
+from collections import Counter
 
+from django.apps import apps
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
@@ -17,10 +19,20 @@ from kobo.apps.openrosa.apps.logger.models.instance import Instance
 from kobo.apps.openrosa.apps.logger.models.monthly_xform_submission_counter import (
     MonthlyXFormSubmissionCounter,
 )
+from kobo.apps.openrosa.apps.logger.models.submission_counter_delta import (
+    SubmissionCounterDelta,
+)
 from kobo.apps.openrosa.apps.logger.models.xform import XForm
+from kobo.apps.openrosa.apps.logger.utils.counters import (
+    fold_submission_counter_deltas,
+)
 from kobo.apps.openrosa.apps.main.models.user_profile import UserProfile
 from kobo.apps.openrosa.libs.utils.guardian import assign_perm, get_perms_for_model
-from kobo.apps.openrosa.libs.utils.image_tools import get_optimized_image_path
+from kobo.apps.openrosa.libs.utils.image_tools import (
+    THUMBNAIL_STATUS_PENDING,
+    get_optimized_image_path,
+    set_thumbnail_status,
+)
 from kpi.deployment_backends.kc_access.storage import (
     default_kobocat_storage as default_storage,
 )
@@ -71,6 +83,7 @@ def pre_delete_attachment(instance, **kwargs):
             default_storage.delete(
                 get_optimized_image_path(media_file_name, suffix)
             )
+        set_thumbnail_status(media_file_name, None)
     except Exception as e:
         logging.error('Failed to delete attachment: ' + str(e), exc_info=True)
 
@@ -102,6 +115,23 @@ def post_save_attachment(instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender=Attachment)
+def generate_attachment_thumbnails(instance, created, **kwargs):
+    """
+    Generate thumbnails of new images in background, instead of doing it
+    when they are requested for the first time.
+    """
+    attachment = instance
+    if not created or not attachment.mimetype.startswith('image/'):
+        return
+
+    # Avoid circular import
+    from kobo.apps.openrosa.apps.logger.tasks import generate_thumbnails
+
+    set_thumbnail_status(attachment.media_file.name, THUMBNAIL_STATUS_PENDING)
+    transaction.on_commit(lambda: generate_thumbnails.delay(attachment.pk))
+
+
 @receiver(post_save, sender=XForm, dispatch_uid='xform_object_permissions')
 def set_object_permissions(sender, instance=None, created=False, **kwargs):
     if created:
@@ -166,6 +196,16 @@ def update_xform_submission_count(sender, instance, created, **kwargs):
     # `defer_counting` is a Python-only attribute
     if getattr(instance, 'defer_counting', False):
         return
+    if settings.BUFFERED_SUBMISSION_COUNTERS:
+        # One delta covers the daily and monthly counters too. See
+        # `fold_submission_counter_deltas()`
+        SubmissionCounterDelta.objects.create(
+            user_id=instance.xform.user_id,
+            xform_id=instance.xform_id,
+            date=instance.date_created.date(),
+            last_submission_time=instance.date_created,
+        )
+        return
     with transaction.atomic():
         xform = XForm.objects.only('user_id').get(pk=instance.xform_id)
         # Update with `F` expression instead of `select_for_update` to avoid
@@ -183,6 +223,9 @@ def update_xform_submission_count(sender, instance, created, **kwargs):
         UserProfile.objects.filter(pk=profile.pk).update(
             num_of_submissions=F('num_of_submissions') + 1,
         )
+        _increment_usage_rollup(
+            xform.user_id, {instance.date_created.date(): 1}
+        )
 
 
 @receiver(post_save, sender=Instance, dispatch_uid='update_xform_daily_counter')
@@ -191,6 +234,9 @@ def update_xform_daily_counter(sender, instance, created, **kwargs):
         return
     if getattr(instance, 'defer_counting', False):
         return
+    if settings.BUFFERED_SUBMISSION_COUNTERS:
+        # Counted by `update_xform_submission_count()`
+        return
 
     # get the date submitted
     date_created = instance.date_created.date()
@@ -217,6 +263,9 @@ def update_xform_monthly_counter(sender, instance, created, **kwargs):
         return
     if getattr(instance, 'defer_counting', False):
         return
+    if settings.BUFFERED_SUBMISSION_COUNTERS:
+        # Counted by `update_xform_submission_count()`
+        return
 
     # get the user_id for the xform the instance was submitted for
     xform = XForm.objects.only('pk', 'user_id').get(pk=instance.xform_id)
@@ -240,6 +289,96 @@ def update_xform_monthly_counter(sender, instance, created, **kwargs):
     ).update(counter=F('counter') + 1)
 
 
+def update_xform_counters_in_bulk(xform: XForm, instances: list[Instance]):
+    """
+    Do what `update_xform_submission_count()`, `update_xform_daily_counter()`
+    and `update_xform_monthly_counter()` do for each new instance, but once
+    for all `instances` of `xform`.
+
+    Like these receivers, instances whose `defer_counting` is not set should
+    not be passed, otherwise they would be counted twice.
+    """
+    if not instances:
+        return
+
+    daily_counts = Counter(
+        instance.date_created.date() for instance in instances
+    )
+    if settings.BUFFERED_SUBMISSION_COUNTERS:
+        last_submission_times = {}
+        for instance in instances:
+            date_created = instance.date_created.date()
+            last_submission_times[date_created] = max(
+                last_submission_times.get(date_created, instance.date_created),
+                instance.date_created,
+            )
+        SubmissionCounterDelta.objects.bulk_create(
+            [
+                SubmissionCounterDelta(
+                    user_id=xform.user_id,
+                    xform_id=xform.pk,
+                    date=date_created,
+                    counter=count,
+                    last_submission_time=last_submission_times[date_created],
+                )
+                for date_created, count in daily_counts.items()
+            ]
+        )
+        return
+
+    monthly_counts = Counter()
+    for date_created, count in daily_counts.items():
+        monthly_counts[(date_created.year, date_created.month)] += count
+
+    with transaction.atomic():
+        XForm.objects.filter(pk=xform.pk).update(
+            num_of_submissions=F('num_of_submissions') + len(instances),
+            last_submission_time=max(
+                instance.date_created for instance in instances
+            ),
+        )
+        # Hack to avoid circular imports
+        UserProfile = User.profile.related.related_model  # noqa
+        profile, created = UserProfile.objects.only('pk').get_or_create(
+            user_id=xform.user_id
+        )
+        UserProfile.objects.filter(pk=profile.pk).update(
+            num_of_submissions=F('num_of_submissions') + len(instances),
+        )
+        _increment_usage_rollup(xform.user_id, daily_counts)
+
+        for date_created, count in daily_counts.items():
+            DailyXFormSubmissionCounter.objects.get_or_create(
+                date=date_created,
+                xform_id=xform.pk,
+                user_id=xform.user_id,
+            )
+            DailyXFormSubmissionCounter.objects.filter(
+                date=date_created,
+                xform_id=xform.pk,
+            ).update(counter=F('counter') + count)
+
+        for (year, month), count in monthly_counts.items():
+            MonthlyXFormSubmissionCounter.objects.get_or_create(
+                user_id=xform.user_id,
+                xform_id=xform.pk,
+                year=year,
+                month=month,
+            )
+            MonthlyXFormSubmissionCounter.objects.filter(
+                xform_id=xform.pk,
+                year=year,
+                month=month,
+            ).update(counter=F('counter') + count)
+
+
+def _increment_usage_rollup(user_id: int, daily_counts: dict):
+    # Avoid circular import
+    UsageRollup = apps.get_model('trackers', 'UsageRollup')  # noqa
+    for date_created, count in daily_counts.items():
+        UsageRollup.increment(user_id, date_created, submissions=count)
+
+
 @receiver(
     post_delete,
     sender=Instance,
@@ -259,6 +398,11 @@ def update_xform_submission_count_delete(sender, instance, **kwargs):
         xform_id = instance.pk
         xform = instance
 
+    if settings.BUFFERED_SUBMISSION_COUNTERS:
+        # Apply pending increments first, otherwise the decrement below
+        # could be clamped to 0
+        fold_submission_counter_deltas(xform_id=xform_id)
+
     with transaction.atomic():
         # Like `update_xform_submission_count()`, update with `F` expression
         # instead of `select_for_update` to avoid locks, and `save()` which
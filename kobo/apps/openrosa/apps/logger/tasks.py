@@ -15,6 +15,12 @@ from django.utils import timezone
 from django_redis import get_redis_connection
 
 from kobo.apps.kobo_auth.shortcuts import User
+from kobo.apps.openrosa.libs.utils.image_tools import (
+    THUMBNAIL_STATUS_READY,
+    resize,
+    set_thumbnail_status,
+    thumbnails_exist,
+)
 from kobo.apps.openrosa.libs.utils.jsonbfield_helper import ReplaceValues
 from kobo.celery import celery_app
 from kpi.deployment_backends.kc_access.storage import (
@@ -23,7 +29,8 @@ from kpi.deployment_backends.kc_access.storage import (
 from kpi.utils.log import logging
 from .constants import SUBMISSIONS_SUSPENDED_HEARTBEAT_KEY
 from .models.daily_xform_submission_counter import DailyXFormSubmissionCounter
-from .models import Instance, XForm
+from .models import Attachment, Instance, XForm
+from .utils.counters import fold_submission_counter_deltas
 from ..main.models import UserProfile
 
 
@@ -38,6 +45,11 @@ def delete_daily_counters():
     xform_daily_counters.delete()
 
 
+@celery_app.task()
+def fold_submission_counters():
+    fold_submission_counter_deltas()
+
+
 # ## ISSUE 242 TEMPORARY FIX ##
 # See https://github.com/kobotoolbox/kobocat/issues/242
 
@@ -173,6 +185,23 @@ def fix_stale_submissions_suspended_flag():
         redis_client.hdel(SUBMISSIONS_SUSPENDED_HEARTBEAT_KEY, *usernames)
 
 
+@celery_app.task()
+def generate_thumbnails(attachment_id: int, overwrite: bool = True):
+    try:
+        attachment = Attachment.all_objects.only('media_file').get(
+            pk=attachment_id
+        )
+    except Attachment.DoesNotExist:
+        return
+
+    filename = attachment.media_file.name
+    if not overwrite and thumbnails_exist(filename):
+        set_thumbnail_status(filename, THUMBNAIL_STATUS_READY)
+        return
+
+    resize(filename)
+
+
 @celery_app.task(
     soft_time_limit=settings.CELERY_LONG_RUNNING_TASK_SOFT_TIME_LIMIT,
     time_limit=settings.CELERY_LONG_RUNNING_TASK_TIME_LIMIT
@@ -1,13 +1,28 @@
 # coding: utf-8
 import os
+from unittest.mock import patch
 
 from django.conf import settings
 from django.core.files.base import File
 from django.core.management import call_command
 
 from kobo.apps.openrosa.apps.logger.models import Attachment, Instance
+from kobo.apps.openrosa.apps.logger.tasks import generate_thumbnails
 from kobo.apps.openrosa.apps.main.tests.test_base import TestBase
-from kobo.apps.openrosa.libs.utils.image_tools import image_url
+from kobo.apps.openrosa.libs.serializers.attachment_serializer import (
+    AttachmentSerializer,
+)
+from kobo.apps.openrosa.libs.utils import image_tools
+from kobo.apps.openrosa.libs.utils.image_tools import (
+    THUMBNAIL_STATUS_FAILED,
+    THUMBNAIL_STATUS_MISSING,
+    THUMBNAIL_STATUS_PENDING,
+    THUMBNAIL_STATUS_READY,
+    get_optimized_image_path,
+    get_thumbnail_status,
+    image_url,
+    set_thumbnail_status,
+)
 from kpi.deployment_backends.kc_access.storage import (
     default_kobocat_storage as default_storage,
 )
@@ -38,6 +53,9 @@ class TestAttachment(TestBase):
 
     def test_thumbnails(self):
         for attachment in Attachment.objects.filter(instance=self.instance):
+            # The original is served while thumbnails are generated
+            url = image_url(attachment, 'small')
+            self.assertEqual(url, attachment.media_file.url)
             url = image_url(attachment, 'small')
             filename = attachment.media_file.name.replace('.jpg', '')
             thumbnail = '%s-small.jpg' % filename
@@ -75,3 +93,82 @@ class TestAttachment(TestBase):
                     > created_times[size]
                 )
                 default_storage.delete(thumbnail)
+
+    def test_thumbnail_status(self):
+        filename = self.attachment.media_file.name
+        for suffix in settings.THUMB_CONF:
+            default_storage.delete(get_optimized_image_path(filename, suffix))
+        self.assertEqual(self.attachment.thumbnail_status, THUMBNAIL_STATUS_MISSING)
+
+        generate_thumbnails(self.attachment.pk)
+        self.assertEqual(self.attachment.thumbnail_status, THUMBNAIL_STATUS_READY)
+        for suffix in settings.THUMB_CONF:
+            self.assertTrue(
+                default_storage.exists(get_optimized_image_path(filename, suffix))
+            )
+
+        self.attachment.mimetype = 'audio/mp3'
+        self.assertIsNone(self.attachment.thumbnail_status)
+
+    def test_cached_thumbnail_status(self):
+        filename = self.attachment.media_file.name
+        set_thumbnail_status(filename, None)
+        generate_thumbnails(self.attachment.pk)
+
+        # Hot images are kept in the cache, without checking the storage
+        with patch.object(
+            image_tools.cache, 'touch', wraps=image_tools.cache.touch
+        ) as touch, patch.object(
+            image_tools, 'thumbnails_exist'
+        ) as thumbnails_exist:
+            self.assertEqual(
+                get_thumbnail_status(filename), THUMBNAIL_STATUS_READY
+            )
+            touch.assert_called_once()
+            thumbnails_exist.assert_not_called()
+
+        set_thumbnail_status(filename, None)
+
+    def test_original_is_served_until_thumbnails_are_ready(self):
+        filename = self.attachment.media_file.name
+        original_url = self.attachment.media_file.url
+        for status in [THUMBNAIL_STATUS_PENDING, THUMBNAIL_STATUS_FAILED]:
+            set_thumbnail_status(filename, status)
+            with patch.object(image_tools, 'resize') as resize:
+                self.assertEqual(
+                    image_url(self.attachment, 'small'), original_url
+                )
+                self.assertNotIn(
+                    '-small', self.attachment.protected_path(suffix='small')
+                )
+                resize.assert_not_called()
+
+        set_thumbnail_status(filename, None)
+
+    def test_serializer_does_not_probe_storage(self):
+        filename = self.attachment.media_file.name
+        set_thumbnail_status(filename, None)
+        generate_thumbnails(self.attachment.pk)
+        set_thumbnail_status(filename, None)
+
+        # The task fills the cache on a miss, thumbnails are not regenerated
+        with patch.object(
+            image_tools.default_storage, 'exists', return_value=True
+        ) as exists, patch(
+            'kobo.apps.openrosa.apps.logger.tasks.resize'
+        ) as resize:
+            serializer = AttachmentSerializer(
+                self.attachment, context={'request': None}
+            )
+            self.assertIsNone(serializer.get_thumbnail_status(self.attachment))
+            exists.assert_called()
+            resize.assert_not_called()
+
+            exists.reset_mock()
+            self.assertEqual(
+                serializer.get_thumbnail_status(self.attachment),
+                THUMBNAIL_STATUS_READY,
+            )
+            exists.assert_not_called()
+
+        set_thumbnail_status(filename, None)
@@ -2,13 +2,18 @@
 from datetime import timedelta
 
 from django.conf import settings
+from django.test import override_settings
 from django.utils import timezone
 
 from kobo.apps.kobo_auth.shortcuts import User
-from kobo.apps.openrosa.apps.logger.models import XForm
+from kobo.apps.openrosa.apps.logger.models import SubmissionCounterDelta, XForm
 from kobo.apps.openrosa.apps.logger.models.daily_xform_submission_counter import DailyXFormSubmissionCounter
 from kobo.apps.openrosa.apps.logger.models.monthly_xform_submission_counter import MonthlyXFormSubmissionCounter
-from kobo.apps.openrosa.apps.logger.tasks import delete_daily_counters
+from kobo.apps.openrosa.apps.logger.tasks import (
+    delete_daily_counters,
+    fold_submission_counters,
+)
+from kobo.apps.openrosa.apps.main.models import UserProfile
 from kobo.apps.openrosa.apps.main.tests.test_base import TestBase
 
 
@@ -129,3 +134,36 @@ class TestXFormSubmissionCounters(TestBase):
         assert (
             DailyXFormSubmissionCounter.objects.get(**criteria).counter == 2
         )
+
+    @override_settings(BUFFERED_SUBMISSION_COUNTERS=True)
+    def test_buffered_counters_are_folded(self):
+        """
+        Test that submissions only add deltas and that folding them updates
+        all the counters
+        """
+        self._publish_transportation_form_and_submit_instance()
+        self.assertEqual(SubmissionCounterDelta.objects.count(), 1)
+        self.assertFalse(
+            DailyXFormSubmissionCounter.objects.filter(
+                user__username='bob'
+            ).exists()
+        )
+        self.xform.refresh_from_db()
+        self.assertEqual(self.xform.num_of_submissions, 0)
+
+        fold_submission_counters()
+        self.assertFalse(SubmissionCounterDelta.objects.exists())
+        daily_counter = DailyXFormSubmissionCounter.objects.get(
+            user__username='bob'
+        )
+        self.assertEqual(daily_counter.counter, 1)
+        monthly_counter = MonthlyXFormSubmissionCounter.objects.get(
+            user__username='bob'
+        )
+        self.assertEqual(monthly_counter.counter, 1)
+        self.xform.refresh_from_db()
+        self.assertEqual(self.xform.num_of_submissions, 1)
+        self.assertIsNotNone(self.xform.last_submission_time)
+        self.assertEqual(
+            UserProfile.objects.get(user=self.user).num_of_submissions, 1
+        )
@@ -1,4 +1,8 @@
 # flake8: noqa: F401
 from .counters import delete_null_user_daily_counters
 from .database_query import build_db_queries
-from .instance import delete_instances, set_instance_validation_statuses
+from .instance import (
+    delete_instances,
+    purge_instances,
+    set_instance_validation_statuses,
+)
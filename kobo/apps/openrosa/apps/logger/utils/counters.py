@@ -1,3 +1,19 @@
+from collections import Counter
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from kobo.apps.openrosa.apps.logger.models import (
+    DailyXFormSubmissionCounter,
+    MonthlyXFormSubmissionCounter,
+    SubmissionCounterDelta,
+    XForm,
+)
+from kobo.apps.openrosa.apps.main.models.user_profile import UserProfile
+
+
 def delete_null_user_daily_counters(apps, *args):
     """
     Find any DailyXFormCounters without a user, assign them to a user if we can,
@@ -42,3 +58,118 @@ def delete_null_user_daily_counters(apps, *args):
 
     # Delete daily counters without a user to avoid creating invalid monthly counters
     DailyXFormSubmissionCounter.objects.filter(user=None).delete()
+
+
+def fold_submission_counter_deltas(
+    xform_id: int = None, batch_size: int = 5000
+) -> int:
+    """
+    Merge `SubmissionCounterDelta` rows into the submission counters and
+    return the number of folded rows.
+
+    Each batch updates every counter row once, however many submissions it
+    contains. Deltas claimed by another worker are skipped, unless `xform_id`
+    is provided: then we wait for them to be folded.
+    """
+    # Avoid circular import
+    UsageRollup = apps.get_model('trackers', 'UsageRollup')  # noqa
+    total = 0
+    while True:
+        with transaction.atomic():
+            queryset = SubmissionCounterDelta.objects.select_for_update(
+                skip_locked=xform_id is None
+            ).order_by('pk')
+            if xform_id is not None:
+                queryset = queryset.filter(xform_id=xform_id)
+
+            deltas = list(
+                queryset.values(
+                    'pk',
+                    'user_id',
+                    'xform_id',
+                    'date',
+                    'counter',
+                    'last_submission_time',
+                )[:batch_size]
+            )
+            if not deltas:
+                break
+
+            daily_counts = Counter()
+            monthly_counts = Counter()
+            profile_counts = Counter()
+            rollup_counts = Counter()
+            xform_counts = Counter()
+            last_submission_times = {}
+            for delta in deltas:
+                user_id = delta['user_id']
+                delta_xform_id = delta['xform_id']
+                date = delta['date']
+                count = delta['counter']
+                daily_counts[(user_id, delta_xform_id, date)] += count
+                monthly_counts[
+                    (user_id, delta_xform_id, date.year, date.month)
+                ] += count
+                profile_counts[user_id] += count
+                rollup_counts[(user_id, date)] += count
+                if delta_xform_id is not None:
+                    xform_counts[delta_xform_id] += count
+                    last_submission_times[delta_xform_id] = max(
+                        last_submission_times.get(
+                            delta_xform_id, delta['last_submission_time']
+                        ),
+                        delta['last_submission_time'],
+                    )
+
+            for (user_id, delta_xform_id, date), count in daily_counts.items():
+                criteria = dict(
+                    date=date, user_id=user_id, xform_id=delta_xform_id
+                )
+                DailyXFormSubmissionCounter.objects.get_or_create(**criteria)
+                DailyXFormSubmissionCounter.objects.filter(**criteria).update(
+                    counter=F('counter') + count
+                )
+
+            for key, count in monthly_counts.items():
+                user_id, delta_xform_id, year, month = key
+                criteria = dict(
+                    year=year,
+                    month=month,
+                    user_id=user_id,
+                    xform_id=delta_xform_id,
+                )
+                MonthlyXFormSubmissionCounter.objects.get_or_create(**criteria)
+                MonthlyXFormSubmissionCounter.objects.filter(**criteria).update(
+                    counter=F('counter') + count
+                )
+
+            for delta_xform_id, count in xform_counts.items():
+                XForm.objects.filter(pk=delta_xform_id).update(
+                    num_of_submissions=F('num_of_submissions') + count,
+                    # `GREATEST()` ignores NULL values on PostgreSQL
+                    last_submission_time=Greatest(
+                        F('last_submission_time'),
+                        Value(last_submission_times[delta_xform_id]),
+                    ),
+                )
+
+            for user_id, count in profile_counts.items():
+                profile, _ = UserProfile.objects.only('pk').get_or_create(
+                    user_id=user_id
+                )
+                UserProfile.objects.filter(pk=profile.pk).update(
+                    num_of_submissions=F('num_of_submissions') + count,
+                )
+
+            for (user_id, date), count in rollup_counts.items():
+                UsageRollup.increment(user_id, date, submissions=count)
+
+            SubmissionCounterDelta.objects.filter(
+                pk__in=[delta['pk'] for delta in deltas]
+            ).delete()
+
+        total += len(deltas)
+        if len(deltas) < batch_size:
+            break
+
+    return total
@@ -1,5 +1,7 @@
 import logging
 import time
+from contextlib import contextmanager
+from typing import Generator, Optional
 
 from django.conf import settings
 from django.db.models.signals import post_delete, pre_delete
@@ -44,20 +46,7 @@ def delete_instances(xform: XForm, request_data: dict) -> int:
     deleted_records_count = 0
     postgres_query, mongo_query = build_db_queries(xform, request_data)
 
-    # Disconnect signals to speed-up bulk deletion
-    pre_delete.disconnect(remove_from_mongo, sender=ParsedInstance)
-    post_delete.disconnect(
-        nullify_exports_time_of_last_submission,
-        sender=Instance,
-        dispatch_uid='nullify_exports_time_of_last_submission',
-    )
-    post_delete.disconnect(
-        update_xform_submission_count_delete,
-        sender=Instance,
-        dispatch_uid='update_xform_submission_count_delete',
-    )
-
-    try:
+    with disconnect_deletion_signals():
         # Delete Postgres & Mongo
         all_count, results = Instance.objects.filter(**postgres_query).delete()
         identifier = f'{Instance._meta.app_label}.Instance'
@@ -75,6 +64,29 @@ def delete_instances(xform: XForm, request_data: dict) -> int:
         update_xform_submission_count_delete(
             sender=Instance, instance=xform, value=deleted_records_count
         )
+
+    return deleted_records_count
+
+
+@contextmanager
+def disconnect_deletion_signals():
+    """
+    Disconnect per-object deletion signals to speed-up bulk deletion.
+    Callers are responsible for updating the XForm like the signals would do.
+    """
+    pre_delete.disconnect(remove_from_mongo, sender=ParsedInstance)
+    post_delete.disconnect(
+        nullify_exports_time_of_last_submission,
+        sender=Instance,
+        dispatch_uid='nullify_exports_time_of_last_submission',
+    )
+    post_delete.disconnect(
+        update_xform_submission_count_delete,
+        sender=Instance,
+        dispatch_uid='update_xform_submission_count_delete',
+    )
+    try:
+        yield
     finally:
         # Pre_delete signal needs to be re-enabled for parsed instance
         pre_delete.connect(remove_from_mongo, sender=ParsedInstance)
@@ -89,7 +101,54 @@ def delete_instances(xform: XForm, request_data: dict) -> int:
             dispatch_uid='update_xform_submission_count_delete',
         )
 
-    return deleted_records_count
+
+def purge_instances(
+    xform: XForm, batch_size: int
+) -> Generator[list[tuple[int, Optional[str]]], None, None]:
+    """
+    Delete all the submissions of `xform`, without any permission validation,
+    by batches of `batch_size`.
+
+    PostgreSQL rows are deleted by ranges of ids of `xform`, and their MongoDB
+    counterparts by the same ranges within `_userform_id`. Documents left in
+    MongoDB without any PostgreSQL row are deleted afterwards.
+
+    Yield the list of `(id, uuid)` deleted by each batch.
+    """
+    mongo_query = ParsedInstance.get_base_query(
+        xform.user.username, xform.id_string, xform
+    )
+    instances = Instance.objects.filter(xform_id=xform.pk)
+    identifier = f'{Instance._meta.app_label}.Instance'
+
+    while submissions := list(
+        instances.order_by('pk').values_list('pk', 'uuid')[:batch_size]
+    ):
+        first_id = submissions[0][0]
+        last_id = submissions[-1][0]
+        with disconnect_deletion_signals():
+            _, results = instances.filter(
+                pk__gte=first_id, pk__lte=last_id
+            ).delete()
+            ParsedInstance.bulk_delete(
+                {**mongo_query, '_id': {'$gte': first_id, '$lte': last_id}}
+            )
+            update_xform_submission_count_delete(
+                sender=Instance, instance=xform, value=results.get(identifier, 0)
+            )
+        yield submissions
+
+    while documents := list(
+        settings.MONGO_DB.instances.find(
+            mongo_query, {'_id': 1, '_uuid': 1}
+        ).limit(batch_size)
+    ):
+        ParsedInstance.bulk_delete(
+            {**mongo_query, '_id': {'$in': [doc['_id'] for doc in documents]}}
+        )
+        yield [(doc['_id'], doc.get('_uuid')) for doc in documents]
+
+    nullify_exports_time_of_last_submission(sender=Instance, instance=xform)
 
 
 def get_validation_status(validation_status_uid: str, username: str) -> dict:
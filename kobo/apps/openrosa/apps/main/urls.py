@@ -118,6 +118,11 @@ urlpatterns = [
         XFormSubmissionApi.as_view({'post': 'create', 'head': 'create'}),
         name='submissions',
     ),
+    re_path(
+        r'^submission/bulk$',
+        XFormSubmissionApi.as_view({'post': 'bulk'}),
+        name='submissions-bulk',
+    ),
     re_path(r'^formList$', XFormListApi.as_view({'get': 'list'}), name='form-list'),
     re_path(
         r'^(?P<username>\w+)/formList$',
@@ -161,6 +166,11 @@ urlpatterns = [
         XFormSubmissionApi.as_view({'post': 'create', 'head': 'create'}),
         name='submissions',
     ),
+    re_path(
+        r'^(?P<username>\w+)/submission/bulk$',
+        XFormSubmissionApi.as_view({'post': 'bulk'}),
+        name='submissions-bulk',
+    ),
     re_path(r'^(?P<username>\w+)/bulk-submission$', bulksubmission),
     re_path(r'^(?P<username>\w+)/bulk-submission-form$', bulksubmission_form),
     re_path(
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.15 on 2026-10-18 18:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logger', '0041_add_root_uuid_field_to_instance'),
+        ('viewer', '0005_alter_instancemodification_date_created_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingMongoWrite',
+            fields=[
+                (
+                    'instance',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='pending_mongo_write',
+                        serialize=False,
+                        to='logger.instance',
+                    ),
+                ),
+                ('created', models.BooleanField(default=False)),
+                (
+                    'date_created',
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                (
+                    'date_modified',
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    'xform',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to='logger.xform',
+                    ),
+                ),
+            ],
+        ),
+    ]
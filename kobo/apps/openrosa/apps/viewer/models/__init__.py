@@ -3,3 +3,4 @@ from kobo.apps.openrosa.apps.viewer.models.parsed_instance import ParsedInstance
 from kobo.apps.openrosa.apps.viewer.models.data_dictionary import DataDictionary
 from kobo.apps.openrosa.apps.viewer.models.instance_modification import InstanceModification
 from kobo.apps.openrosa.apps.viewer.models.export import Export
+from kobo.apps.openrosa.apps.viewer.models.pending_mongo_write import PendingMongoWrite
@@ -1,16 +1,24 @@
 import json
+import time
+from functools import partial
 from typing import Optional
 
 from bson import json_util
 from dateutil import parser
 from django.conf import settings
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext as t
+from pymongo import ReplaceOne
 from pymongo.errors import PyMongoError
 
-from kobo.apps.hook.utils.services import call_services
+from kobo.apps.hook.utils.services import call_services, call_services_in_bulk
 from kobo.apps.openrosa.apps.logger.models import Instance, Note, XForm
 from kobo.apps.openrosa.apps.logger.xform_instance_parser import add_uuid_prefix
+from kobo.apps.openrosa.apps.viewer.models.pending_mongo_write import (
+    PendingMongoWrite,
+)
 from kobo.apps.openrosa.libs.utils.common_tags import (
     ATTACHMENTS,
     GEOLOCATION,
@@ -63,6 +71,23 @@ def update_mongo_instance(record):
     return True
 
 
+@celery_app.task
+def flush_pending_mongo_writes():
+    ParsedInstance.flush_pending_mongo_writes()
+    count, lag = PendingMongoWrite.get_lag()
+    if lag.total_seconds() > settings.MONGO_WRITE_BEHIND_LAG_WARNING:
+        logging.warning(
+            f'{count} submissions are waiting to be saved to Mongo. '
+            f'The oldest one has been waiting for {lag}'
+        )
+
+
+@celery_app.task
+def call_services_in_background(created_ids_by_asset_uid: dict):
+    for asset_uid, instance_ids in created_ids_by_asset_uid.items():
+        call_services_in_bulk(asset_uid, instance_ids)
+
+
 class ParsedInstance(models.Model):
     USERFORM_ID = '_userform_id'
     STATUS = '_status'
@@ -282,20 +307,28 @@ class ParsedInstance(models.Model):
         cursor.batch_size = cls.DEFAULT_BATCHSIZE
         return cursor
 
-    def to_dict_for_mongo(self):
+    def to_dict_for_mongo(self, is_new: bool = False):
+        """
+        Return the document to store in Mongo.
+
+        `is_new=True` skips the queries on attachments, tags and notes because
+        an instance which has just been created in bulk has none of them.
+        """
         d = self.to_dict()
 
         data = {
             UUID: self.instance.uuid,
             META_ROOT_UUID: add_uuid_prefix(self.instance.root_uuid),
             ID: self.instance.id,
-            ATTACHMENTS: _get_attachments_from_instance(self.instance),
+            ATTACHMENTS: (
+                [] if is_new else _get_attachments_from_instance(self.instance)
+            ),
             self.STATUS: self.instance.status,
             GEOLOCATION: [self.lat, self.lng],
             SUBMISSION_TIME: self.instance.date_created.strftime(
                 MONGO_STRFTIME),
-            TAGS: list(self.instance.tags.names()),
-            NOTES: self.get_notes(),
+            TAGS: [] if is_new else list(self.instance.tags.names()),
+            NOTES: [] if is_new else self.get_notes(),
             VALIDATION_STATUS: self.instance.get_validation_status(),
             SUBMITTED_BY: self.instance.user.username
             if self.instance.user else None
@@ -339,6 +372,258 @@ class ParsedInstance(models.Model):
 
         return True
 
+    def enqueue_mongo_write(self, created: bool = False) -> bool:
+        """
+        Defer the Mongo upsert to `flush_pending_mongo_writes()`.
+
+        The queue entry is part of the current transaction and the flush is
+        scheduled once it is committed. At most one flush is scheduled per
+        `MONGO_WRITE_BEHIND_COUNTDOWN` seconds so bursts of submissions are
+        written together.
+        """
+        PendingMongoWrite.enqueue(self.instance, created=created)
+        transaction.on_commit(self._schedule_mongo_writes_flush)
+        return True
+
+    @staticmethod
+    def _schedule_mongo_writes_flush():
+        countdown = settings.MONGO_WRITE_BEHIND_COUNTDOWN
+        if cache.add('flush_pending_mongo_writes', 'true', timeout=countdown):
+            flush_pending_mongo_writes.apply_async(countdown=countdown)
+
+    @classmethod
+    def flush_pending_mongo_writes(
+        cls, xform_id: Optional[int] = None, batch_size: Optional[int] = None
+    ) -> int:
+        """
+        Upsert the Mongo documents of pending writes with one `bulk_write()`
+        per batch and return the number of writes processed.
+
+        Documents are built from PostgreSQL at flush time, so several edits of
+        the same submission result in only one write of its latest version.
+        Pending writes claimed by another worker are skipped, unless
+        `xform_id` is provided: then we wait for them to land in Mongo.
+        """
+        batch_size = batch_size or settings.MONGO_WRITE_BEHIND_BATCH_SIZE
+        total = 0
+
+        while True:
+            with transaction.atomic():
+                queryset = PendingMongoWrite.objects.select_for_update(
+                    skip_locked=xform_id is None
+                ).order_by('date_created')
+                if xform_id is not None:
+                    queryset = queryset.filter(xform_id=xform_id)
+
+                pending = dict(
+                    queryset.values_list('instance_id', 'created')[:batch_size]
+                )
+                if not pending:
+                    break
+
+                created_ids_by_asset_uid = cls._write_pending_to_mongo(pending)
+
+            total += len(pending)
+
+            # Like `save()`, REST services are called once new submissions
+            # are in Mongo
+            for asset_uid, instance_ids in created_ids_by_asset_uid.items():
+                call_services_in_bulk(asset_uid, instance_ids)
+
+            if len(pending) < batch_size:
+                break
+
+        return total
+
+    @classmethod
+    def flush_pending_mongo_writes_before_read(cls, xform_id: int) -> int:
+        """
+        Upsert the pending writes of `xform_id` enqueued before the read, to
+        let users read their own writes, and return the number of writes
+        processed.
+
+        Batches are flushed until none are left, or until
+        `MONGO_WRITE_BEHIND_READ_TIMEOUT` is exceeded. Writes claimed by
+        another worker are waited for, like in `flush_pending_mongo_writes()`,
+        but REST services are called in background.
+        """
+        read_started_at = timezone.now()
+        queryset = PendingMongoWrite.objects.filter(
+            xform_id=xform_id, date_created__lte=read_started_at
+        )
+        if not queryset.exists():
+            return 0
+
+        batch_size = settings.MONGO_WRITE_BEHIND_BATCH_SIZE
+        deadline = time.monotonic() + settings.MONGO_WRITE_BEHIND_READ_TIMEOUT
+        total = 0
+
+        while True:
+            with transaction.atomic():
+                pending = dict(
+                    queryset.select_for_update()
+                    .order_by('date_created')
+                    .values_list('instance_id', 'created')[:batch_size]
+                )
+                if not pending:
+                    break
+
+                created_ids_by_asset_uid = cls._write_pending_to_mongo(pending)
+                if created_ids_by_asset_uid:
+                    transaction.on_commit(
+                        partial(
+                            call_services_in_background.delay,
+                            created_ids_by_asset_uid,
+                        )
+                    )
+
+            total += len(pending)
+
+            if len(pending) < batch_size:
+                break
+
+            if time.monotonic() >= deadline:
+                logging.warning(
+                    f'XForm #{xform_id} - Pending Mongo writes could not be '
+                    f'flushed within {settings.MONGO_WRITE_BEHIND_READ_TIMEOUT}'
+                    ' seconds before reading'
+                )
+                break
+
+        return total
+
+    @classmethod
+    def _write_pending_to_mongo(cls, pending: dict) -> dict:
+        """
+        Upsert the Mongo documents of `pending` writes, a dict of
+        `created` flags by instance id, and dequeue them.
+
+        Return the ids of new submissions by asset uid, whose REST services
+        must be called.
+        """
+        parsed_instances = cls.objects.select_related(
+            'instance__user', 'instance__xform__user'
+        ).filter(instance_id__in=list(pending))
+
+        records = {}
+        asset_uids = {}
+        for parsed_instance in parsed_instances:
+            record = parsed_instance.to_dict_for_mongo()
+            # See `update_mongo()`
+            if record.get('_xform_id_string') is None:
+                continue
+            records[record['_id']] = record
+            asset_uids[record['_id']] = (
+                parsed_instance.instance.xform.kpi_asset_uid
+            )
+
+        if records:
+            try:
+                xform_instances.bulk_write(
+                    [
+                        ReplaceOne({'_id': id_}, record, upsert=True)
+                        for id_, record in records.items()
+                    ],
+                    ordered=False,
+                )
+            except PyMongoError as e:
+                raise Exception('Submissions could not be saved to Mongo') from e
+
+            Instance.objects.filter(pk__in=list(records)).update(
+                is_synced_with_mongo=True
+            )
+
+        PendingMongoWrite.objects.filter(instance_id__in=list(pending)).delete()
+
+        created_ids_by_asset_uid = {}
+        for instance_id, asset_uid in asset_uids.items():
+            if not pending[instance_id]:
+                continue
+            if asset_uid:
+                created_ids_by_asset_uid.setdefault(asset_uid, []).append(
+                    instance_id
+                )
+            elif not settings.TESTING:
+                logging.warning(
+                    f'Instance #: {instance_id} - XForm is not linked '
+                    f'with Asset'
+                )
+
+        return created_ids_by_asset_uid
+
+    @classmethod
+    def bulk_create_with_mongo(
+        cls, instances: list[Instance]
+    ) -> list['ParsedInstance']:
+        """
+        Create the `ParsedInstance` objects of newly created `instances` (which
+        must belong to the same XForm) and upsert their documents into Mongo
+        with a single `bulk_write()`.
+
+        Mongo is only written, and REST services called, once the current
+        transaction is committed. With `MONGO_WRITE_BEHIND`, writes are queued
+        like `save()` does.
+        """
+        parsed_instances = []
+        for instance in instances:
+            parsed_instance = cls(instance=instance)
+            parsed_instance._set_geopoint()
+            parsed_instances.append(parsed_instance)
+
+        cls.objects.bulk_create(parsed_instances)
+
+        if settings.MONGO_WRITE_BEHIND:
+            PendingMongoWrite.enqueue_many(instances, created=True)
+            transaction.on_commit(cls._schedule_mongo_writes_flush)
+            return parsed_instances
+
+        records = {}
+        for parsed_instance in parsed_instances:
+            record = parsed_instance.to_dict_for_mongo(is_new=True)
+            # See `update_mongo()`
+            if record.get('_xform_id_string') is not None:
+                records[record['_id']] = record
+
+        if not records:
+            return parsed_instances
+
+        xform = instances[0].xform
+
+        def _write_to_mongo():
+            try:
+                xform_instances.bulk_write(
+                    [
+                        ReplaceOne({'_id': id_}, record, upsert=True)
+                        for id_, record in records.items()
+                    ],
+                    ordered=False,
+                )
+            except PyMongoError:
+                # Submissions are saved, they stay flagged as not synced
+                # with Mongo
+                logging.error(
+                    f'XForm #: {xform.pk} - Submissions could not be saved '
+                    f'to Mongo',
+                    exc_info=True,
+                )
+                return
+
+            Instance.objects.filter(pk__in=list(records)).update(
+                is_synced_with_mongo=True
+            )
+
+            asset_uid = xform.kpi_asset_uid
+            if not asset_uid:
+                if not settings.TESTING:
+                    logging.warning(
+                        f'XForm #: {xform.pk} - XForm is not linked with Asset'
+                    )
+            else:
+                call_services_in_bulk(asset_uid, list(records))
+
+        transaction.on_commit(_write_to_mongo)
+        return parsed_instances
+
     @staticmethod
     def bulk_update_validation_statuses(query, validation_status):
         return xform_instances.update_many(
@@ -392,7 +677,7 @@ class ParsedInstance(models.Model):
             self.lat = self.instance.point.y
             self.lng = self.instance.point.x
 
-    def save(self, asynchronous=False, *args, **kwargs):
+    def save(self, asynchronous=False, write_behind=False, *args, **kwargs):
         # start/end_time obsolete: originally used to approximate for
         # instanceID, before instanceIDs were implemented
         created = self.pk is None
@@ -401,6 +686,10 @@ class ParsedInstance(models.Model):
         self._set_geopoint()
         super().save(*args, **kwargs)
 
+        if write_behind:
+            # REST services are called by `flush_pending_mongo_writes()`
+            return self.enqueue_mongo_write(created)
+
         # insert into Mongo.
         # Signal has been removed because of a race condition.
         # Rest Services were called before data was saved in DB.
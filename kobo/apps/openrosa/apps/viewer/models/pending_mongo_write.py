@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from kobo.apps.openrosa.apps.logger.models import Instance, XForm
+
+
+class PendingMongoWrite(models.Model):
+    """
+    Write-behind queue of submissions whose MongoDB document is out of date.
+
+    Rows are written in the same transaction as the submission itself, so the
+    queue survives worker or MongoDB outages. There is at most one row per
+    instance: enqueuing an instance which is already pending only bumps
+    `date_modified`, i.e. repeated edits are coalesced into one Mongo write.
+    """
+
+    instance = models.OneToOneField(
+        Instance,
+        primary_key=True,
+        related_name='pending_mongo_write',
+        on_delete=models.CASCADE,
+    )
+    xform = models.ForeignKey(XForm, on_delete=models.CASCADE)
+    # REST services must be called once the new submission reaches Mongo
+    created = models.BooleanField(default=False)
+    date_created = models.DateTimeField(default=timezone.now, db_index=True)
+    date_modified = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        app_label = 'viewer'
+
+    @classmethod
+    def enqueue(cls, instance: Instance, created: bool = False):
+        cls.enqueue_many([instance], created=created)
+
+    @classmethod
+    def enqueue_many(cls, instances: list[Instance], created: bool = False):
+        now = timezone.now()
+        # `created` and `date_created` are left untouched on conflict: the
+        # first enqueued write of an instance decides whether REST services
+        # must be called and how old the pending write is.
+        cls.objects.bulk_create(
+            [
+                cls(
+                    instance_id=instance.pk,
+                    xform_id=instance.xform_id,
+                    created=created,
+                    date_created=now,
+                    date_modified=now,
+                )
+                for instance in instances
+            ],
+            update_conflicts=True,
+            unique_fields=['instance'],
+            update_fields=['date_modified'],
+        )
+
+    @classmethod
+    def get_lag(cls) -> tuple[int, timedelta]:
+        """
+        Return the number of pending writes and the age of the oldest one
+        """
+        stats = cls.objects.aggregate(
+            count=Count('pk'), oldest=Min('date_created')
+        )
+        if not stats['count']:
+            return 0, timedelta(0)
+        return stats['count'], timezone.now() - stats['oldest']
@@ -0,0 +1,106 @@
+import os
+
+from django.conf import settings
+from django.test import override_settings
+
+from kobo.apps.openrosa.apps.main.tests.test_base import TestBase
+from kobo.apps.openrosa.apps.viewer.models import ParsedInstance, PendingMongoWrite
+
+
+@override_settings(MONGO_WRITE_BEHIND=True)
+class TestPendingMongoWrite(TestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.instances = settings.MONGO_DB.instances
+        self.instances.delete_many({})
+        self._publish_transportation_form()
+
+    def _submit(self, survey):
+        self._make_submission(
+            os.path.join(
+                self.this_directory,
+                'fixtures',
+                'transportation',
+                'instances',
+                survey,
+                survey + '.xml',
+            )
+        )
+
+    def test_submissions_are_written_on_flush(self):
+        self._submit(self.surveys[0])
+        self._submit(self.surveys[1])
+        self.assertEqual(PendingMongoWrite.objects.count(), 2)
+        self.assertEqual(self.instances.count_documents({}), 0)
+        count, _ = PendingMongoWrite.get_lag()
+        self.assertEqual(count, 2)
+
+        self.assertEqual(ParsedInstance.flush_pending_mongo_writes(), 2)
+        self.assertEqual(PendingMongoWrite.objects.count(), 0)
+        self.assertEqual(self.instances.count_documents({}), 2)
+        self.assertFalse(
+            self.xform.instances.filter(is_synced_with_mongo=False).exists()
+        )
+
+    def test_edits_are_coalesced(self):
+        self._submit(self.surveys[0])
+        instance = self.xform.instances.get()
+        instance.parsed_instance.save(write_behind=True)
+        self.assertEqual(PendingMongoWrite.objects.count(), 1)
+        self.assertTrue(PendingMongoWrite.objects.get().created)
+
+    def test_flush_by_xform(self):
+        self._submit(self.surveys[0])
+        self.assertEqual(
+            ParsedInstance.flush_pending_mongo_writes(
+                xform_id=self.xform.pk + 1
+            ),
+            0,
+        )
+        self.assertEqual(
+            ParsedInstance.flush_pending_mongo_writes(xform_id=self.xform.pk),
+            1,
+        )
+        self.assertEqual(self.instances.count_documents({}), 1)
+
+    @override_settings(MONGO_WRITE_BEHIND_BATCH_SIZE=1)
+    def test_flush_before_read(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                ParsedInstance.flush_pending_mongo_writes_before_read(
+                    self.xform.pk
+                ),
+                0,
+            )
+
+        self._submit(self.surveys[0])
+        self._submit(self.surveys[1])
+        self._submit(self.surveys[2])
+
+        # All pending writes are flushed, batch by batch, and REST services
+        # are called in background
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(
+                ParsedInstance.flush_pending_mongo_writes_before_read(
+                    self.xform.pk
+                ),
+                3,
+            )
+        self.assertEqual(len(callbacks), 3)
+        self.assertEqual(PendingMongoWrite.objects.count(), 0)
+        self.assertEqual(self.instances.count_documents({}), 3)
+
+    @override_settings(
+        MONGO_WRITE_BEHIND_BATCH_SIZE=1, MONGO_WRITE_BEHIND_READ_TIMEOUT=0
+    )
+    def test_flush_before_read_is_bounded(self):
+        self._submit(self.surveys[0])
+        self._submit(self.surveys[1])
+
+        # The first batch is flushed before the deadline is checked
+        self.assertEqual(
+            ParsedInstance.flush_pending_mongo_writes_before_read(self.xform.pk),
+            1,
+        )
+        self.assertEqual(PendingMongoWrite.objects.count(), 1)
@@ -1,9 +1,11 @@
 # coding: utf-8
 import json
 
+from django.conf import settings
 from rest_framework import serializers
 from kobo.apps.openrosa.apps.logger.models.attachment import Attachment
 from kobo.apps.openrosa.libs.utils.decorators import check_obj
+from kobo.apps.openrosa.libs.utils.image_tools import get_thumbnail_status
 
 
 def dict_key_for_value(_dict, value):
@@ -43,11 +45,13 @@ class AttachmentSerializer(serializers.ModelSerializer):
     xform = serializers.ReadOnlyField(source='instance.xform.pk')
     instance = serializers.ReadOnlyField(source='instance.pk')
     filename = serializers.ReadOnlyField(source='media_file.name')
+    thumbnail_status = serializers.SerializerMethodField()
 
     class Meta:
         fields = ('url', 'filename', 'mimetype', 'field_xpath', 'id', 'xform',
                   'instance', 'download_url', 'small_download_url',
-                  'medium_download_url', 'large_download_url')
+                  'medium_download_url', 'large_download_url',
+                  'thumbnail_status')
         lookup_field = 'pk'
         model = Attachment
 
@@ -67,6 +71,17 @@ class AttachmentSerializer(serializers.ModelSerializer):
         if obj.mimetype.startswith('image'):
             return obj.secure_url('large')
 
+    def get_thumbnail_status(self, obj):
+        if not obj.mimetype.startswith('image/') or not obj.media_file.name:
+            return None
+
+        # Do not hit the storage for each attachment of the list, let the
+        # task find out the status instead
+        status = get_thumbnail_status(obj.media_file.name, probe_storage=False)
+        if status is None and settings.THUMBNAIL_STATUS_CACHE_TIMEOUT:
+            obj.schedule_thumbnails(overwrite=False)
+        return status
+
     def get_field_xpath(self, obj):
         qa_dict = obj.instance.get_dict()
         if obj.filename not in qa_dict.values():
@@ -1,17 +1,23 @@
 # coding: utf-8
-from io import BytesIO
+import logging
 from tempfile import NamedTemporaryFile
+from typing import Optional
 
-import requests
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.base import ContentFile
-from django.core.files.storage import FileSystemStorage
 from PIL import Image
 
 from kobo.apps.openrosa.libs.utils.viewer_tools import get_optimized_image_path
 from kpi.deployment_backends.kc_access.storage import (
     default_kobocat_storage as default_storage,
 )
+from kpi.utils.hash import calculate_hash
+
+THUMBNAIL_STATUS_READY = 'ready'
+THUMBNAIL_STATUS_PENDING = 'pending'
+THUMBNAIL_STATUS_MISSING = 'missing'
+THUMBNAIL_STATUS_FAILED = 'failed'
 
 
 def flat(*nums):
@@ -38,6 +44,59 @@ def get_dimensions(size_, longest_side):
     return flat(width, height)
 
 
+def get_thumbnail_status(
+    filename: str, probe_storage: bool = True
+) -> Optional[str]:
+    """
+    Return whether all the thumbnails of `filename` exist on storage.
+
+    The status is kept in the shared cache to avoid hitting the storage for
+    each request. Entries of hot images are extended each time they are read.
+    On a cache miss, `None` is returned instead if `probe_storage` is False.
+    """
+    cache_key = _get_thumbnail_status_cache_key(filename)
+    timeout = settings.THUMBNAIL_STATUS_CACHE_TIMEOUT
+    if timeout and (status := cache.get(cache_key)):
+        if status == THUMBNAIL_STATUS_READY:
+            cache.touch(cache_key, timeout)
+        return status
+
+    if not probe_storage:
+        return None
+
+    status = THUMBNAIL_STATUS_MISSING
+    if thumbnails_exist(filename):
+        status = THUMBNAIL_STATUS_READY
+
+    set_thumbnail_status(filename, status)
+    return status
+
+
+def set_thumbnail_status(filename: str, status: Optional[str]):
+    """
+    Store the status of the thumbnails of `filename` in the shared cache,
+    or clear it if `status` is `None`.
+    """
+    cache_key = _get_thumbnail_status_cache_key(filename)
+    if status is None:
+        cache.delete(cache_key)
+        return
+
+    if timeout := settings.THUMBNAIL_STATUS_CACHE_TIMEOUT:
+        cache.set(cache_key, status, timeout)
+
+
+def thumbnails_exist(filename: str) -> bool:
+    return all(
+        default_storage.exists(get_optimized_image_path(filename, suffix))
+        for suffix in settings.THUMB_CONF
+    )
+
+
+def _get_thumbnail_status_cache_key(filename: str) -> str:
+    return f'thumbnail_status:{calculate_hash(filename)}'
+
+
 def _save_thumbnails(image, original_path, size, suffix):
     # Thumbnail format will be set by original file extension.
     # Use same format to keep transparency of GIF/PNG
@@ -69,33 +128,46 @@ def _save_thumbnails(image, original_path, size, suffix):
     nm.close()
 
 
-def resize(filename):
-    image = None
-    if isinstance(default_storage, FileSystemStorage):
-        path = default_storage.path(filename)
-        image = Image.open(path)
-        original_path = filename
-    else:
-        path = default_storage.url(filename)
-        original_path = filename
-        req = requests.get(path)
-        if req.status_code == 200:
-            im = BytesIO(req.content)
-            image = Image.open(im)
-
-    if image:
-        [
-            _save_thumbnails(
-                image, original_path, size, suffix
-            )
-            for suffix, size in settings.THUMB_CONF.items()
-        ]
+def resize(filename: str) -> bool:
+    """
+    Generate all the thumbnails configured in `settings.THUMB_CONF` for
+    `filename`, from the biggest to the smallest.
+
+    Return whether thumbnails have been generated.
+    """
+    sizes = sorted(
+        settings.THUMB_CONF.items(), key=lambda item: item[1], reverse=True
+    )
+    try:
+        with default_storage.open(filename, 'rb') as f:
+            image = Image.open(f)
+            # Let the JPEG decoder downscale the image while reading it,
+            # no need to decode all the pixels of a 12-megapixel photo to
+            # generate a 1280px thumbnail. It is a no-op for other formats.
+            image.draft(image.mode, get_dimensions(image.size, sizes[0][1]))
+            image.load()
+    except (IOError, SyntaxError) as e:
+        # `SyntaxError` is raised by PIL on some corrupted files
+        logging.warning(
+            f'Cannot generate thumbnails of {filename}: {e}', exc_info=True
+        )
+        set_thumbnail_status(filename, THUMBNAIL_STATUS_FAILED)
+        return False
+
+    for suffix, size in sizes:
+        _save_thumbnails(image, filename, size, suffix)
+
+    set_thumbnail_status(filename, THUMBNAIL_STATUS_READY)
+    return True
 
 
 def image_url(attachment, suffix):
     """
     Return url of an image given size(@param suffix)
-    e.g large, medium, small, or generate required thumbnail
+    e.g large, medium, small.
+
+    The url of the original image is returned until its thumbnails are ready,
+    missing ones are generated in background.
     """
     url = attachment.media_file.url
     if suffix == 'original':
@@ -103,22 +175,12 @@ def image_url(attachment, suffix):
     else:
         if suffix in settings.THUMB_CONF:
             filename = attachment.media_file.name
-            if default_storage.exists(filename):
-                if (
-                    default_storage.exists(
-                        get_optimized_image_path(filename, suffix)
-                    )
-                    and default_storage.size(
-                        get_optimized_image_path(filename, suffix)
-                    )
-                    > 0
-                ):
-                    url = default_storage.url(
-                        get_optimized_image_path(filename, suffix)
-                    )
-                else:
-                    resize(filename)
-                    return image_url(attachment, suffix)
-            else:
-                return None
+            status = get_thumbnail_status(filename)
+            if status == THUMBNAIL_STATUS_MISSING:
+                if not default_storage.exists(filename):
+                    return None
+                attachment.schedule_thumbnails()
+            if status != THUMBNAIL_STATUS_READY:
+                return url
+            url = default_storage.url(get_optimized_image_path(filename, suffix))
     return url
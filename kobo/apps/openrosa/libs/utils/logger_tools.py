@@ -24,6 +24,7 @@ from django.core.files.base import File
 from django.core.mail import mail_admins
 from django.db import connection, IntegrityError, transaction
 from django.db.models import Q
+from django.db.models.signals import post_save
 from django.http import (
     Http404,
     HttpResponse,
@@ -58,6 +59,7 @@ from kobo.apps.openrosa.apps.logger.models.xform import XLSFormError
 from kobo.apps.openrosa.apps.logger.signals import (
     post_save_attachment,
     pre_delete_attachment,
+    update_xform_counters_in_bulk,
     update_xform_daily_counter,
     update_xform_monthly_counter,
     update_xform_submission_count,
@@ -97,6 +99,138 @@ uuid_regex = re.compile(r'<formhub>\s*<uuid>\s*([^<]+)\s*</uuid>\s*</formhub>',
 mongo_instances = settings.MONGO_DB.instances
 
 
+def bulk_create_instances(
+    username: str,
+    xml_files: list[File],
+    status: str = 'submitted_via_web',
+    request: Optional['rest_framework.request.Request'] = None,
+) -> dict:
+    """
+    Create several new submissions of the same form at once.
+
+    The form is found with the first submission, and permissions and form
+    status are checked only once. Duplicates (by `xml_hash` or root UUID) are
+    detected with one query for the whole batch. `Instance` and
+    `ParsedInstance` objects are bulk-inserted, Mongo is written with a single
+    bulk operation and counters are incremented once per batch.
+
+    Edits and attachments are not supported, they must go through
+    `create_instance()`.
+
+    Return a dictionary with:
+    - `instances`: the created `Instance` objects per submission index
+    - `duplicates`: indexes of submissions which already exist
+    - `errors`: a dictionary of error messages per submission index
+
+    Errors which concern the whole batch (e.g. form not found, inactive or
+    permission denied) are raised like `create_instance()` does.
+    """
+    if username:
+        username = username.lower()
+
+    xmls = [smart_str(xml_file.read()) for xml_file in xml_files]
+    if not xmls:
+        raise InstanceEmptyError
+
+    xform = get_xform_from_submission(xmls[0], username)
+    check_submission_permissions(request, xform)
+    # Form and account statuses are the same for the whole batch
+    Instance(xform=xform).check_active(force=False)
+
+    submitted_by = (
+        get_database_user(request.user)
+        if request and request.user.is_authenticated
+        else None
+    )
+    data_dictionary = xform.data_dictionary()
+    survey_types = {}
+    errors = {}
+    candidates = {}
+    for index, xml in enumerate(xmls):
+        try:
+            if get_id_string_from_xml_str(xml) != xform.id_string:
+                errors[index] = t('Submission does not belong to this form')
+                continue
+            if not get_uuid_from_xml(xml):
+                errors[index] = t('Instance ID is required')
+                continue
+            if get_deprecated_uuid_from_xml(xml):
+                errors[index] = t('Edits are not supported in bulk')
+                continue
+            date_created = get_submission_date_from_xml(xml)
+            instance = Instance(
+                xml=xml, user=submitted_by, status=status, xform=xform
+            )
+            if date_created:
+                if not dj_timezone.is_aware(date_created):
+                    date_created = dj_timezone.make_aware(
+                        date_created, timezone.utc
+                    )
+                instance.date_created = date_created
+            instance.populate_fields(data_dictionary, survey_types)
+        except (ExpatError, ValueError):
+            errors[index] = t('Improperly formatted XML.')
+        except InstanceEmptyError:
+            errors[index] = t('Received empty submission. No instance was created')
+        except InstanceMultipleNodeError as e:
+            errors[index] = str(e)
+        else:
+            candidates[index] = instance
+
+    existing_hashes = set(
+        Instance.objects.filter(
+            xform__user_id=xform.user_id,
+            xml_hash__in={i.xml_hash for i in candidates.values()},
+        ).values_list('xml_hash', flat=True)
+    )
+    existing_root_uuids = set(
+        Instance.objects.filter(
+            xform_id=xform.pk,
+            root_uuid__in={i.root_uuid for i in candidates.values()},
+        ).values_list('root_uuid', flat=True)
+    )
+
+    duplicates = []
+    new_instances = {}
+    for index, instance in candidates.items():
+        if instance.xml_hash in existing_hashes:
+            duplicates.append(index)
+            continue
+        if instance.root_uuid in existing_root_uuids:
+            errors[index] = t('Submission with this instance ID already exists')
+            continue
+        # Detect duplicates within the batch as well
+        existing_hashes.add(instance.xml_hash)
+        existing_root_uuids.add(instance.root_uuid)
+        new_instances[index] = instance
+
+    with transaction.atomic():
+        try:
+            Instance.objects.bulk_create(new_instances.values())
+        except IntegrityError as e:
+            # Another request has created one of them in the meantime
+            if 'root_uuid' in str(e):
+                raise ConflictingSubmissionUUIDError
+            raise
+
+        ParsedInstance.bulk_create_with_mongo(list(new_instances.values()))
+
+        for instance in new_instances.values():
+            # Let other receivers (e.g. audit logs) know about new instances.
+            # Counters are skipped and updated only once below.
+            instance.defer_counting = True
+            post_save.send(sender=Instance, instance=instance, created=True)
+            del instance.defer_counting
+
+        update_xform_counters_in_bulk(xform, list(new_instances.values()))
+
+    return {
+        'instances': new_instances,
+        'duplicates': duplicates,
+        'errors': errors,
+    }
+
+
 def check_submission_permissions(
     request: 'rest_framework.request.Request', xform: XForm
 ):
@@ -184,7 +318,10 @@ def create_instance(
                 raise DuplicateInstanceError
             else:
                 # Update Mongo via the related ParsedInstance
-                existing_instance.parsed_instance.save(asynchronous=False)
+                existing_instance.parsed_instance.save(
+                    asynchronous=False,
+                    write_behind=settings.MONGO_WRITE_BEHIND,
+                )
                 return existing_instance
         else:
             instance = save_submission(
@@ -735,10 +872,10 @@ def save_submission(
         instance.save(update_fields=['date_created'])
 
     if instance.xform is not None:
-        pi, created = ParsedInstance.objects.get_or_create(instance=instance)
-
-    if not created:
-        pi.save(asynchronous=False)
+        pi = ParsedInstance.objects.filter(
+            instance=instance
+        ).first() or ParsedInstance(instance=instance)
+        pi.save(asynchronous=False, write_behind=settings.MONGO_WRITE_BEHIND)
 
     # Now that the slow tasks are complete and we are (hopefully!) close to the
     # end of the transaction, update the submission count if the `Instance` was
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_ownership', '0004_create_proxy_and_add_invite_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transferstatus',
+            name='checkpoint',
+            field=models.JSONField(default=dict),
+        ),
+    ]
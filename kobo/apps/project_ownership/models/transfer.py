@@ -19,6 +19,7 @@ from kpi.deployment_backends.kc_access.utils import (
 )
 from kpi.fields import KpiUidField
 from kpi.models import Asset, ObjectPermission
+from kpi.models.object_permission import invalidate_cached_permissions
 from kpi.models.abstract_models import AbstractTimeStampedModel
 
 from ..exceptions import TransferAlreadyProcessedException
@@ -180,6 +181,10 @@ class Transfer(AbstractTimeStampedModel):
         self.asset.permissions.filter(user=new_owner).delete()
         old_owner = self.asset.owner
         self.asset.owner = new_owner
+        # Owner's permissions are calculated from `Asset.owner`
+        invalidate_cached_permissions(
+            asset_ids=[self.asset.pk], user_ids=[old_owner.pk, new_owner.pk]
+        )
 
         if update_deployment:
             owner_perms = [
@@ -378,6 +383,8 @@ class TransferStatus(AbstractTimeStampedModel):
         db_index=True
     )
     error = models.TextField(null=True)
+    # Progress of resumable tasks, e.g. the last attachment moved
+    checkpoint = models.JSONField(default=dict)
 
     class Meta:
         constraints = [
@@ -0,0 +1,119 @@
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+from kobo.apps.openrosa.apps.logger.models.attachment import Attachment
+from kpi.models import Asset
+from kpi.tests.base_test_case import BaseAssetTestCase
+from ..models import (
+    Invite,
+    Transfer,
+    TransferStatusChoices,
+    TransferStatusTypeChoices,
+)
+from ..utils import move_attachments
+
+
+class ProjectOwnershipMoveAttachmentsTestCase(BaseAssetTestCase):
+
+    fixtures = ['test_data']
+
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()  # noqa
+        self.someuser = User.objects.get(username='someuser')
+        self.anotheruser = User.objects.get(username='anotheruser')
+        self.asset = Asset.objects.create(
+            content={
+                'survey': [
+                    {'type': 'audio', 'label': 'q1', '$kuid': 'abcd'},
+                    {'type': 'file', 'label': 'q2', '$kuid': 'efgh'},
+                ]
+            },
+            owner=self.someuser,
+            asset_type='survey',
+        )
+        self.asset.deploy(backend='mock', active=True)
+        self.__add_submissions()
+
+        invite = Invite.objects.create(
+            sender=self.someuser, recipient=self.anotheruser
+        )
+        # Simulate the beginning of the transfer: the project already belongs
+        # to the recipient and its submissions have been updated
+        Asset.objects.filter(pk=self.asset.pk).update(owner=self.anotheruser)
+        self.transfer = Transfer.objects.create(
+            invite=invite, asset=Asset.objects.get(pk=self.asset.pk)
+        )
+        self.transfer.statuses.filter(
+            status_type=TransferStatusTypeChoices.SUBMISSIONS
+        ).update(status=TransferStatusChoices.SUCCESS)
+
+    def __add_submissions(self):
+        v_uid = self.asset.latest_deployed_version.uid
+        _uuid = str(uuid.uuid4())
+        submission = {
+            '__version__': v_uid,
+            'q1': 'audio_conversion_test_clip.3gp',
+            'q2': 'audio_conversion_test_image.jpg',
+            '_uuid': _uuid,
+            '_attachments': [
+                {
+                    'download_url': 'http://testserver/someuser/audio_conversion_test_clip.3gp',  # noqa: E501
+                    'filename': 'someuser/audio_conversion_test_clip.3gp',
+                    'mimetype': 'video/3gpp',
+                },
+                {
+                    'download_url': 'http://testserver/someuser/audio_conversion_test_image.jpg',  # noqa: E501
+                    'filename': 'someuser/audio_conversion_test_image.jpg',
+                    'mimetype': 'image/jpeg',
+                },
+            ],
+            '_submitted_by': 'someuser',
+        }
+        self.asset.deployment.mock_submissions([submission])
+
+    @override_settings(PROJECT_OWNERSHIP_ATTACHMENTS_BATCH_SIZE=1)
+    def test_move_attachments_resumes_from_checkpoint(self):
+        first_attachment, second_attachment = Attachment.all_objects.filter(
+            instance__xform_id=self.asset.deployment.xform.pk
+        ).order_by('pk')
+        moved_attachment_ids = []
+        failing_attachment_ids = {second_attachment.pk}
+
+        def move(attachment, previous_owner_username, new_owner_username):
+            if attachment.pk in failing_attachment_ids:
+                failing_attachment_ids.remove(attachment.pk)
+                raise Exception('Storage is unavailable')
+            attachment.media_file.name = attachment.media_file.name.replace(
+                previous_owner_username, new_owner_username
+            )
+            moved_attachment_ids.append(attachment.pk)
+            return True
+
+        with patch(
+            'kobo.apps.project_ownership.utils._move_attachment_file',
+            side_effect=move,
+        ):
+            # The second batch fails, the first one is saved
+            with self.assertRaises(Exception):
+                move_attachments(self.transfer)
+            transfer_status = self.transfer.statuses.get(
+                status_type=TransferStatusTypeChoices.ATTACHMENTS
+            )
+            assert transfer_status.checkpoint == {
+                'last_attachment_id': first_attachment.pk
+            }
+            first_attachment.refresh_from_db()
+            assert first_attachment.media_file.name.startswith('anotheruser/')
+
+            # Only the second attachment is moved on retry
+            move_attachments(self.transfer)
+
+        assert moved_attachment_ids == [first_attachment.pk, second_attachment.pk]
+        second_attachment.refresh_from_db()
+        assert second_attachment.media_file.name.startswith('anotheruser/')
+        transfer_status.refresh_from_db()
+        assert transfer_status.status == TransferStatusChoices.SUCCESS
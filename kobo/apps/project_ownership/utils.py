@@ -1,8 +1,10 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Literal, Optional, Union
 
 from django.apps import apps
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
@@ -79,42 +81,63 @@ def move_attachments(transfer: 'project_ownership.Transfer'):
             '`_userform_id` has not been updated successfully'
         )
 
-    submissions = transfer.asset.deployment.get_submissions(
-        transfer.asset.owner, fields=['_id']
+    TransferStatus = apps.get_model('project_ownership', 'TransferStatus')  # noqa
+    transfer_status = TransferStatus.objects.get(
+        transfer_id=transfer.pk, status_type=async_task_type
     )
+    # Resume from the last batch saved if the task has been restarted
+    last_attachment_id = transfer_status.checkpoint.get('last_attachment_id', 0)
 
-    submission_ids = [
-        s['_id']
-        for s in submissions
-    ]
-
-    if not submission_ids:
-        _mark_task_as_successful(transfer, async_task_type)
-        return
-
-    attachments = Attachment.all_objects.filter(instance_id__in=submission_ids).exclude(
-        media_file__startswith=f'{transfer.asset.owner.username}/'
+    attachments = (
+        Attachment.all_objects.filter(
+            instance__xform_id=transfer.asset.deployment.xform.pk
+        )
+        .exclude(media_file__startswith=f'{transfer.asset.owner.username}/')
+        .only('pk', 'media_file')
+        .order_by('pk')
     )
+    batch_size = settings.PROJECT_OWNERSHIP_ATTACHMENTS_BATCH_SIZE
 
-    heartbeat = int(time.time())
     # Moving files is pretty slow, thus it should run in a celery task.
-    for attachment in attachments.iterator():
-        if not (
-            target_folder := get_target_folder(
-                transfer.invite.sender.username,
-                transfer.invite.recipient.username,
-                attachment.media_file.name,
-            )
+    # Files of each batch are moved concurrently, most of the time is spent
+    # waiting for the storage.
+    with ThreadPoolExecutor(
+        max_workers=settings.PROJECT_OWNERSHIP_ATTACHMENTS_MAX_WORKERS
+    ) as executor:
+        while batch := list(
+            attachments.filter(pk__gt=last_attachment_id)[:batch_size]
         ):
-            continue
-        else:
-            # There is no way to ensure atomicity when moving the file and saving the
-            # object to the database. Fingers crossed that the process doesn't get
-            # interrupted between these two operations.
-            attachment.media_file.move(target_folder)
-            attachment.save(update_fields=['media_file'])
-
-            heartbeat = _update_heartbeat(heartbeat, transfer, async_task_type)
+            futures = {
+                executor.submit(
+                    _move_attachment_file,
+                    attachment,
+                    transfer.invite.sender.username,
+                    transfer.invite.recipient.username,
+                ): attachment
+                for attachment in batch
+            }
+            moved_attachments = []
+            error = None
+            for future in as_completed(futures):
+                try:
+                    if future.result():
+                        moved_attachments.append(futures[future])
+                except Exception as e:
+                    error = e
+
+            # There is no way to ensure atomicity when moving the files and
+            # saving the objects to the database. Save what has been moved
+            # before bailing out, moved attachments are skipped on retry.
+            Attachment.all_objects.bulk_update(moved_attachments, ['media_file'])
+            if error:
+                raise error
+
+            last_attachment_id = batch[-1].pk
+            _save_checkpoint(
+                transfer,
+                async_task_type,
+                {'last_attachment_id': last_attachment_id},
+            )
 
     _mark_task_as_successful(transfer, async_task_type)
 
@@ -229,6 +252,36 @@ def _mark_task_as_successful(
     )
 
 
+def _move_attachment_file(
+    attachment: Attachment, previous_owner_username: str, new_owner_username: str
+) -> bool:
+    """
+    Move the file of `attachment` to the new owner's folder without saving
+    `attachment`. Return whether the file has been moved.
+
+    Run in worker threads, thus it must not touch the database.
+    """
+    if not (
+        target_folder := get_target_folder(
+            previous_owner_username,
+            new_owner_username,
+            attachment.media_file.name,
+        )
+    ):
+        return False
+
+    return bool(attachment.media_file.move(target_folder))
+
+
+def _save_checkpoint(
+    transfer: 'project_ownership.Transfer', async_task_type: str, checkpoint: dict
+):
+    # Saving the checkpoint updates the task heartbeat too.
+    transfer.statuses.filter(status_type=async_task_type).update(
+        checkpoint=checkpoint, date_modified=timezone.now()
+    )
+
+
 def _update_heartbeat(
     heartbeat: int, transfer: 'project_ownership.Transfer', async_task_type: str
 ) -> int:
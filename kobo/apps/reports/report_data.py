@@ -1,12 +1,17 @@
 # coding: utf-8
+import json
+import pickle
 from collections import OrderedDict
 from copy import deepcopy
 
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import gettext as t
 from rest_framework import serializers
 from formpack import FormPack
 
 from kpi.utils.bugfix import repair_file_column_content_and_save
+from kpi.utils.hash import calculate_hash
 from kpi.utils.log import logging
 from .constants import (
     FUZZY_VERSION_ID_KEY,
@@ -14,32 +19,53 @@ from .constants import (
 )
 
 
-def build_formpack(asset, submission_stream=None, use_all_form_versions=True):
+def get_formpack(asset, use_all_form_versions=True) -> tuple:
     """
-    Return a tuple containing a `FormPack` instance and the iterable stream of
-    submissions for the given `asset`. If `use_all_form_versions` is `False`,
-    then only the newest version of the form is considered, and all submissions
-    are assumed to have been collected with that version of the form.
+    Return a tuple containing the `FormPack` instance of `asset`, the ids of
+    its versions (newest first) and the `AssetVersion` objects it is built
+    from.
+
+    Compiling the schemas of many versions is slow, so the `FormPack` is
+    cached. The cache key contains the uid and modification date of each
+    version, thus deploying the asset (or renaming it) invalidates it.
+    Cached objects are unpickled on each call, so callers may modify them,
+    e.g. with `FormPack.extend_survey()`.
     """
-
-    # Cope with kobotoolbox/formpack#322, which wrote invalid content into the
-    # database
-    repair_file_column_content_and_save(asset)
-
+    # Only load what is needed to compute the cache key; the content of the
+    # versions is loaded on cache misses only
+    fields = ['id', 'uid', 'uid_aliases', '_reversion_version', 'date_modified']
     if asset.has_deployment:
         if use_all_form_versions:
-            _versions = asset.deployed_versions
+            _versions = list(asset.deployed_versions.only(*fields))
         else:
-            _versions = [asset.deployed_versions.first()]
+            _versions = [asset.deployed_versions.only(*fields).first()]
     else:
         # Use the newest version only if the asset was never deployed
-        _versions = [asset.asset_versions.first()]
+        _versions = [asset.asset_versions.only(*fields).first()]
+
+    cache_key = 'formpack:{}:{}'.format(
+        asset.uid,
+        calculate_hash(
+            json.dumps(
+                [
+                    asset.name,
+                    [[v.uid, v.date_modified.isoformat()] for v in _versions],
+                ]
+            )
+        ),
+    )
+    if cached := cache.get(cache_key):
+        pack, version_ids_newest_first = cached
+        return pack, version_ids_newest_first, _versions
 
+    versions_with_content = asset.asset_versions.in_bulk(
+        [v.pk for v in _versions]
+    )
     schemas = []
     version_ids_newest_first = []
     for v in _versions:
         try:
-            fp_schema = v.to_formpack_schema()
+            fp_schema = versions_with_content[v.pk].to_formpack_schema()
         # FIXME: should FormPack validation errors have their own
         # exception class?
         except TypeError as e:
@@ -61,6 +87,36 @@ def build_formpack(asset, submission_stream=None, use_all_form_versions=True):
     # FormPack() expects the versions to be ordered from oldest to newest
     pack = FormPack(versions=reversed(schemas), title=asset.name, id_string=asset.uid)
 
+    try:
+        cache.set(
+            cache_key,
+            (pack, version_ids_newest_first),
+            settings.FORMPACK_CACHE_TIMEOUT,
+        )
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        logging.warning(
+            f'Failed to cache formpack of asset {asset.uid}: {repr(e)}'
+        )
+
+    return pack, version_ids_newest_first, _versions
+
+
+def build_formpack(asset, submission_stream=None, use_all_form_versions=True):
+    """
+    Return a tuple containing a `FormPack` instance and the iterable stream of
+    submissions for the given `asset`. If `use_all_form_versions` is `False`,
+    then only the newest version of the form is considered, and all submissions
+    are assumed to have been collected with that version of the form.
+    """
+
+    # Cope with kobotoolbox/formpack#322, which wrote invalid content into the
+    # database
+    repair_file_column_content_and_save(asset)
+
+    pack, version_ids_newest_first, _versions = get_formpack(
+        asset, use_all_form_versions
+    )
+
     # Find the AssetVersion UID for each deprecated reversion ID
     _reversion_ids = dict([
         (str(v._reversion_version_id), v.uid)
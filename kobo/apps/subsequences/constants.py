@@ -10,6 +10,9 @@ GOOGLE_CODE = 'goog'
 
 ASYNC_TRANSLATION_DELAY_INTERVAL = 5
 
+# Number of submissions whose extras are fetched at once while streaming
+SUBMISSION_EXTRAS_BATCH_SIZE = 1000
+
 SUBSEQUENCES_ASYNC_CACHE_KEY = 'subsequences'
 # Google speech api limits audio to ~480 Minutes*
 # Processing time is not audio length, but it's an estimate
@@ -240,6 +240,34 @@ class TestSubmissionStream(TestCase):
         assert '_supplementalDetails' in output[1]
         # test other things?
 
+    def test_stream_with_extras_fetches_extras_per_batch(self):
+        def mock_submission_stream():
+            yield {'_uuid': 'aaa'}
+            yield {'_uuid': 'bbb'}
+            yield {'_uuid': 'ccc'}
+
+        asset = Asset.objects.create()
+        for submission_uuid in ['aaa', 'ccc']:
+            SubmissionExtras.objects.create(
+                asset=asset,
+                submission_uuid=submission_uuid,
+                content={'QQ': {'transcript': {'value': submission_uuid}}},
+            )
+
+        with self.assertNumQueries(2):
+            output = list(
+                stream_with_extras(mock_submission_stream(), asset, batch_size=2)
+            )
+
+        assert [s['_uuid'] for s in output] == ['aaa', 'bbb', 'ccc']
+        assert output[0]['_supplementalDetails']['QQ']['transcript'] == {
+            'value': 'aaa'
+        }
+        assert output[1]['_supplementalDetails'] == {}
+        assert output[2]['_supplementalDetails']['QQ']['transcript'] == {
+            'value': 'ccc'
+        }
+
     def test_stream_with_extras_handles_duplicated_submission_uuids(self):
         # Define submission data with duplicated UUIDs
         submissions = [
@@ -325,3 +353,36 @@ class TestSubmissionStream(TestCase):
                                 self.assertEqual(v, '')
                         else:
                             self.assertEqual(val, '')
+
+    def test_stream_with_extras_does_not_share_qual_definitions(self):
+        submission_uuid = '1c05898e-b43c-491d-814c-79595eb84e81'
+        other_submission_uuid = '4aa6f1b6-c9ba-4bd0-a1e9-23b2b4ee1a47'
+        SubmissionExtras.objects.create(
+            asset=self.asset,
+            submission_uuid=other_submission_uuid,
+            content=SubmissionExtras.objects.get(
+                submission_uuid=submission_uuid
+            ).content,
+        )
+
+        def mock_submission_stream():
+            yield {'_uuid': submission_uuid}
+            yield {'_uuid': other_submission_uuid}
+
+        output = list(stream_with_extras(mock_submission_stream(), self.asset))
+
+        qual_responses = output[0]['_supplementalDetails']['Tell_me_a_story'][
+            'qual'
+        ]
+        other_qual_responses = output[1]['_supplementalDetails'][
+            'Tell_me_a_story'
+        ]['qual']
+        qual_responses[0]['labels']['_default'] = 'Altered'
+        qual_responses[1]['val'][0]['labels']['_default'] = 'Altered'
+
+        assert other_qual_responses[0]['labels'] == {
+            '_default': 'When was this recorded?'
+        }
+        assert other_qual_responses[1]['val'][0]['labels'] == {
+            '_default': 'Public event'
+        }
@@ -1,10 +1,12 @@
 from collections import defaultdict
 from copy import deepcopy
+from itertools import islice
 
 from kobo.apps.openrosa.apps.logger.xform_instance_parser import remove_uuid_prefix
 from ..actions.automatic_transcription import AutomaticTranscriptionAction
 from ..actions.qual import QualAction
 from ..actions.translation import TranslationAction
+from ..constants import SUBMISSION_EXTRAS_BATCH_SIZE
 from .deprecation import get_sanitized_advanced_features, get_sanitized_dict_keys
 
 AVAILABLE_ACTIONS = (
@@ -128,11 +130,17 @@ def get_jsonschema(action_instances=(), url=None):
 SUPPLEMENTAL_DETAILS_KEY = '_supplementalDetails'
 
 
-def stream_with_extras(submission_stream, asset):
-    extras = dict(
-        asset.submission_extras.values_list('submission_uuid', 'content')
-    )
+def stream_with_extras(
+    submission_stream, asset, batch_size=SUBMISSION_EXTRAS_BATCH_SIZE
+):
+    """
+    Add supplemental details (e.g. transcripts, translations, qualitative
+    analysis responses) of `asset` to each submission of `submission_stream`.
 
+    Submissions are consumed `batch_size` at a time and only the extras of the
+    current batch are retrieved from the database. Thus, memory usage and
+    latency depend on the size of the stream, not on the size of the project.
+    """
     if asset.advanced_features and (
         advanced_features := get_sanitized_advanced_features(asset)
     ):
@@ -145,77 +153,120 @@ def stream_with_extras(submission_stream, asset):
     else:
         qual_survey = deepcopy(qual_survey)
 
-    # keys are question UUIDs, values are question definitions
+    # keys are question UUIDs, values are question definitions without their
+    # choices, ready to be merged into responses
     qual_questions_by_uuid = {}
     # outer keys are question UUIDs, inner keys are choice UUIDs, values are
     # choice definitions
     qual_choices_per_question_by_uuid = defaultdict(dict)
     for qual_q in qual_survey:
-        try:
-            choices = qual_q['choices']
-        except KeyError:
-            pass
-        else:
+        choices = qual_q.pop('choices', None)
+        if choices is not None:
             qual_choices_per_question_by_uuid[qual_q['uuid']] = {
                 c['uuid']: c for c in choices
             }
         qual_questions_by_uuid[qual_q['uuid']] = qual_q
 
-    for submission in submission_stream:
-        if SUBMISSION_UUID_FIELD in submission:
-            uuid = remove_uuid_prefix(submission[SUBMISSION_UUID_FIELD])
-        else:
-            uuid = submission['_uuid']
-
-        all_supplemental_details = deepcopy(extras.get(uuid, {}))
-        for supplemental_details in all_supplemental_details.values():
-            try:
-                all_qual_responses = supplemental_details['qual']
-            except KeyError:
-                continue
-            for qual_response in all_qual_responses:
+    for batch in _iter_batches(submission_stream, batch_size):
+        uuids = [_get_submission_uuid(submission) for submission in batch]
+        extras = dict(
+            asset.submission_extras.filter(
+                submission_uuid__in=set(uuids)
+            ).values_list('submission_uuid', 'content')
+        )
+        for uuid, submission in zip(uuids, batch):
+            # Copy is still needed because the same extras can be shared by
+            # several submissions with duplicated UUIDs.
+            all_supplemental_details = deepcopy(extras.get(uuid, {}))
+            for supplemental_details in all_supplemental_details.values():
                 try:
-                    qual_q = qual_questions_by_uuid[qual_response['uuid']]
+                    all_qual_responses = supplemental_details['qual']
                 except KeyError:
-                    # TODO: make sure this can never happen by refusing to
-                    # remove qualitative analysis questions once added. They
-                    # should simply be hidden
-                    qual_response['error'] = 'unknown question'
                     continue
-                qual_q = deepcopy(qual_q)
-                choices = qual_q.pop('choices', None)
-                if choices:
-                    val = qual_response['val']
-                    if isinstance(val, list):
-                        single_choice = False
-                    else:
-                        single_choice = True
-                        val = [val]
-                    val_expanded = []
-                    for v in val:
-                        if v == '':
-                            continue
-                        try:
-                            v_ex = qual_choices_per_question_by_uuid[
-                                qual_q['uuid']
-                            ][v]
-                        except KeyError:
-                            # TODO: make sure this can never happen by refusing
-                            # to remove qualitative analysis *choices* once
-                            # added. They should simply be hidden
-                            v_ex = {'uuid': v, 'error': 'unknown choice'}
-                        val_expanded.append(v_ex)
-                    if single_choice and val_expanded:
-                        val_expanded = val_expanded[0]
-                    qual_response['val'] = val_expanded
-                qual_response.update(qual_q)
-
-        # Remove `qpath` if present
-        if sanitized_suppl_details := get_sanitized_dict_keys(
-            all_supplemental_details, asset
-        ):
-            all_supplemental_details = sanitized_suppl_details
-
-        submission[SUPPLEMENTAL_DETAILS_KEY] = all_supplemental_details
-
-        yield submission
+                for qual_response in all_qual_responses:
+                    _expand_qual_response(
+                        qual_response,
+                        qual_questions_by_uuid,
+                        qual_choices_per_question_by_uuid,
+                    )
+
+            # Remove `qpath` if present
+            if sanitized_suppl_details := get_sanitized_dict_keys(
+                all_supplemental_details, asset
+            ):
+                all_supplemental_details = sanitized_suppl_details
+
+            submission[SUPPLEMENTAL_DETAILS_KEY] = all_supplemental_details
+
+            yield submission
+
+
+def _expand_qual_response(
+    qual_response: dict,
+    qual_questions_by_uuid: dict,
+    qual_choices_per_question_by_uuid: dict,
+):
+    """
+    Merge the question definition into `qual_response` and replace choice
+    UUIDs in its value with their definitions.
+    """
+    try:
+        qual_q = qual_questions_by_uuid[qual_response['uuid']]
+    except KeyError:
+        # TODO: make sure this can never happen by refusing to
+        # remove qualitative analysis questions once added. They
+        # should simply be hidden
+        qual_response['error'] = 'unknown question'
+        return
+
+    choices = qual_choices_per_question_by_uuid.get(qual_q['uuid'])
+    if choices:
+        val = qual_response['val']
+        if isinstance(val, list):
+            single_choice = False
+        else:
+            single_choice = True
+            val = [val]
+        val_expanded = []
+        for v in val:
+            if v == '':
+                continue
+            try:
+                v_ex = _copy_qual_definition(choices[v])
+            except KeyError:
+                # TODO: make sure this can never happen by refusing
+                # to remove qualitative analysis *choices* once
+                # added. They should simply be hidden
+                v_ex = {'uuid': v, 'error': 'unknown choice'}
+            val_expanded.append(v_ex)
+        if single_choice and val_expanded:
+            val_expanded = val_expanded[0]
+        qual_response['val'] = val_expanded
+    qual_response.update(_copy_qual_definition(qual_q))
+
+
+def _copy_qual_definition(definition: dict) -> dict:
+    """
+    Copy a qualitative analysis question or choice definition, shared by every
+    response of the stream, so that altering one submission does not alter the
+    others.
+
+    Definitions are flat, apart from small containers such as `labels`.
+    Copying them one level deep is enough and much cheaper than `deepcopy()`.
+    """
+    return {
+        key: value.copy() if isinstance(value, (dict, list)) else value
+        for key, value in definition.items()
+    }
+
+
+def _get_submission_uuid(submission: dict) -> str:
+    if SUBMISSION_UUID_FIELD in submission:
+        return remove_uuid_prefix(submission[SUBMISSION_UUID_FIELD])
+    return submission['_uuid']
+
+
+def _iter_batches(iterable, batch_size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
@@ -10,8 +10,19 @@ from celery import shared_task
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.core.files.storage import default_storage
-from django.db.models import CharField, Count, DateField, F, IntegerField, Sum, Value
-from django.db.models.functions import Cast, Concat
+from django.db.models import (
+    CharField,
+    Count,
+    DateField,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, Concat
 
 from hub.models import ExtraUserDetail
 from kobo.apps.kobo_auth.shortcuts import User
@@ -25,57 +36,123 @@ from kobo.apps.trackers.models import NLPUsageCounter
 from kobo.static_lists import COUNTRIES
 from kpi.constants import ASSET_TYPE_SURVEY
 from kpi.models.asset import Asset, AssetDeploymentStatus
+from kpi.utils.log import logging
 
 # Make sure this app is listed in `INSTALLED_APPS`; otherwise, Celery will
 # complain that the task is unregistered
 
+# Number of rows written between two progress updates
+PROGRESS_INTERVAL = 10000
+# Number of users whose `ExtraUserDetail` are fetched together
+EXTRA_USER_DETAILS_BATCH_SIZE = 1000
+
+
+def _count_subquery(queryset, field: str = 'user_id'):
+    """
+    Return a subquery counting the rows of `queryset` which match the outer
+    primary key. Unlike `Count()` on a relation, it does not multiply the
+    rows of the outer query.
+    """
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0,
+    )
+
 
-@shared_task
-def generate_country_report(output_filename: str, start_date: str, end_date: str):
+def _get_monthly_counters_by_date():
+    return MonthlyXFormSubmissionCounter.objects.annotate(
+        date=Cast(
+            Concat(F('year'), Value('-'), F('month'), Value('-'), 1),
+            DateField(),
+        )
+    )
 
-    def get_row_for_country(code_: str, label_: str):
-        row_ = []
 
-        xform_ids = Asset.objects.values_list(
-            '_deployment_data__backend_response__formid', flat=True
-        ).filter(
-            settings__country_codes__in_array=[code_],
-            _deployment_status=AssetDeploymentStatus.DEPLOYED,
-            asset_type=ASSET_TYPE_SURVEY,
+def _write_report(task, output_filename: str, columns: list, rows, total=None):
+    """
+    Write `rows`, which can be a generator, to `output_filename` as they come
+    and report progress through the Celery result backend.
+    """
+    count = 0
+    with default_storage.open(output_filename, 'w') as output:
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if count % PROGRESS_INTERVAL == 0:
+                _report_progress(task, output_filename, count, total)
+
+    _report_progress(task, output_filename, count, total)
+
+
+def _report_progress(task, output_filename: str, count: int, total=None):
+    logging.info(f'{output_filename}: {count} rows written out of {total}')
+    if task.request.id and not task.request.is_eager:
+        task.update_state(
+            state='PROGRESS', meta={'rows': count, 'total': total}
         )
-        # Doing it this way because this report is focused on crises in
-        # very specific time frames
-        instances_count = Instance.objects.filter(
-            xform_id__in=list(xform_ids),
-            date_created__date__range=(start_date, end_date),
-        ).count()
 
-        row_.append(label_)
-        row_.append(instances_count)
 
-        return row_
+@shared_task(bind=True)
+def generate_country_report(
+    self, output_filename: str, start_date: str, end_date: str
+):
+
+    # Each form is counted once for each of its countries
+    xform_ids_by_country = {}
+    assets = Asset.objects.values_list(
+        '_deployment_data__backend_response__formid', 'settings__country_codes'
+    ).filter(
+        _deployment_status=AssetDeploymentStatus.DEPLOYED,
+        asset_type=ASSET_TYPE_SURVEY,
+        settings__country_codes__isnull=False,
+    )
+    for xform_id, country_codes in assets.iterator():
+        if not xform_id or not isinstance(country_codes, list):
+            continue
+        for code in country_codes:
+            xform_ids_by_country.setdefault(code, set()).add(xform_id)
+
+    all_xform_ids = set().union(*xform_ids_by_country.values())
+    # Doing it this way because this report is focused on crises in
+    # very specific time frames
+    instances_count = dict(
+        Instance.objects.filter(
+            xform_id__in=list(all_xform_ids),
+            date_created__date__range=(start_date, end_date),
+        )
+        .values('xform_id')
+        .annotate(count=Count('pk'))
+        .order_by()
+        .values_list('xform_id', 'count')
+    )
+
+    def get_rows():
+        for code, label in COUNTRIES:
+            yield [
+                label,
+                sum(
+                    instances_count.get(xform_id, 0)
+                    for xform_id in xform_ids_by_country.get(code, [])
+                ),
+            ]
 
     columns = [
         'Country',
         'Count',
     ]
 
-    with default_storage.open(output_filename, 'w') as output_file:
-        writer = csv.writer(output_file)
-        writer.writerow(columns)
+    _write_report(self, output_filename, columns, get_rows(), len(COUNTRIES))
 
-        for code, label in COUNTRIES:
-
-            try:
-                row = get_row_for_country(code, label)
-            except Exception as e:
-                row = ['!FAILED!', 'Country: {}'.format(label), repr(e)]
-            writer.writerow(row)
 
-
-@shared_task
-def generate_continued_usage_report(output_filename: str, end_date: str):
-    data = []
+@shared_task(bind=True)
+def generate_continued_usage_report(self, output_filename: str, end_date: str):
 
     # We need to work with UTC timezone-aware datetime objects
     end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
@@ -86,57 +163,58 @@ def generate_continued_usage_report(output_filename: str, end_date: str):
 
     users = User.objects.filter(
         last_login__date__range=(twelve_months_time, end_date),
-    )
+    ).order_by('pk')
 
-    for user in users.iterator():
-        # twelve months
-        assets = user.assets.values('pk', 'date_created').filter(
+    # One grouped query per metric instead of several queries per user
+    asset_counts = {
+        record['owner_id']: record
+        for record in Asset.objects.filter(
+            owner__in=users,
             date_created__date__range=(twelve_months_time, end_date),
         )
-        submissions_count = MonthlyXFormSubmissionCounter.objects.annotate(
-            date=Cast(
-                Concat(F('year'), Value('-'), F('month'), Value('-'), 1),
-                DateField(),
-            )
-        ).filter(
-            user_id=user.id,
-            date__range=(twelve_months_time, end_date),
-        )
-        twelve_asset_count = assets.aggregate(asset_count=Count('pk'))
-        twelve_submission_count = submissions_count.aggregate(
-            submissions_count=Sum('counter'),
+        .values('owner_id')
+        .annotate(
+            twelve=Count('pk'),
+            six=Count('pk', filter=Q(date_created__gte=six_months_time)),
+            three=Count('pk', filter=Q(date_created__gte=three_months_time)),
         )
-
-        # six months
-        assets = assets.filter(date_created__gte=six_months_time)
-        submissions_count = submissions_count.filter(
-            date__gte=six_months_time,
+        .order_by()
+        .iterator()
+    }
+    submission_counts = {
+        record['user_id']: record
+        for record in _get_monthly_counters_by_date()
+        .filter(
+            user__in=users,
+            date__range=(twelve_months_time, end_date),
         )
-        six_asset_count = assets.aggregate(asset_count=Count('pk'))
-        six_submissions_count = submissions_count.aggregate(
-            submissions_count=Sum('counter'),
+        .values('user_id')
+        .annotate(
+            twelve=Sum('counter'),
+            six=Sum('counter', filter=Q(date__gte=six_months_time)),
+            three=Sum('counter', filter=Q(date__gte=three_months_time)),
         )
+        .order_by()
+        .iterator()
+    }
 
-        # three months
-        assets = assets.filter(date_created__gte=three_months_time)
-        submissions_count = submissions_count.filter(
-            date__gte=three_months_time,
-        )
-        three_asset_count = assets.aggregate(asset_count=Count('pk'))
-        three_submissions_count = submissions_count.aggregate(
-            submissions_count=Sum('counter'),
-        )
-        data.append([
-            user.username,
-            user.date_joined,
-            user.last_login,
-            three_asset_count['asset_count'] or 0,
-            six_asset_count['asset_count'] or 0,
-            twelve_asset_count['asset_count'] or 0,
-            three_submissions_count['submissions_count'] or 0,
-            six_submissions_count['submissions_count'] or 0,
-            twelve_submission_count['submissions_count'] or 0,
-        ])
+    def get_rows():
+        for user in users.values(
+            'pk', 'username', 'date_joined', 'last_login'
+        ).iterator():
+            assets = asset_counts.get(user['pk'], {})
+            submissions = submission_counts.get(user['pk'], {})
+            yield [
+                user['username'],
+                user['date_joined'],
+                user['last_login'],
+                assets.get('three') or 0,
+                assets.get('six') or 0,
+                assets.get('twelve') or 0,
+                submissions.get('three') or 0,
+                submissions.get('six') or 0,
+                submissions.get('twelve') or 0,
+            ]
 
     headers = [
         'Username',
@@ -150,10 +228,7 @@ def generate_continued_usage_report(output_filename: str, end_date: str):
         'Submissions 12M',
     ]
 
-    with default_storage.open(output_filename, 'w') as output:
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerows(data)
+    _write_report(self, output_filename, headers, get_rows(), users.count())
 
 
 @shared_task
@@ -263,93 +338,53 @@ def generate_forms_count_by_submission_range(output_filename: str):
         writer.writerows(data)
 
 
-@shared_task
-def generate_media_storage_report(output_filename: str):
-    attachments = UserProfile.objects.all().values(
+@shared_task(bind=True)
+def generate_media_storage_report(self, output_filename: str):
+    attachments = UserProfile.objects.all().values_list(
         'user__username',
         'attachment_storage_bytes',
     )
 
-    data = []
-
-    for attachment_count in attachments.iterator():
-        data.append(
-            [
-                attachment_count['user__username'],
-                attachment_count['attachment_storage_bytes'],
-            ]
-        )
-
     headers = ['Username', 'Storage Used (Bytes)']
 
-    with default_storage.open(output_filename, 'w') as output:
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerows(data)
+    _write_report(self, output_filename, headers, attachments.iterator())
 
 
-@shared_task
-def generate_user_report(output_filename: str):
+@shared_task(bind=True)
+def generate_user_report(self, output_filename: str):
     def format_date(d):
         if hasattr(d, 'strftime'):
             return d.strftime('%F')
         else:
             return d
 
-    def get_row_for_user(u: 'kobo_auth.User') -> list:
-        row_ = []
-
-        try:
-            profile = UserProfile.objects.get(user_id=u.pk)
-        except UserProfile.DoesNotExist:
-            profile = None
-
-        try:
-            extra_user_detail = ExtraUserDetail.objects.get(user_id=u.pk)
-        except ExtraUserDetail.DoesNotExist:
-            extra_details = None
-        else:
-            extra_details = extra_user_detail.data
-
-        row_.append(u.username)
-        row_.append(u.email)
-        row_.append(u.pk)
-        row_.append(u.first_name)
-        row_.append(u.last_name)
-
-        if extra_details:
-            name = extra_details.get('name', '')
-        else:
-            name = ''
-        if name:
-            row_.append(name)
-        elif profile:
-            row_.append(profile.name)
-        else:
-            row_.append('')
-
-        if extra_details:
-            organization = extra_details.get('organization', '')
-        else:
-            organization = ''
-        if organization:
-            row_.append(organization)
-        elif profile:
-            row_.append(profile.organization)
-        else:
-            row_.append('')
-
-        row_.append(XForm.objects.filter(user=u).count())
-
-        if profile:
-            row_.append(profile.num_of_submissions)
-        else:
-            row_.append(0)
-
-        row_.append(format_date(u.date_joined))
-        row_.append(format_date(u.last_login))
+    def get_row_for_user(u: dict) -> list:
+        extra_details = u['extra_details__data'] or {}
+        # `profile__*` values are `None` if the user has no profile
+        return [
+            u['username'],
+            u['email'],
+            u['pk'],
+            u['first_name'],
+            u['last_name'],
+            extra_details.get('name') or u['profile__name'] or '',
+            (
+                extra_details.get('organization')
+                or u['profile__organization']
+                or ''
+            ),
+            u['xform_count'],
+            u['profile__num_of_submissions'] or 0,
+            format_date(u['date_joined']),
+            format_date(u['last_login']),
+        ]
 
-        return row_
+    def get_rows():
+        for kc_user in kc_users.iterator(CHUNK_SIZE):
+            try:
+                yield get_row_for_user(kc_user)
+            except Exception as e:
+                yield ['!FAILED!', 'User PK: {}'.format(kc_user['pk']), repr(e)]
 
     CHUNK_SIZE = 1000
     columns = [
@@ -366,53 +401,57 @@ def generate_user_report(output_filename: str):
         'last_login',
     ]
 
-    with default_storage.open(output_filename, 'w') as output_file:
-        writer = csv.writer(output_file)
-        writer.writerow(columns)
-        kc_users = User.objects.exclude(pk=settings.ANONYMOUS_USER_ID).order_by('pk')
-        for kc_user in kc_users.iterator(CHUNK_SIZE):
-            try:
-                row = get_row_for_user(kc_user)
-            except Exception as e:
-                row = ['!FAILED!', 'User PK: {}'.format(kc_user.pk), repr(e)]
-            writer.writerow(row)
+    kc_users = (
+        User.objects.exclude(pk=settings.ANONYMOUS_USER_ID)
+        .annotate(xform_count=_count_subquery(XForm.objects.all()))
+        .values(
+            'pk',
+            'username',
+            'email',
+            'first_name',
+            'last_name',
+            'date_joined',
+            'last_login',
+            'xform_count',
+            'extra_details__data',
+            'profile__name',
+            'profile__organization',
+            'profile__num_of_submissions',
+        )
+        .order_by('pk')
+    )
 
+    _write_report(
+        self,
+        output_filename,
+        columns,
+        get_rows(),
+        User.objects.exclude(pk=settings.ANONYMOUS_USER_ID).count(),
+    )
 
-@shared_task
+
+@shared_task(bind=True)
 def generate_user_statistics_report(
+    self,
     output_filename: str,
     start_date: str,
     end_date: str
 ):
-    data = []
-
-    asset_queryset = Asset.objects.values(
-        'owner_id', 'owner__extra_details'
-    ).filter(
+    asset_queryset = Asset.objects.values('owner_id').filter(
         asset_type=ASSET_TYPE_SURVEY, date_created__date__range=(start_date, end_date)
     )
-    records = asset_queryset.annotate(form_count=Count('pk')).order_by()
-    forms_count = {
-        record['owner_id']: record['form_count'] for record in records
-    }
-
-    # Filter the asset_queryset for active deployments
-    asset_queryset = asset_queryset.filter(
-        _deployment_status=AssetDeploymentStatus.DEPLOYED
-    )
-    records = asset_queryset.annotate(deployment_count=Count('pk')).order_by()
-    deployment_count = {
-        record['owner_id']: record['deployment_count'] for record in records.iterator()
-    }
+    records = asset_queryset.annotate(
+        form_count=Count('pk'),
+        # Active deployments
+        deployment_count=Count(
+            'pk', filter=Q(_deployment_status=AssetDeploymentStatus.DEPLOYED)
+        ),
+    ).order_by()
+    asset_counts = {record['owner_id']: record for record in records.iterator()}
 
     # Get records from SubmissionCounter
     records = (
-        MonthlyXFormSubmissionCounter.objects.annotate(
-            date=Cast(
-                Concat(F('year'), Value('-'), F('month'), Value('-'), 1),
-                DateField(),
-            )
-        )
+        _get_monthly_counters_by_date()
         .filter(date__range=(start_date, end_date))
         .values(
             'user_id',
@@ -435,8 +474,13 @@ def generate_user_statistics_report(
             total_google_mt=Sum(
                 Cast(F('counters__google_mt_characters'), IntegerField()),
             ),
-        )
+        ).order_by()
     )
+    # Users will only have a counter if they have used NLP services in the
+    # specified period so a fallback is needed
+    nlp_totals_by_user = {
+        nlp_totals['user_id']: nlp_totals for nlp_totals in nlp_counters.iterator()
+    }
 
     def _get_country_value(value: Union[dict, list]) -> str:
         if isinstance(value, dict):
@@ -446,32 +490,44 @@ def generate_user_statistics_report(
 
         return value
 
-    for record in records.iterator():
-        user_id = record['user_id']
-        user_details, created = ExtraUserDetail.objects.get_or_create(
-            user_id=user_id
+    def get_rows():
+        user_ids = []
+        batch = []
+        for record in records.iterator():
+            user_ids.append(record['user_id'])
+            batch.append(record)
+            if len(batch) == EXTRA_USER_DETAILS_BATCH_SIZE:
+                yield from get_rows_for_batch(batch, user_ids)
+                user_ids = []
+                batch = []
+        yield from get_rows_for_batch(batch, user_ids)
+
+    def get_rows_for_batch(batch: list, user_ids: list):
+        user_details = dict(
+            ExtraUserDetail.objects.filter(user_id__in=user_ids).values_list(
+                'user_id', 'data'
+            )
         )
-        # Users will only have a counter if they have used NLP services in the
-        # specified period so a fallback is needed
-        try:
-            nlp_totals = nlp_counters.get(user_id=user_id)
-        except NLPUsageCounter.DoesNotExist:
-            nlp_totals = {}
-        data.append([
-            record['user__username'],
-            user_details.data.get('name', ''),
-            record['user__date_joined'],
-            record['user__email'],
-            user_details.data.get('organization_type', ''),
-            user_details.data.get('organization', ''),
-            user_details.data.get('organization_website', ''),
-            _get_country_value(user_details.data.get('country', '')),
-            record['count_sum'],
-            forms_count.get(user_id, 0),
-            deployment_count.get(user_id, 0),
-            nlp_totals.get('total_google_asr', 0),
-            nlp_totals.get('total_google_mt', 0),
-        ])
+        for record in batch:
+            user_id = record['user_id']
+            data = user_details.get(user_id) or {}
+            nlp_totals = nlp_totals_by_user.get(user_id, {})
+            assets = asset_counts.get(user_id, {})
+            yield [
+                record['user__username'],
+                data.get('name', ''),
+                record['user__date_joined'],
+                record['user__email'],
+                data.get('organization_type', ''),
+                data.get('organization', ''),
+                data.get('organization_website', ''),
+                _get_country_value(data.get('country', '')),
+                record['count_sum'],
+                assets.get('form_count', 0),
+                assets.get('deployment_count', 0),
+                nlp_totals.get('total_google_asr', 0),
+                nlp_totals.get('total_google_mt', 0),
+            ]
 
     columns = [
         'Username',
@@ -489,14 +545,12 @@ def generate_user_statistics_report(
         'Google MT Seconds',
     ]
 
-    with default_storage.open(output_filename, 'w') as output:
-        writer = csv.writer(output)
-        writer.writerow(columns)
-        writer.writerows(data)
+    _write_report(self, output_filename, columns, get_rows())
 
 
-@shared_task
+@shared_task(bind=True)
 def generate_user_details_report(
+    self,
     output_filename: str,
     start_date: str,
     end_date: str
@@ -566,19 +620,19 @@ def generate_user_details_report(
                 'extra_details__date_removal_requested', CharField()
             ),
             removed_date=Cast('extra_details__date_removed', CharField()),
-            asset_count=Count('assets'),
+            asset_count=_count_subquery(Asset.objects.all(), 'owner_id'),
         )
         .values(*values)
         .order_by('id')
     )
 
-    with default_storage.open(output_filename, 'w') as f:
-        columns = USER_COLS + EXTRA_DETAILS_COLS
-        writer = csv.writer(f)
-        writer.writerow(columns)
+    columns = USER_COLS + EXTRA_DETAILS_COLS
+
+    def get_rows():
         for row in data.iterator():
             metadata = row.pop('metadata', {}) or {}
             flatten_metadata_inplace(metadata)
             row.update(metadata)
-            flat_row = [get_row_value(row, col) for col in columns]
-            writer.writerow(flat_row)
+            yield [get_row_value(row, col) for col in columns]
+
+    _write_report(self, output_filename, columns, get_rows())
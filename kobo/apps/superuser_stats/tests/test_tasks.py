@@ -0,0 +1,188 @@
+import csv
+from datetime import datetime, timezone as dt_timezone
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from django.test import TestCase
+from django.utils import timezone
+
+from hub.models import ExtraUserDetail
+from kobo.apps.kobo_auth.shortcuts import User
+from kobo.apps.openrosa.apps.logger.models import MonthlyXFormSubmissionCounter
+from kobo.apps.openrosa.apps.main.models import UserProfile
+from kpi.models import Asset
+from ..tasks import (
+    generate_continued_usage_report,
+    generate_media_storage_report,
+    generate_user_statistics_report,
+)
+
+
+class SuperuserStatsReportsTestCase(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user(
+            username='alice',
+            password='alice',
+            email='alice@example.org',
+            date_joined=datetime(2024, 1, 5, tzinfo=dt_timezone.utc),
+            last_login=timezone.now(),
+        )
+        self.bob = User.objects.create_user(
+            username='bob',
+            password='bob',
+            email='bob@example.com',
+            date_joined=datetime(2024, 2, 5, tzinfo=dt_timezone.utc),
+        )
+        ExtraUserDetail.objects.update_or_create(
+            user=self.alice,
+            defaults={
+                'data': {
+                    'name': 'Alice',
+                    'organization': 'Alice Inc.',
+                    'organization_type': 'non-profit',
+                    'organization_website': 'https://example.org',
+                    'country': [
+                        {'value': 'CA', 'label': 'Canada'},
+                        {'value': 'FR', 'label': 'France'},
+                    ],
+                }
+            },
+        )
+        ExtraUserDetail.objects.update_or_create(
+            user=self.bob,
+            defaults={'data': {'country': {'value': 'KE', 'label': 'Kenya'}}},
+        )
+        self.output_filename = 'superuser_stats_test_report.csv'
+
+    def tearDown(self):
+        default_storage.delete(self.output_filename)
+
+    def _get_report(self) -> list:
+        with default_storage.open(self.output_filename, 'r') as output:
+            return list(csv.reader(output))
+
+    def test_continued_usage_report(self):
+        now = timezone.now()
+        Asset.objects.create(
+            content={'survey': [{'type': 'text', 'label': 'q1'}]},
+            owner=self.alice,
+            asset_type='survey',
+        )
+        MonthlyXFormSubmissionCounter.objects.create(
+            user=self.alice, year=now.year, month=now.month, counter=5
+        )
+
+        generate_continued_usage_report(
+            self.output_filename, now.date().isoformat()
+        )
+
+        self.alice.refresh_from_db()
+        # Bob has never logged in
+        assert self._get_report() == [
+            [
+                'Username',
+                'Date Joined',
+                'Last Login',
+                'Assets 3m',
+                'Assets 6m',
+                'Assets 12m',
+                'Submissions 3m',
+                'Submissions 6m',
+                'Submissions 12M',
+            ],
+            [
+                'alice',
+                str(self.alice.date_joined),
+                str(self.alice.last_login),
+                '1',
+                '1',
+                '1',
+                '5',
+                '5',
+                '5',
+            ],
+        ]
+
+    def test_media_storage_report(self):
+        UserProfile.objects.update_or_create(
+            user=self.alice, defaults={'attachment_storage_bytes': 1024}
+        )
+        UserProfile.objects.update_or_create(
+            user=self.bob, defaults={'attachment_storage_bytes': 0}
+        )
+
+        generate_media_storage_report(self.output_filename)
+
+        report = self._get_report()
+        assert report[0] == ['Username', 'Storage Used (Bytes)']
+        assert ['alice', '1024'] in report
+        assert ['bob', '0'] in report
+
+    def test_user_statistics_report(self):
+        for user, year, month, counter in [
+            (self.alice, 2024, 1, 3),
+            (self.alice, 2024, 3, 4),
+            (self.bob, 2024, 2, 2),
+            # Out of range
+            (self.bob, 2023, 1, 10),
+        ]:
+            MonthlyXFormSubmissionCounter.objects.create(
+                user=user, year=year, month=month, counter=counter
+            )
+
+        # Users are processed in several batches
+        with patch(
+            'kobo.apps.superuser_stats.tasks.EXTRA_USER_DETAILS_BATCH_SIZE', 1
+        ):
+            generate_user_statistics_report(
+                self.output_filename, '2024-01-01', '2024-12-31'
+            )
+
+        assert self._get_report() == [
+            [
+                'Username',
+                'Name',
+                'Date Joined',
+                'Email',
+                'Organization Type',
+                'Organization',
+                'Organization Website',
+                'Country',
+                'Submissions Count',
+                'Forms Count',
+                'Deployments Count',
+                'Google ASR Seconds',
+                'Google MT Seconds',
+            ],
+            [
+                'alice',
+                'Alice',
+                str(self.alice.date_joined),
+                'alice@example.org',
+                'non-profit',
+                'Alice Inc.',
+                'https://example.org',
+                'CA, FR',
+                '7',
+                '0',
+                '0',
+                '0',
+                '0',
+            ],
+            [
+                'bob',
+                '',
+                str(self.bob.date_joined),
+                'bob@example.com',
+                '',
+                '',
+                '',
+                'KE',
+                '2',
+                '0',
+                '0',
+                '0',
+                '0',
+            ],
+        ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.15 on 2026-10-18 19:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trackers', '0005_remove_year_and_month'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageRollup',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('submissions_all_time', models.BigIntegerField(default=0)),
+                ('submissions_current_period', models.BigIntegerField(default=0)),
+                ('asr_seconds_all_time', models.BigIntegerField(default=0)),
+                ('asr_seconds_current_period', models.BigIntegerField(default=0)),
+                ('mt_characters_all_time', models.BigIntegerField(default=0)),
+                (
+                    'mt_characters_current_period',
+                    models.BigIntegerField(default=0),
+                ),
+                ('date_modified', models.DateTimeField(auto_now=True)),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='usage_rollups',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('user', 'period_start'),
+                        name='unique_usage_rollup',
+                    )
+                ],
+            },
+        ),
+    ]
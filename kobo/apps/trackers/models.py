@@ -1,7 +1,10 @@
-from django.db import models
-from django.db.models import Q
+import datetime
+
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
 from django.db.models.constraints import UniqueConstraint
 from django.db.models.signals import post_delete
+from django.utils import timezone
 
 from kobo.apps.kobo_auth.shortcuts import User
 from .utils import update_nlp_counter
@@ -53,6 +56,132 @@ class NLPUsageCounter(models.Model):
             )
 
 
+class UsageRollup(models.Model):
+    """
+    Submission and NLP usage of an organization for one billing period.
+
+    Usage is tracked per user, i.e. per owner of the organization projects,
+    like the counters it is built from. The row is seeded from these counters
+    the first time it is read, then incremented every time they are
+    (see `increment()`), so that reading usage costs one query.
+    """
+
+    user = models.ForeignKey(
+        User, related_name='usage_rollups', on_delete=models.CASCADE
+    )
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    submissions_all_time = models.BigIntegerField(default=0)
+    submissions_current_period = models.BigIntegerField(default=0)
+    asr_seconds_all_time = models.BigIntegerField(default=0)
+    asr_seconds_current_period = models.BigIntegerField(default=0)
+    mt_characters_all_time = models.BigIntegerField(default=0)
+    mt_characters_current_period = models.BigIntegerField(default=0)
+    date_modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'period_start'], name='unique_usage_rollup'
+            ),
+        ]
+
+    @classmethod
+    def get_or_seed(
+        cls, user_id: int, period_start, period_end, seed, max_age=None
+    ) -> 'UsageRollup':
+        """
+        Return the rollup of `user_id` for the given billing period.
+
+        If it does not exist yet, the billing period has changed or it has not
+        been modified for more than `max_age` (a `timedelta`), it is
+        (re)initialized with the dict returned by `seed()` whose keys are
+        field names.
+        """
+        try:
+            rollup = cls.objects.get(
+                user_id=user_id, period_start=period_start, period_end=period_end
+            )
+        except cls.DoesNotExist:
+            pass
+        else:
+            if (
+                max_age is None
+                or rollup.date_modified >= timezone.now() - max_age
+            ):
+                return rollup
+
+        return cls.seed(user_id, period_start, period_end, seed)
+
+    @classmethod
+    def seed(cls, user_id: int, period_start, period_end, seed) -> 'UsageRollup':
+        """
+        (Re)initialize the rollup of `user_id` for the given billing period
+        with the dict returned by `seed()` whose keys are field names.
+        """
+        with transaction.atomic():
+            # Rollups of previous billing periods are not updated anymore
+            cls.objects.filter(
+                user_id=user_id, period_end__lte=period_start
+            ).delete()
+            # Lock the row to prevent `increment()` from updating it while
+            # the counters are summed
+            rollup, _ = cls.objects.select_for_update().get_or_create(
+                user_id=user_id,
+                period_start=period_start,
+                defaults={'period_end': period_end},
+            )
+            rollup.period_end = period_end
+            for field, value in seed().items():
+                setattr(rollup, field, value)
+            rollup.save()
+
+        return rollup
+
+    @classmethod
+    def increment(
+        cls,
+        user_id: int,
+        usage_date: datetime.date,
+        submissions: int = 0,
+        asr_seconds: int = 0,
+        mt_characters: int = 0,
+    ):
+        """
+        Add new usage of `usage_date` to the rollups of `user_id`.
+
+        All-time usage is always incremented, usage of the current period only
+        if `usage_date` falls within it, like the counters sum the rollup is
+        seeded from. Nothing happens if it has not been seeded yet.
+        """
+        in_period = Q(
+            period_start__date__lte=usage_date,
+            period_end__date__gte=usage_date,
+        )
+        updates = {}
+        for name, amount in (
+            ('submissions', submissions),
+            ('asr_seconds', asr_seconds),
+            ('mt_characters', mt_characters),
+        ):
+            if not amount:
+                continue
+            all_time_field = f'{name}_all_time'
+            current_period_field = f'{name}_current_period'
+            updates[all_time_field] = F(all_time_field) + amount
+            updates[current_period_field] = F(current_period_field) + Case(
+                When(in_period, then=Value(amount)),
+                default=Value(0),
+            )
+
+        if not updates:
+            return
+
+        cls.objects.filter(user_id=user_id).update(
+            date_modified=timezone.now(), **updates
+        )
+
+
 # signals are fired during cascade deletion (i.e. deletion initiated by the
 # removal of a related object), whereas the `delete()` model method is not
 # called
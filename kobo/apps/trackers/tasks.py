@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.utils import timezone
+
+from kobo.apps.kobo_auth.shortcuts import User
+from kobo.celery import celery_app
+from kpi.utils.usage_calculator import ServiceUsageCalculator
+from .models import UsageRollup
+
+
+@celery_app.task
+def reconcile_usage_rollups():
+    """
+    Reseed the usage rollups of ongoing billing periods from the counters,
+    to correct increments which were lost or counted twice.
+    """
+    if not settings.USAGE_ROLLUPS:
+        return
+
+    user_ids = (
+        UsageRollup.objects.filter(period_end__gt=timezone.now())
+        .order_by()
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    for user in User.objects.filter(pk__in=user_ids).iterator():
+        ServiceUsageCalculator(user, disable_cache=True).reseed_usage_rollup()
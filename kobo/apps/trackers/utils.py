@@ -35,7 +35,10 @@ def update_nlp_counter(
     """
     # Avoid circular import
     NLPUsageCounter = apps.get_model('trackers', 'NLPUsageCounter')  # noqa
+    UsageRollup = apps.get_model('trackers', 'UsageRollup')  # noqa
     organization = Organization.get_from_user_id(user_id)
+    # A counter is passed only to move usage to another counter
+    new_usage = not counter_id
 
     if not counter_id:
         date = timezone.now()
@@ -66,6 +69,14 @@ def update_nlp_counter(
         **kwargs,
     )
 
+    if new_usage:
+        UsageRollup.increment(
+            user_id,
+            date.date(),
+            asr_seconds=amount if service.endswith('asr_seconds') else 0,
+            mt_characters=amount if service.endswith('mt_characters') else 0,
+        )
+
 
 @cache_for_request
 def get_organization_usage(organization: Organization, usage_type: UsageType) -> int:
@@ -2,19 +2,23 @@
 from datetime import timedelta
 from unittest.mock import patch
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 from django_celery_beat.models import PeriodicTask
+from model_bakery import baker
 
 from kobo.apps.audit_log.audit_actions import AuditAction
 from kobo.apps.audit_log.models import AuditLog, AuditType
+from kobo.apps.openrosa.apps.logger.models import Instance
 from kpi.models import Asset
+from kpi.tests.utils import baker_generators  # noqa
 from ..constants import DELETE_PROJECT_STR_PREFIX, DELETE_USER_STR_PREFIX
 from ..models.account import AccountTrash
 from ..models.project import ProjectTrash
 from ..tasks import empty_account
-from ..utils import move_to_trash, put_back
+from ..utils import delete_asset, move_to_trash, put_back
 
 
 class AccountTrashTestCase(TestCase):
@@ -289,3 +293,39 @@ class ProjectTrashTestCase(TestCase):
             action=AuditAction.PUT_BACK,
             log_type=AuditType.ASSET_MANAGEMENT,
         ).exists()
+
+    @override_settings(SUBMISSION_DELETION_BATCH_SIZE=2)
+    def test_delete_asset_purges_submissions_by_batch(self):
+        settings.MONGO_DB.instances.drop()
+        someuser = get_user_model().objects.get(username='someuser')
+        asset = baker.make('kpi.Asset', owner=someuser, uid='assetUid')
+        asset.deploy(backend='mock', active=True)
+        submissions = [
+            {'q1': f'a{idx}', '__version__': asset.latest_deployed_version.uid}
+            for idx in range(5)
+        ]
+        asset.deployment.mock_submissions(submissions)
+        xform_id = asset.deployment.xform.pk
+        userform_id = asset.deployment.mongo_userform_id
+
+        delete_asset(someuser, asset)
+
+        assert not Instance.objects.filter(xform_id=xform_id).exists()
+        assert not settings.MONGO_DB.instances.count_documents(
+            {'_userform_id': userform_id}
+        )
+        # One audit log per batch, not per submission
+        audit_logs = AuditLog.objects.filter(
+            app_label='logger',
+            model_name='instance',
+            action=AuditAction.DELETE,
+            log_type=AuditType.SUBMISSION_MANAGEMENT,
+        ).order_by('pk')
+        assert [log.metadata['submission_count'] for log in audit_logs] == [
+            2,
+            2,
+            1,
+        ]
+        assert sorted(
+            uuid for log in audit_logs for uuid in log.metadata['uuids']
+        ) == sorted(submission['_uuid'] for submission in submissions)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import time
 from contextlib import contextmanager
 from copy import deepcopy
 from datetime import timedelta
@@ -8,7 +9,7 @@ from datetime import timedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError, models, transaction
-from django.db.models import F, Q
+from django.db.models import Q
 from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.utils import timezone
 from django_celery_beat.models import (
@@ -19,6 +20,7 @@ from django_celery_beat.models import (
 
 from kobo.apps.audit_log.audit_actions import AuditAction
 from kobo.apps.audit_log.models import AuditLog, AuditType
+from kobo.apps.openrosa.apps.logger.utils.instance import purge_instances
 from kpi.exceptions import InvalidXFormException, MissingXFormException
 from kpi.models import Asset, SubmissionExportTask, ImportTask
 from kpi.utils.log import logging
@@ -334,56 +336,40 @@ def _delete_submissions(request_author: settings.AUTH_USER_MODEL, asset: 'kpi.As
 
         return
 
-    while True:
-        audit_logs = []
-        submissions = list(
-            asset.deployment.get_submissions(
-                asset.owner,
-                fields=['_id', '_uuid'],
-                limit=settings.SUBMISSION_DELETION_BATCH_SIZE,
-            )
-        )
-        if not submissions:
-            if not (
-                queryset_or_false := asset.deployment.get_orphan_postgres_submissions()
-            ):
-                break
-
-            # Make submissions an iterable, similar to the output of
-            # `deployment.get_submissions()`.
-            if not (
-                submissions := queryset_or_false.annotate(
-                    _id=F('pk'), _uuid=F('uuid')
-                ).values('_id', '_uuid')[:settings.SUBMISSION_DELETION_BATCH_SIZE]
-            ):
-                break
-
-        submission_ids = []
-        for submission in submissions:
-            audit_logs.append(
-                AuditLog(
-                    app_label='logger',
-                    model_name='instance',
-                    object_id=submission['_id'],
-                    user=request_author,
-                    user_uid=request_author.extra_details.uid,
-                    metadata={
-                        'asset_uid': asset.uid,
-                        'uuid': submission['_uuid'],
-                    },
-                    action=AuditAction.DELETE,
-                    log_type=AuditType.SUBMISSION_MANAGEMENT,
-                )
-            )
+    xform = asset.deployment.xform
+    deleted_count = 0
+    start = time.monotonic()
 
-            submission_ids.append(submission['_id'])
-
-        asset.deployment.delete_submissions(
-            {'submission_ids': submission_ids, 'query': ''}, request_author
+    for submissions in purge_instances(
+        xform, settings.SUBMISSION_DELETION_BATCH_SIZE
+    ):
+        # One audit log per batch instead of one per submission
+        AuditLog.objects.create(
+            app_label='logger',
+            model_name='instance',
+            object_id=submissions[-1][0],
+            user=request_author,
+            user_uid=request_author.extra_details.uid,
+            metadata={
+                'asset_uid': asset.uid,
+                'submission_count': len(submissions),
+                'submission_ids': {
+                    'from': submissions[0][0],
+                    'to': submissions[-1][0],
+                },
+                'uuids': [uuid for _, uuid in submissions],
+            },
+            action=AuditAction.DELETE,
+            log_type=AuditType.SUBMISSION_MANAGEMENT,
         )
+        deleted_count += len(submissions)
 
-        if audit_logs:
-            AuditLog.objects.bulk_create(audit_logs)
+    if deleted_count:
+        duration = time.monotonic() - start
+        logging.info(
+            f'TrashBin: {deleted_count} submissions of {asset.uid} deleted '
+            f'in {duration:.1f}s ({deleted_count / max(duration, 0.001):.0f}/s)'
+        )
 
 
 def _get_settings(trash_type: str, retain_placeholder: bool = True) -> tuple:
@@ -882,6 +882,13 @@ MAXIMUM_EXPORTS_PER_USER_PER_FORM = 10
 
 MAX_RETRIES_FOR_IMPORT_EXPORT_TASK = 10
 
+# Size of the chunks used to upload export files written on disk first
+# (e.g. XLSX) to the storage. On S3, each chunk is sent as a part of a
+# multipart upload, thus it should not be lower than 5 MiB.
+EXPORT_UPLOAD_CHUNK_SIZE = env.int(
+    'EXPORT_UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024
+)
+
 # Private media file configuration
 PRIVATE_STORAGE_ROOT = os.path.join(BASE_DIR, 'media')
 PRIVATE_STORAGE_AUTH_FUNCTION = \
@@ -1233,6 +1240,25 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': timedelta(hours=6),
         'options': {'queue': 'kobocat_queue'}
     },
+    # Catch up with Mongo writes whose flush was not scheduled, e.g. because
+    # the broker was down
+    'flush-pending-mongo-writes': {
+        'task': 'kobo.apps.openrosa.apps.viewer.models.parsed_instance.flush_pending_mongo_writes',  # noqa
+        'schedule': timedelta(minutes=1),
+        'options': {'queue': 'kobocat_queue'}
+    },
+    # See `BUFFERED_SUBMISSION_COUNTERS`
+    'fold-submission-counters': {
+        'task': 'kobo.apps.openrosa.apps.logger.tasks.fold_submission_counters',
+        'schedule': timedelta(minutes=1),
+        'options': {'queue': 'kobocat_queue'}
+    },
+    # See `USAGE_ROLLUPS`
+    'reconcile-usage-rollups': {
+        'task': 'kobo.apps.trackers.tasks.reconcile_usage_rollups',
+        'schedule': crontab(hour=1, minute=0),
+        'options': {'queue': 'kpi_low_priority_queue'}
+    },
     'delete-daily-xform-submissions-counter': {
         'task': 'kobo.apps.openrosa.apps.logger.tasks.delete_daily_counters',
         'schedule': crontab(hour=0, minute=0),
@@ -1643,6 +1669,20 @@ MONGO_DB = mongo_client[mongo_db_name]
 MONGO_QUERY_TIMEOUT = SYNCHRONOUS_REQUEST_TIME_LIMIT + 5  # seconds
 MONGO_CELERY_QUERY_TIMEOUT = CELERY_TASK_TIME_LIMIT + 10  # seconds
 
+# Save submissions to Mongo from a Celery task instead of during the request.
+# See `kobo.apps.openrosa.apps.viewer.models.PendingMongoWrite`
+MONGO_WRITE_BEHIND = env.bool('MONGO_WRITE_BEHIND', False)
+MONGO_WRITE_BEHIND_BATCH_SIZE = env.int('MONGO_WRITE_BEHIND_BATCH_SIZE', 500)
+MONGO_WRITE_BEHIND_COUNTDOWN = env.int('MONGO_WRITE_BEHIND_COUNTDOWN', 2)  # seconds
+# Maximum time spent by a read to flush the pending writes of its form
+MONGO_WRITE_BEHIND_READ_TIMEOUT = env.int(
+    'MONGO_WRITE_BEHIND_READ_TIMEOUT', 10  # seconds
+)
+# Log a warning when the oldest pending write is older than this
+MONGO_WRITE_BEHIND_LAG_WARNING = env.int(
+    'MONGO_WRITE_BEHIND_LAG_WARNING', 300  # seconds
+)
+
 
 SESSION_ENGINE = 'redis_sessions.session'
 # django-redis-session expects a dictionary with `url`
@@ -1666,6 +1706,42 @@ CACHES = {
 # How long to retain cached responses for kpi endpoints
 ENDPOINT_CACHE_DURATION = env.int('ENDPOINT_CACHE_DURATION', 60 * 15)  # 15 minutes
 
+# How long to retain compiled form schemas used by reports and exports.
+# See `kobo.apps.reports.report_data.get_formpack()`
+FORMPACK_CACHE_TIMEOUT = env.int('FORMPACK_CACHE_TIMEOUT', 60 * 60 * 24)  # 1 day
+
+# How long to retain object permissions of assets and users in the shared
+# cache. Entries are invalidated as soon as permissions change.
+# See `kpi.models.object_permission.get_cached_permissions()`
+OBJECT_PERMISSIONS_CACHE_TIMEOUT = env.int(
+    'OBJECT_PERMISSIONS_CACHE_TIMEOUT', 60 * 60 * 24
+)  # 1 day
+
+# How long to remember whether thumbnails of an image attachment exist.
+# Entries of images which are requested often are extended on each read.
+# See `kobo.apps.openrosa.libs.utils.image_tools.get_thumbnail_status()`
+THUMBNAIL_STATUS_CACHE_TIMEOUT = env.int(
+    'THUMBNAIL_STATUS_CACHE_TIMEOUT', 60 * 60 * 24
+)  # 1 day
+
+# How long to retain the hash of all assets a user can view, polled by the
+# frontend to detect changes. Entries are voided as soon as one of the assets
+# gets a new version or permissions change.
+# See `kpi.utils.assets_hash.get_assets_hash()`
+ASSETS_HASH_CACHE_TIMEOUT = env.int(
+    'ASSETS_HASH_CACHE_TIMEOUT', 60 * 60 * 24
+)  # 1 day
+
+# REST Services: maximum number of submissions sent by one Celery task, number
+# of tasks allowed to send data to the same remote server at a time, and
+# requests per second each remote server can receive. Use 0 for no limits.
+# See `kobo.apps.hook.tasks.deliver_submissions_task()`
+HOOK_DELIVERY_BATCH_SIZE = env.int('HOOK_DELIVERY_BATCH_SIZE', 100)
+HOOK_ENDPOINT_MAX_CONCURRENCY = env.int('HOOK_ENDPOINT_MAX_CONCURRENCY', 4)
+HOOK_ENDPOINT_MAX_REQUESTS_PER_SECOND = env.int(
+    'HOOK_ENDPOINT_MAX_REQUESTS_PER_SECOND', 20
+)
+
 ENV = None
 
 # The maximum size in bytes that a request body may be before a
@@ -1799,6 +1875,16 @@ REVERSION_MIDDLEWARE_SKIPPED_URL_PATTERNS = {
     r'/api/v1/users/(.*)': ['DELETE']
 }
 DAILY_COUNTERS_MAX_DAYS = env.int('DAILY_COUNTERS_MAX_DAYS', 366)
+# Write submission counter increments to an append-only table, folded every
+# minute into the counters, instead of updating the counters of each form on
+# every submission. See `SubmissionCounterDelta`
+BUFFERED_SUBMISSION_COUNTERS = env.bool('BUFFERED_SUBMISSION_COUNTERS', False)
+# Read submission and NLP usage from `UsageRollup` (one row per organization
+# and billing period) instead of summing the counters
+USAGE_ROLLUPS = env.bool('USAGE_ROLLUPS', False)
+# Rollups are reconciled with the counters every day. The ones which have not
+# been modified for longer (in seconds) are summed from the counters again
+USAGE_ROLLUPS_MAX_AGE = env.int('USAGE_ROLLUPS_MAX_AGE', 60 * 60 * 24 * 2)
 
 USE_POSTGRESQL = True
 
@@ -1878,3 +1964,16 @@ IMPORT_EXPORT_CELERY_STORAGE_ALIAS = 'import_export_celery'
 ORG_INVITATION_RESENT_RESET_AFTER = 15 * 60  # in seconds
 
 SUBMISSION_DELETION_BATCH_SIZE = 1000
+
+# Maximum number of submissions accepted by the bulk submission endpoint
+SUBMISSION_BULK_MAX_COUNT = env.int('SUBMISSION_BULK_MAX_COUNT', 1000)
+
+# Number of attachments moved (and saved) together when a project changes
+# owner, and number of threads used to move their files concurrently.
+# See `kobo.apps.project_ownership.utils.move_attachments()`
+PROJECT_OWNERSHIP_ATTACHMENTS_BATCH_SIZE = env.int(
+    'PROJECT_OWNERSHIP_ATTACHMENTS_BATCH_SIZE', 500
+)
+PROJECT_OWNERSHIP_ATTACHMENTS_MAX_WORKERS = env.int(
+    'PROJECT_OWNERSHIP_ATTACHMENTS_MAX_WORKERS', 8
+)
@@ -40,6 +40,10 @@ ENKETO_INTERNAL_URL = 'http://enketo.mock'
 # cached values
 CONSTANCE_DATABASE_CACHE_BACKEND = None
 
+# Remote servers of REST Services are mocked
+HOOK_ENDPOINT_MAX_CONCURRENCY = 0
+HOOK_ENDPOINT_MAX_REQUESTS_PER_SECOND = 0
+
 if 'djstripe' not in INSTALLED_APPS:
     INSTALLED_APPS += ('djstripe', 'kobo.apps.stripe')
 STRIPE_ENABLED = True
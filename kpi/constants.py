@@ -1,7 +1,22 @@
 # coding: utf-8
+from formpack.constants import VALID_EXPORT_TYPES as FORMPACK_EXPORT_TYPES
+
 SUBMISSION_FORMAT_TYPE_XML = 'xml'
 SUBMISSION_FORMAT_TYPE_JSON = 'json'
 
+# Zip archive of submission attachments, handled by KPI instead of formpack
+EXPORT_TYPE_ATTACHMENTS = 'attachments'
+VALID_EXPORT_TYPES = tuple(FORMPACK_EXPORT_TYPES) + (EXPORT_TYPE_ATTACHMENTS,)
+
+SUBMISSION_COUNT_STRATEGY_EXACT = 'exact'
+SUBMISSION_COUNT_STRATEGY_ESTIMATED = 'estimated'
+SUBMISSION_COUNT_STRATEGY_NONE = 'none'
+SUBMISSION_COUNT_STRATEGIES = (
+    SUBMISSION_COUNT_STRATEGY_EXACT,
+    SUBMISSION_COUNT_STRATEGY_ESTIMATED,
+    SUBMISSION_COUNT_STRATEGY_NONE,
+)
+
 GEO_QUESTION_TYPES = ('geopoint', 'geotrace', 'geoshape')
 ATTACHMENT_QUESTION_TYPES = (
     'audit',
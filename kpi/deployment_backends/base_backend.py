@@ -28,6 +28,9 @@ from kpi.constants import (
     PERM_CHANGE_SUBMISSIONS,
     PERM_PARTIAL_SUBMISSIONS,
     PERM_VIEW_SUBMISSIONS,
+    SUBMISSION_COUNT_STRATEGIES,
+    SUBMISSION_COUNT_STRATEGY_EXACT,
+    SUBMISSION_COUNT_STRATEGY_NONE,
     SUBMISSION_FORMAT_TYPE_JSON,
     SUBMISSION_FORMAT_TYPE_XML,
 )
@@ -64,6 +67,7 @@ class BaseDeploymentBackend(abc.ABC):
         self.asset = asset
         # Python-only attribute used by `kpi.views.v2.data.DataViewSet.list()`
         self.current_submission_count = 0
+        self.current_submission_count_strategy = SUBMISSION_COUNT_STRATEGY_EXACT
         self.__stored_data_key = None
 
     @property
@@ -557,8 +561,16 @@ class BaseDeploymentBackend(abc.ABC):
             - fields
             - query
             - submission_ids
-        If `validate_count` is True,`start`, `limit`, `fields` and `sort` are
-        ignored.
+            - after
+            - count_strategy
+        If `validate_count` is True,`start`, `limit`, `fields`, `sort` and
+        `after` are ignored.
+        `after` enables keyset pagination: only submissions whose `_id` is
+        greater than its value are returned. It cannot be combined with `start`
+        or with a sort other than `_id` ascending.
+        `count_strategy` tells how the total count is computed: 'exact'
+        (default), 'estimated' (cached counters when nothing narrows down the
+        results, exact otherwise) or 'none' (same as `skip_count`).
         If `user` has partial permissions, conditions are
         applied to the query to narrow down results to what they are allowed
         to see. Partial permissions are validated with 'view_submissions' by
@@ -589,6 +601,11 @@ class BaseDeploymentBackend(abc.ABC):
                     'fields': t('This is not supported in `XML` format')
                 })
 
+            if mongo_query_params.get('after') is not None:
+                raise serializers.ValidationError({
+                    'after': t('This param is not supported in `XML` format')
+                })
+
         start = mongo_query_params.get('start', 0)
         limit = mongo_query_params.get('limit')
         sort = mongo_query_params.get('sort', {})
@@ -596,6 +613,10 @@ class BaseDeploymentBackend(abc.ABC):
         query = mongo_query_params.get('query', {})
         submission_ids = mongo_query_params.get('submission_ids', [])
         skip_count = mongo_query_params.get('skip_count', False)
+        after = mongo_query_params.get('after')
+        count_strategy = mongo_query_params.get(
+            'count_strategy', SUBMISSION_COUNT_STRATEGY_EXACT
+        )
 
         # I've copied these `ValidationError` messages verbatim from DRF where
         # possible.TODO: Should this validation be in (or called directly by)
@@ -659,6 +680,36 @@ class BaseDeploymentBackend(abc.ABC):
                     {'fields': t('Value must be valid JSON.')}
                 )
 
+        if count_strategy not in SUBMISSION_COUNT_STRATEGIES:
+            raise serializers.ValidationError(
+                {
+                    'count_strategy': t('Value must be one of: ##choices##').replace(
+                        '##choices##', ', '.join(SUBMISSION_COUNT_STRATEGIES)
+                    )
+                }
+            )
+
+        if skip_count:
+            count_strategy = SUBMISSION_COUNT_STRATEGY_NONE
+        elif count_strategy == SUBMISSION_COUNT_STRATEGY_NONE:
+            skip_count = True
+
+        if after is not None:
+            try:
+                after = positive_int(after)
+            except ValueError:
+                raise serializers.ValidationError(
+                    {'after': t('A positive integer is required.')}
+                )
+            if start:
+                raise serializers.ValidationError(
+                    {'start': t('This param cannot be used with `after`.')}
+                )
+            if sort and sort != {'_id': 1}:
+                raise serializers.ValidationError(
+                    {'sort': t('Only `{"_id": 1}` is supported with `after`.')}
+                )
+
         params = {
             'query': query,
             'start': start,
@@ -667,6 +718,8 @@ class BaseDeploymentBackend(abc.ABC):
             'submission_ids': submission_ids,
             'permission_filters': permission_filters,
             'skip_count': skip_count,
+            'after': after,
+            'count_strategy': count_strategy,
         }
 
         if limit:
@@ -37,6 +37,7 @@ from kobo.apps.openrosa.apps.logger.utils.instance import (
 )
 from kobo.apps.openrosa.apps.logger.xform_instance_parser import add_uuid_prefix
 from kobo.apps.openrosa.apps.main.models import MetaData, UserProfile
+from kobo.apps.openrosa.apps.viewer.models import ParsedInstance
 from kobo.apps.openrosa.libs.utils.logger_tools import create_instance, publish_xls_form
 from kobo.apps.subsequences.utils import stream_with_extras
 from kobo.apps.trackers.models import NLPUsageCounter
@@ -47,6 +48,9 @@ from kpi.constants import (
     PERM_PARTIAL_SUBMISSIONS,
     PERM_VALIDATE_SUBMISSIONS,
     PERM_VIEW_SUBMISSIONS,
+    SUBMISSION_COUNT_STRATEGY_ESTIMATED,
+    SUBMISSION_COUNT_STRATEGY_EXACT,
+    SUBMISSION_COUNT_STRATEGY_NONE,
     SUBMISSION_FORMAT_TYPE_JSON,
     SUBMISSION_FORMAT_TYPE_XML,
 )
@@ -1376,6 +1380,36 @@ class OpenRosaDeploymentBackend(BaseDeploymentBackend):
         file_.synced_with_backend = True
         file_.save(update_fields=['synced_with_backend'])
 
+    def __get_count_strategy(self, params: dict) -> tuple[str, Optional[int]]:
+        """
+        Pop `count_strategy` from `params` and return the strategy which is
+        actually used alongside the estimated count, if any.
+
+        The estimation relies on `XForm.num_of_submissions` and is only
+        trustworthy when nothing narrows down the results. Otherwise, it falls
+        back on an exact count.
+        """
+        count_strategy = params.pop('count_strategy', SUBMISSION_COUNT_STRATEGY_EXACT)
+        if count_strategy != SUBMISSION_COUNT_STRATEGY_ESTIMATED:
+            return count_strategy, None
+
+        if (
+            params.get('query')
+            or params.get('permission_filters')
+            or params.get('submission_ids')
+        ):
+            return SUBMISSION_COUNT_STRATEGY_EXACT, None
+
+        return count_strategy, self.xform.num_of_submissions
+
+    def __flush_pending_mongo_writes(self):
+        """
+        Make submissions saved with `MONGO_WRITE_BEHIND` visible to the
+        following Mongo query, i.e. let users read their own writes.
+        """
+        if settings.MONGO_WRITE_BEHIND:
+            ParsedInstance.flush_pending_mongo_writes_before_read(self.xform_id)
+
     def __get_submissions_in_json(
         self, request: Optional['rest_framework.request.Request'] = None, **params
     ) -> Generator[dict, None, None]:
@@ -1386,12 +1420,21 @@ class OpenRosaDeploymentBackend(BaseDeploymentBackend):
         # Apply a default sort of _id to prevent unpredictable natural sort
         if not params.get('sort'):
             params['sort'] = {'_id': 1}
+
+        count_strategy, estimated_count = self.__get_count_strategy(params)
+        if estimated_count is not None:
+            params['skip_count'] = True
+
+        self.__flush_pending_mongo_writes()
         mongo_cursor, total_count = MongoHelper.get_instances(
             self.mongo_userform_id, **params
         )
 
-        # Python-only attribute used by `kpi.views.v2.data.DataViewSet.list()`
-        self.current_submission_count = total_count
+        # Python-only attributes used by `kpi.views.v2.data.DataViewSet.list()`
+        self.current_submission_count = (
+            total_count if estimated_count is None else estimated_count
+        )
+        self.current_submission_count_strategy = count_strategy
 
         add_supplemental_details_to_query = self.asset.has_advanced_features
 
@@ -1417,6 +1460,9 @@ class OpenRosaDeploymentBackend(BaseDeploymentBackend):
         Submissions can be filtered with `params`.
         """
 
+        count_strategy, estimated_count = self.__get_count_strategy(params)
+        self.current_submission_count_strategy = count_strategy
+
         mongo_filters = ['query', 'permission_filters']
         use_mongo = any(
             mongo_filter in mongo_filters
@@ -1430,30 +1476,68 @@ class OpenRosaDeploymentBackend(BaseDeploymentBackend):
             # Force `sort` by `_id` for Mongo
             # See FIXME about sort in `BaseDeploymentBackend.validate_submission_list_params()`  # noqa: E501
             params['sort'] = {'_id': 1}
+            if estimated_count is not None:
+                params['skip_count'] = True
+            self.__flush_pending_mongo_writes()
             submissions, count = MongoHelper.get_instances(
                 self.mongo_userform_id, **params
             )
-            submission_ids = [submission.get('_id') for submission in submissions]
-            self.current_submission_count = count
+            # Python-only attribute used by `kpi.views.v2.data.DataViewSet.list()`
+            self.current_submission_count = (
+                count if estimated_count is None else estimated_count
+            )
+            # Data is already paginated by Mongo. Walk its cursor in batches to
+            # avoid holding all the ids in memory and building huge `IN` clauses.
+            return self.__stream_xml_from_mongo_cursor(submissions)
 
         queryset = Instance.objects.filter(xform_id=self.xform_id)
 
-        if len(submission_ids) > 0 or use_mongo:
+        if submission_ids := params.get('submission_ids'):
             queryset = queryset.filter(id__in=submission_ids)
 
         # Python-only attribute used by `kpi.views.v2.data.DataViewSet.list()`
-        if not use_mongo:
+        if estimated_count is not None:
+            self.current_submission_count = estimated_count
+        elif count_strategy == SUBMISSION_COUNT_STRATEGY_NONE:
+            self.current_submission_count = None
+        else:
             self.current_submission_count = queryset.count()
 
         # Force Sort by id
         # See FIXME about sort in `BaseDeploymentBackend.validate_submission_list_params()`  # noqa: E501
         queryset = queryset.order_by('id')
 
-        # When using Mongo, data is already paginated,
-        # no need to do it with PostgreSQL too.
-        if not use_mongo:
-            offset = params.get('start')
-            limit = offset + params.get('limit')
-            queryset = queryset[offset:limit]
+        offset = params.get('start')
+        limit = offset + params.get('limit')
+        queryset = queryset[offset:limit]
 
         return (lazy_instance.xml for lazy_instance in queryset)
+
+    def __stream_xml_from_mongo_cursor(
+        self, mongo_cursor
+    ) -> Generator[str, None, None]:
+        """
+        Yield XML of submissions matching `mongo_cursor` (sorted by `_id`)
+        `MongoHelper.DEFAULT_BATCHSIZE` at a time. Each batch is read from
+        PostgreSQL with a server-side cursor, in the same order.
+        """
+        batch_size = MongoHelper.DEFAULT_BATCHSIZE
+        submission_ids = []
+        for submission in mongo_cursor:
+            submission_ids.append(submission['_id'])
+            if len(submission_ids) >= batch_size:
+                yield from self.__get_xml_batch(submission_ids, batch_size)
+                submission_ids = []
+
+        if submission_ids:
+            yield from self.__get_xml_batch(submission_ids, batch_size)
+
+    def __get_xml_batch(
+        self, submission_ids: list[int], batch_size: int
+    ) -> Generator[str, None, None]:
+        queryset = (
+            Instance.objects.filter(xform_id=self.xform_id, id__in=submission_ids)
+            .order_by('id')
+            .values_list('xml', flat=True)
+        )
+        yield from queryset.iterator(chunk_size=batch_size)
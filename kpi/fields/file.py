@@ -28,23 +28,18 @@ class ExtendedFieldFile(FieldFile):
             self.name = new_path
             return True
 
-        upload_to = self.field.upload_to
-        # Temporary change `upload_to` - which is called internally by
-        # `self.save()` below - to new target folder
-        self.field.upload_to = lambda i, fn: posixpath.join(target_folder, fn)
-        success = False
+        # Save to the storage directly instead of calling `self.save()`, which
+        # would build the new name with the `upload_to` of the field
         try:
             with self.storage.open(old_path, 'rb') as f:
-                self.save(filename, f, save=False)
+                self.name = self.storage.save(
+                    posixpath.join(target_folder, filename), f
+                )
             self.storage.delete(old_path)
-            success = True
         except FileNotFoundError:
-            pass
-        finally:
-            # Restore `upload_to`
-            self.field.upload_to = upload_to
+            return False
 
-        return success
+        return True
 
 
 class ExtendedFileField(FileField):
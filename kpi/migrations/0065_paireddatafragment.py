@@ -0,0 +1,47 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kpi', '0064_create_projecthistorylogexporttask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PairedDataFragment',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('paired_data_uid', models.CharField(max_length=32)),
+                ('instance_id', models.IntegerField()),
+                ('xml_hash', models.CharField(max_length=255, null=True)),
+                ('fragment', models.TextField()),
+                (
+                    'asset',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='paired_data_fragments',
+                        to='kpi.asset',
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='paireddatafragment',
+            constraint=models.UniqueConstraint(
+                fields=('paired_data_uid', 'instance_id'),
+                name='unique_paired_data_fragment',
+            ),
+        ),
+    ]
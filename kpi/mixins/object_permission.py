@@ -26,7 +26,9 @@ from kpi.deployment_backends.kc_access.utils import (
     kc_transaction_atomic,
     remove_applicable_kc_permissions,
 )
-from kpi.models.object_permission import ObjectPermission
+from kpi.models.object_permission import ObjectPermission, get_cached_permissions
+from kpi.utils.cache import void_cache_for_request
+from kpi.utils.hash import calculate_hash
 from kpi.utils.object_permission import (
     get_database_user,
     perm_parse,
@@ -39,6 +41,8 @@ from kpi.utils.project_views import (
     user_has_project_view_asset_perm,
 )
 
+PERMISSION_RECALC_BATCH_SIZE = 1000
+
 
 class ObjectPermissionMixin:
     """
@@ -170,16 +174,7 @@ class ObjectPermissionMixin:
         only those permissions that apply to the content_type of this object
         and are listed in settings.ALLOWED_ANONYMOUS_PERMISSIONS.
         """
-        content_type = ContentType.objects.get_for_model(self)
-        # Translate settings.ALLOWED_ANONYMOUS_PERMISSIONS to primary keys
-        codenames = set()
-        for perm in settings.ALLOWED_ANONYMOUS_PERMISSIONS:
-            app_label, codename = perm_parse(perm)
-            if app_label == content_type.app_label:
-                codenames.add(codename)
-        allowed_permission_ids = Permission.objects.filter(
-            content_type_id=content_type.pk, codename__in=codenames
-        ).values_list('pk', flat=True)
+        allowed_permission_ids = self._get_allowed_anonymous_permission_ids()
         filtered_set = copy.copy(unfiltered_set)
         for user_id, permission_id in unfiltered_set:
             if user_id == settings.ANONYMOUS_USER_ID:
@@ -187,6 +182,59 @@ class ObjectPermissionMixin:
                     filtered_set.remove((user_id, permission_id))
         return filtered_set
 
+    @classmethod
+    def _get_allowed_anonymous_permission_ids(cls) -> set[int]:
+        """
+        Translate settings.ALLOWED_ANONYMOUS_PERMISSIONS to primary keys of
+        permissions which apply to the content_type of this model.
+        """
+        app_label = ContentType.objects.get_for_model(cls).app_label
+        permission_ids = cls._get_permission_ids()
+        allowed_permission_ids = set()
+        for perm in settings.ALLOWED_ANONYMOUS_PERMISSIONS:
+            perm_app_label, codename = perm_parse(perm)
+            if perm_app_label == app_label and codename in permission_ids:
+                allowed_permission_ids.add(permission_ids[codename])
+        return allowed_permission_ids
+
+    @classmethod
+    def _get_permission_ids(cls) -> dict[str, int]:
+        """
+        Return a process-wide translation table from the codenames of the
+        permissions of this model to their primary keys. Permissions only
+        change with migrations.
+        """
+        # Look up in `cls.__dict__` to give each model its own table
+        if (permission_ids := cls.__dict__.get('_permission_ids')) is None:
+            content_type = ContentType.objects.get_for_model(cls)
+            permission_ids = dict(
+                Permission.objects.filter(content_type=content_type).values_list(
+                    'codename', 'pk'
+                )
+            )
+            cls._permission_ids = permission_ids
+        return permission_ids
+
+    @classmethod
+    def _get_heritable_permission_ids(cls) -> dict[int, int]:
+        """
+        Return a process-wide translation table from the primary key of a
+        parent's permission to the primary key of the permission its children
+        inherit, based on `HERITABLE_PERMISSIONS`.
+        """
+        if (heritable_ids := cls.__dict__.get('_heritable_permission_ids')) is None:
+            permission_ids = cls._get_permission_ids()
+            heritable_ids = {
+                permission_ids[parent_codename]: permission_ids[child_codename]
+                for parent_codename, child_codename in (
+                    cls.HERITABLE_PERMISSIONS.items()
+                )
+                if parent_codename in permission_ids
+                and child_codename in permission_ids
+            }
+            cls._heritable_permission_ids = heritable_ids
+        return heritable_ids
+
     def _get_effective_perms(
         self, user=None, codename=None, include_calculated=True
     ):
@@ -251,112 +299,176 @@ class ObjectPermissionMixin:
             return effective_perms
 
     def recalculate_descendants_perms(self):
+        """
+        Recalculate the inherited permissions of all descendants at once.
+
+        The whole tree of descendants is loaded one level at a time, and their
+        inherited permissions are computed in memory from their parent's
+        effective permissions before being written in bulk.
+        """
         if self.asset_type not in ASSET_TYPES_WITH_CHILDREN:
             # It's impossible for us to have descendants. Move along...
             return
-        children = list(self.children.only('pk', 'owner', 'parent'))
-        if not children:
-            return
-        effective_perms = self._get_effective_perms(include_calculated=False)
-        for child in children:
-            # remove stale inherited perms
-            child.permissions.filter(inherited=True).delete()
-            # calc the new ones
-            child._recalculate_inherited_perms(
-                parent_effective_perms=effective_perms,
-                stale_already_deleted=True,
-                #return_instead_of_creating=True
+
+        anonymous_permission_ids = self._get_allowed_anonymous_permission_ids()
+        inherited_perms = {}
+        # Effective permissions of the parents of the level being processed
+        parents_effective_perms = {
+            self.pk: self._get_effective_perms(include_calculated=False)
+        }
+        while parents_effective_perms:
+            children = list(
+                self.__class__.objects.filter(
+                    parent_id__in=list(parents_effective_perms)
+                ).only('pk', 'owner', 'parent', 'asset_type')
             )
-            # recurse!
-            child.recalculate_descendants_perms()
-
-    def _recalculate_inherited_perms(
-            self,
-            parent_effective_perms=None,
-            stale_already_deleted=False,
-            return_instead_of_creating=False,
-            translate_perm={}  # mutable default parameter serves as cache
-    ):
+            explicit_perms = self._get_explicit_perms(
+                [child.pk for child in children if child.pk not in inherited_perms]
+            )
+            next_parents_effective_perms = {}
+            for child in children:
+                if child.pk in inherited_perms:
+                    # Should never happen, but protect against loops
+                    continue
+                child_inherited_perms = child._get_inherited_perms(
+                    parents_effective_perms[child.parent_id]
+                )
+                inherited_perms[child.pk] = child_inherited_perms
+                if child.asset_type not in ASSET_TYPES_WITH_CHILDREN:
+                    continue
+                grant_perms, deny_perms = explicit_perms[child.pk]
+                next_parents_effective_perms[child.pk] = {
+                    (user_id, permission_id)
+                    for user_id, permission_id in (
+                        (grant_perms | child_inherited_perms) - deny_perms
+                    )
+                    if user_id != settings.ANONYMOUS_USER_ID
+                    or permission_id in anonymous_permission_ids
+                }
+            parents_effective_perms = next_parents_effective_perms
+
+        self._apply_inherited_perms(inherited_perms)
+
+    def _recalculate_inherited_perms(self, parent_effective_perms=None):
         """
         Copy all of our parent's effective permissions to ourself,
         marking the copies as inherited permissions. The owner's rights are
         also made explicit as "inherited" permissions.
         """
-        # Start with a clean slate
-        if not stale_already_deleted:
-            self.permissions.filter(inherited=True).delete()
-        content_type = ContentType.objects.get_for_model(self)
-        if return_instead_of_creating:
-            # Conditionally create this so that Python will raise an exception
-            # if we use it when we're not supposed to
-            objects_to_return = []
-        # The owner gets every assignable permission
-        if self.owner_id is not None:
-            for perm in Permission.objects.filter(
-                content_type=content_type,
-                codename__in=self.get_assignable_permissions(
-                    with_partial=False,
-                ),
-            ):
-                new_permission = ObjectPermission()
-                new_permission.asset = self
-                # `user_id` instead of `user` is another workaround for
-                # migrations
-                new_permission.user_id = self.owner_id
-                new_permission.permission = perm
-                new_permission.inherited = True
-                new_permission.uid = new_permission._meta.get_field(
-                    'uid').generate_uid()
-                if return_instead_of_creating:
-                    objects_to_return.append(new_permission)
-                else:
-                    new_permission.save()
-        # Is there anything to inherit?
-        if self.parent is not None:
+        if self.parent is not None and parent_effective_perms is None:
             # Get our parent's effective permissions from the database if they
             # were not passed in as an argument
-            if parent_effective_perms is None:
-                parent_effective_perms = self.parent._get_effective_perms(
-                    include_calculated=False)
-            # All our parent's effective permissions become our inherited
-            # permissions. Store translations in the translate_perm dictionary
-            # to minimize invocations of the Django machinery
+            parent_effective_perms = self.parent._get_effective_perms(
+                include_calculated=False
+            )
+        self._apply_inherited_perms(
+            {self.pk: self._get_inherited_perms(parent_effective_perms)}
+        )
+
+    def _get_inherited_perms(
+        self, parent_effective_perms: Optional[set] = None
+    ) -> set[tuple[int, int]]:
+        """
+        Return the inherited permissions this object should have, as a set of
+        tuples in the format (user_id, permission_id).
+        """
+        inherited_perms = set()
+        # The owner gets every assignable permission
+        if self.owner_id is not None:
+            permission_ids = self._get_permission_ids()
+            for codename in self.get_assignable_permissions(with_partial=False):
+                if codename in permission_ids:
+                    inherited_perms.add((self.owner_id, permission_ids[codename]))
+
+        # All our parent's effective permissions become our inherited
+        # permissions
+        if self.parent_id is not None and parent_effective_perms:
+            heritable_permission_ids = self._get_heritable_permission_ids()
             for user_id, permission_id in parent_effective_perms:
                 if user_id == self.owner_id:
                     # The owner already has every assignable permission
                     continue
                 try:
-                    translated_id = translate_perm[permission_id]
+                    inherited_perms.add(
+                        (user_id, heritable_permission_ids[permission_id])
+                    )
                 except KeyError:
-                    parent_perm = Permission.objects.get(pk=permission_id)
-                    try:
-                        translated_codename = self.HERITABLE_PERMISSIONS[
-                            parent_perm.codename
-                        ]
-                    except KeyError:
-                        # We haven't been configured to inherit this
-                        # permission from our parent, so skip it
-                        continue
-                    translated_id = Permission.objects.get(
-                        content_type__app_label=\
-                            parent_perm.content_type.app_label,
-                        codename=translated_codename
-                    ).pk
-                    translate_perm[permission_id] = translated_id
-                permission_id = translated_id
-                new_permission = ObjectPermission()
-                new_permission.asset = self
-                new_permission.user_id = user_id
-                new_permission.permission_id = permission_id
-                new_permission.inherited = True
-                new_permission.uid = new_permission._meta.get_field(
-                    'uid').generate_uid()
-                if return_instead_of_creating:
-                    objects_to_return.append(new_permission)
+                    # We haven't been configured to inherit this
+                    # permission from our parent, so skip it
+                    continue
+
+        return inherited_perms
+
+    @staticmethod
+    def _get_explicit_perms(object_ids: list[int]) -> dict[int, tuple[set, set]]:
+        """
+        Return the explicitly-assigned grant and deny permissions of several
+        objects, as sets of tuples in the format (user_id, permission_id).
+        """
+        explicit_perms = defaultdict(lambda: (set(), set()))
+        for idx in range(0, len(object_ids), PERMISSION_RECALC_BATCH_SIZE):
+            records = ObjectPermission.objects.filter(
+                asset_id__in=object_ids[idx:idx + PERMISSION_RECALC_BATCH_SIZE],
+                inherited=False,
+            ).values_list('asset_id', 'user_id', 'permission_id', 'deny')
+            for asset_id, user_id, permission_id, deny in records:
+                grant_perms, deny_perms = explicit_perms[asset_id]
+                if deny:
+                    deny_perms.add((user_id, permission_id))
                 else:
-                    new_permission.save()
-        if return_instead_of_creating:
-            return objects_to_return
+                    grant_perms.add((user_id, permission_id))
+        return explicit_perms
+
+    @staticmethod
+    @void_cache_for_request(keys=('__get_all_object_permissions',
+                                  '__get_all_user_permissions',))
+    def _apply_inherited_perms(inherited_perms: dict[int, set]):
+        """
+        Make the inherited permissions of each object of `inherited_perms`
+        (a dict with object ids as keys) match exactly the given sets of
+        (user_id, permission_id).
+
+        Only the difference with what is stored is written: stale permissions
+        are deleted with one query per batch of objects and missing ones are
+        created in bulk.
+        """
+        object_ids = list(inherited_perms)
+        uid_field = ObjectPermission._meta.get_field('uid')
+        for idx in range(0, len(object_ids), PERMISSION_RECALC_BATCH_SIZE):
+            batch = object_ids[idx:idx + PERMISSION_RECALC_BATCH_SIZE]
+            stored_perms = defaultdict(dict)
+            records = ObjectPermission.objects.filter(
+                asset_id__in=batch, inherited=True
+            ).values_list('pk', 'asset_id', 'user_id', 'permission_id')
+            for pk, asset_id, user_id, permission_id in records:
+                stored_perms[asset_id][(user_id, permission_id)] = pk
+
+            stale_pks = []
+            new_permissions = []
+            for object_id in batch:
+                stored = stored_perms[object_id]
+                expected = inherited_perms[object_id]
+                stale_pks.extend(
+                    pk for perm, pk in stored.items() if perm not in expected
+                )
+                new_permissions.extend(
+                    ObjectPermission(
+                        asset_id=object_id,
+                        user_id=user_id,
+                        permission_id=permission_id,
+                        inherited=True,
+                        uid=uid_field.generate_uid(),
+                    )
+                    for user_id, permission_id in expected
+                    if (user_id, permission_id) not in stored
+                )
+
+            if stale_pks:
+                ObjectPermission.objects.filter(pk__in=stale_pks).delete()
+            if new_permissions:
+                ObjectPermission.objects.bulk_create(
+                    new_permissions, batch_size=PERMISSION_RECALC_BATCH_SIZE
+                )
 
     @classmethod
     def get_implied_perms(
@@ -800,18 +912,22 @@ class ObjectPermissionMixin:
                 ]
             }
         """
-        records = ObjectPermission.objects.filter(asset_id=object_id).values(
-            'user_id', 'permission_id', 'permission__codename', 'deny'
-        )
-        object_permissions_per_user = defaultdict(list)
-        for record in records:
-            object_permissions_per_user[record['user_id']].append((
-                record['permission_id'],
-                record['permission__codename'],
-                record['deny'],
-            ))
-
-        return object_permissions_per_user
+        def fetch():
+            records = ObjectPermission.objects.filter(asset_id=object_id).values(
+                'user_id', 'permission_id', 'permission__codename', 'deny'
+            )
+            object_permissions_per_user = defaultdict(list)
+            for record in records:
+                object_permissions_per_user[record['user_id']].append((
+                    record['permission_id'],
+                    record['permission__codename'],
+                    record['deny'],
+                ))
+            return object_permissions_per_user
+
+        # `@cache_for_request` is the first level of cache, the shared cache
+        # is the second one.
+        return get_cached_permissions('asset', object_id, fetch)
 
     @staticmethod
     @cache_for_request
@@ -850,21 +966,29 @@ class ObjectPermissionMixin:
             }
         """
         filters = {'user': user_id}
+        suffix = ''
         if asset_ids:
             filters['asset_id__in'] = asset_ids
+            suffix = ':' + calculate_hash(
+                ','.join(str(asset_id) for asset_id in sorted(asset_ids))
+            )
 
-        records = ObjectPermission.objects.filter(**filters).values(
-            'asset_id', 'permission_id', 'permission__codename', 'deny'
-        )
-        object_permissions_per_object = defaultdict(list)
-        for record in records:
-            object_permissions_per_object[record['asset_id']].append((
-                record['permission_id'],
-                record['permission__codename'],
-                record['deny'],
-            ))
-
-        return object_permissions_per_object
+        def fetch():
+            records = ObjectPermission.objects.filter(**filters).values(
+                'asset_id', 'permission_id', 'permission__codename', 'deny'
+            )
+            object_permissions_per_object = defaultdict(list)
+            for record in records:
+                object_permissions_per_object[record['asset_id']].append((
+                    record['permission_id'],
+                    record['permission__codename'],
+                    record['deny'],
+                ))
+            return object_permissions_per_object
+
+        # `@cache_for_request` is the first level of cache, the shared cache
+        # is the second one.
+        return get_cached_permissions('user', user_id, fetch, suffix=suffix)
 
     def __get_object_permissions(self, deny, user=None, codename=None):
         """
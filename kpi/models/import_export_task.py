@@ -4,8 +4,10 @@ import os
 import posixpath
 import re
 import tempfile
+import zipfile
 from collections import defaultdict
 from io import BytesIO
+from itertools import islice
 from os.path import split, splitext
 from typing import Dict, Generator, List, Optional, Tuple
 from zoneinfo import ZoneInfo
@@ -47,6 +49,7 @@ from kpi.constants import (
     ASSET_TYPE_EMPTY,
     ASSET_TYPE_SURVEY,
     ASSET_TYPE_TEMPLATE,
+    EXPORT_TYPE_ATTACHMENTS,
     PERM_CHANGE_ASSET,
     PERM_MANAGE_ASSET,
     PERM_PARTIAL_SUBMISSIONS,
@@ -682,7 +685,9 @@ class SubmissionExportTaskBase(ImportExportTask):
     """
     An (asynchronous) submission data export job. The instantiator must set the
     `data` attribute to a dictionary with the following keys:
-    * `type`: required; `xls`, `csv`, or `spss_labels`
+    * `type`: required; `xls`, `csv`, `geojson`, `spss_labels` or
+              `attachments`, a zip of the attachments of the exported
+              submissions with one folder per submission
     * `source`: required; URL of a deployed `Asset`
     * `lang`: optional; the name of the translation to be used for headers and
               response values. Specify `_xml` to use question and choice names
@@ -742,6 +747,8 @@ class SubmissionExportTaskBase(ImportExportTask):
     }
 
     TIMESTAMP_KEY = '_submission_time'
+    # Number of submissions whose attachments are fetched at once
+    ATTACHMENTS_BATCH_SIZE = 500
     # Above 244 seems to cause 'Download error' in Chrome 64/Linux and above
     # 207 causes a 'Filename too long' error in Excel
     MAXIMUM_FILENAME_LENGTH = 207
@@ -762,6 +769,20 @@ class SubmissionExportTaskBase(ImportExportTask):
             ),
         ]
 
+    def _build_attachments_export_filename(self, source: Asset) -> str:
+        filename_template = (
+            '{{title}} - attachments - {date:%Y-%m-%d-%H-%M-%S}.zip'.format(
+                date=utcnow()
+            )
+        )
+        title = source.name or source.uid
+        filename = filename_template.format(title=title)
+        overrun = len(filename) - self.MAXIMUM_FILENAME_LENGTH
+        if overrun <= 0:
+            return filename
+        title = ellipsize(title, len(title) - overrun)
+        return filename_template.format(title=title)
+
     def _build_export_filename(self, export, export_type):
         """
         Internal method to build the export filename based on the export title
@@ -845,6 +866,18 @@ class SubmissionExportTaskBase(ImportExportTask):
             'include_media_url': include_media_url,
         }
 
+    def _copy_in_chunks(self, source_file, output_file):
+        """
+        Copy `source_file` to `output_file` by chunks of
+        `settings.EXPORT_UPLOAD_CHUNK_SIZE` bytes and report the number of
+        bytes written as the export progress
+        """
+        bytes_written = 0
+        while chunk := source_file.read(settings.EXPORT_UPLOAD_CHUNK_SIZE):
+            output_file.write(chunk)
+            bytes_written += len(chunk)
+            self._report_progress(bytes_written)
+
     @property
     def _fields_from_all_versions(self) -> bool:
         fields_from_versions = self.data.get('fields_from_all_versions', True)
@@ -890,6 +923,33 @@ class SubmissionExportTaskBase(ImportExportTask):
             return hierarchy_in_labels.lower() == 'true'
         return hierarchy_in_labels
 
+    def _get_submission_stream(
+        self, source: Asset, fields: List[str]
+    ) -> Generator[dict, None, None]:
+        """
+        Return the submissions of `source` matching the export filters that
+        `self.user` is allowed to see
+        """
+        query = self.data.get('query', {})
+        submission_ids = self.data.get('submission_ids', [])
+
+        source_perms = source.get_perms(self.user)
+        if (
+            PERM_VIEW_SUBMISSIONS not in source_perms
+            and PERM_PARTIAL_SUBMISSIONS not in source_perms
+        ):
+            raise self.InaccessibleData
+
+        if not source.has_deployment:
+            raise Exception('the source must be deployed prior to export')
+
+        return source.deployment.get_submissions(
+            user=self.user,
+            fields=fields,
+            submission_ids=submission_ids,
+            query=query,
+        )
+
     def _record_last_submission_time(self, submission_stream):
         """
         Internal generator that yields each submission in the given
@@ -914,6 +974,16 @@ class SubmissionExportTaskBase(ImportExportTask):
                     self.last_submission_time = timestamp
             yield submission
 
+    def _report_progress(self, bytes_written: int):
+        """
+        Store the number of bytes of the result written so far in `self.data`
+        to let API users follow the progress of long exports
+        """
+        self.data['bytes_written'] = bytes_written
+        if self.pk:
+            # Do not call `save()`, other fields are still being processed
+            self._meta.model.objects.filter(pk=self.pk).update(data=self.data)
+
     def _run_task(self, messages):
         """
         Generate the export and store the result in the `self.result`
@@ -927,18 +997,31 @@ class SubmissionExportTaskBase(ImportExportTask):
             # Excel exports are always returned in XLSX format, but they're
             # referred to internally as `xls`
             export_type = 'xls'
-        if export_type not in ('xls', 'csv', 'geojson', 'spss_labels'):
+        if export_type not in (
+            'xls', 'csv', 'geojson', 'spss_labels', EXPORT_TYPE_ATTACHMENTS
+        ):
             raise NotImplementedError(
-                'only `xls`, `csv`, `geojson`, and `spss_labels` '
-                'are valid export types'
+                'only `xls`, `csv`, `geojson`, `spss_labels` and '
+                f'`{EXPORT_TYPE_ATTACHMENTS}` are valid export types'
             )
 
-        export, submission_stream = self.get_export_object()
-        filename = self._build_export_filename(export, export_type)
+        if export_type == EXPORT_TYPE_ATTACHMENTS:
+            source = self.asset
+            submission_stream = self._record_last_submission_time(
+                self._get_submission_stream(
+                    source, fields=['_id', self.TIMESTAMP_KEY]
+                )
+            )
+            filename = self._build_attachments_export_filename(source)
+        else:
+            export, submission_stream = self.get_export_object()
+            filename = self._build_export_filename(export, export_type)
         absolute_filepath = self.get_absolute_filepath(filename)
 
         with self.result.storage.open(absolute_filepath, 'wb') as output_file:
-            if export_type == 'csv':
+            if export_type == EXPORT_TYPE_ATTACHMENTS:
+                self._write_attachments_zip(submission_stream, output_file)
+            elif export_type == 'csv':
                 for line in export.to_csv(submission_stream):
                     output_file.write((line + '\r\n').encode('utf-8'))
             elif export_type == 'geojson':
@@ -953,20 +1036,9 @@ class SubmissionExportTaskBase(ImportExportTask):
                         prefix='export_xlsx', mode='rb'
                 ) as xlsx_output_file:
                     export.to_xlsx(xlsx_output_file.name, submission_stream)
-                    # TODO: chunk again once
-                    # https://github.com/jschneier/django-storages/issues/449
-                    # is fixed
-                    # TODO: Check if monkey-patch (line 57) can restore writing
-                    # by chunk
-                    """
-                    while True:
-                        chunk = xlsx_output_file.read(5 * 1024 * 1024)
-                        if chunk:
-                            output_file.write(chunk)
-                        else:
-                            break
-                    """
-                    output_file.write(xlsx_output_file.read())
+                    # Do not load the whole workbook in memory. S3 storage
+                    # uploads each chunk as a part of a multipart upload.
+                    self._copy_in_chunks(xlsx_output_file, output_file)
             elif export_type == 'spss_labels':
                 export.to_spss_labels(output_file)
 
@@ -979,6 +1051,55 @@ class SubmissionExportTaskBase(ImportExportTask):
         else:
             self.save(update_fields=['result', 'last_submission_time'])
 
+    def _write_attachments_zip(self, submission_stream, output_file):
+        """
+        Write the attachments of the submissions of `submission_stream` to
+        `output_file` as a zip archive, in one folder per submission.
+
+        Submissions are processed by batches and files are copied chunk by
+        chunk from storage, thus memory usage does not depend on the size of
+        the project.
+        """
+        # Avoid circular import
+        from kobo.apps.openrosa.apps.logger.models import Attachment
+
+        # Do not let `zipfile` seek back in `output_file` (e.g. a file which
+        # is uploaded to S3 part by part), local headers are followed by data
+        # descriptors instead.
+        stream = _WriteOnlyStream(output_file)
+        # Most attachments are already compressed (e.g. photos, videos)
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as zip_:
+            while submission_ids := [
+                submission['_id']
+                for submission in islice(
+                    submission_stream, self.ATTACHMENTS_BATCH_SIZE
+                )
+            ]:
+                attachments = (
+                    Attachment.objects.filter(instance_id__in=submission_ids)
+                    .only('instance_id', 'media_file', 'media_file_basename')
+                    .order_by('instance_id', 'pk')
+                )
+                for attachment in attachments.iterator():
+                    arcname = posixpath.join(
+                        str(attachment.instance_id),
+                        attachment.media_file_basename or attachment.filename,
+                    )
+                    try:
+                        attachment.media_file.open('rb')
+                    except OSError:
+                        logging.warning(
+                            f'Attachment #{attachment.pk} cannot be exported: '
+                            f'{attachment.media_file.name} not found'
+                        )
+                        continue
+
+                    with attachment.media_file, zip_.open(
+                        arcname, 'w', force_zip64=True
+                    ) as zip_entry:
+                        for chunk in attachment.media_file.chunks():
+                            zip_entry.write(chunk)
+
     @property
     def asset(self):
         source_url = self.data.get('source', False)
@@ -1002,31 +1123,14 @@ class SubmissionExportTaskBase(ImportExportTask):
         """
 
         fields = self.data.get('fields', [])
-        query = self.data.get('query', {})
-        submission_ids = self.data.get('submission_ids', [])
 
         if source is None:
             source = self.asset
 
-        source_perms = source.get_perms(self.user)
-        if (
-            PERM_VIEW_SUBMISSIONS not in source_perms
-            and PERM_PARTIAL_SUBMISSIONS not in source_perms
-        ):
-            raise self.InaccessibleData
-
-        if not source.has_deployment:
-            raise Exception('the source must be deployed prior to export')
-
         # Include the group name in `fields` for Mongo to correctly filter
         # for repeat groups
         fields = self._get_fields_and_groups(fields)
-        submission_stream = source.deployment.get_submissions(
-            user=self.user,
-            fields=fields,
-            submission_ids=submission_ids,
-            query=query,
-        )
+        submission_stream = self._get_submission_stream(source, fields)
 
         if source.has_advanced_features:
             submission_stream = stream_with_extras(submission_stream, source)
@@ -1184,6 +1288,22 @@ class SubmissionSynchronousExport(SubmissionExportTaskBase):
             return export
 
 
+class _WriteOnlyStream:
+    """
+    Expose only `write()` and `flush()` of a file object
+    """
+
+    def __init__(self, file_):
+        self._file = file_
+
+    def write(self, data: bytes) -> int:
+        self._file.write(data)
+        return len(data)
+
+    def flush(self):
+        self._file.flush()
+
+
 def _get_xls_format(decoded_str):
     first_bytes = decoded_str[:2]
     if first_bytes == b'PK':
@@ -1,11 +1,121 @@
 # coding: utf-8
+from typing import Callable, Iterable
+
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from shortuuid import ShortUUID
 
 from kpi.fields.kpi_uid import KpiUidField
 from kpi.utils.cache import void_cache_for_request
 
+PERMISSIONS_CACHE_PREFIX = 'object_permissions'
+
+
+def get_cached_permissions(
+    kind: str, pk: int, fetch: Callable[[], dict], suffix: str = ''
+) -> dict:
+    """
+    Return object permissions of an asset (`kind='asset'`) or a user
+    (`kind='user'`) from the shared cache, calling `fetch()` on a miss.
+
+    Entries are keyed by a version of `pk` which changes every time one of
+    its permissions changes (see `invalidate_cached_permissions()`).
+    """
+    if not settings.OBJECT_PERMISSIONS_CACHE_TIMEOUT:
+        return fetch()
+
+    version_key = f'{PERMISSIONS_CACHE_PREFIX}:version:{kind}:{pk}'
+    version = cache.get(version_key)
+    if version is None:
+        # Never reuse a previous version, otherwise entries which were stored
+        # before the version key got evicted could be served again
+        version = ShortUUID().random(12)
+        if not cache.add(
+            version_key, version, settings.OBJECT_PERMISSIONS_CACHE_TIMEOUT
+        ):
+            version = cache.get(version_key, version)
+
+    key = f'{PERMISSIONS_CACHE_PREFIX}:{kind}:{pk}:{version}{suffix}'
+    if (permissions := cache.get(key)) is None:
+        permissions = fetch()
+        cache.set(key, permissions, settings.OBJECT_PERMISSIONS_CACHE_TIMEOUT)
+    return permissions
+
+
+def invalidate_cached_permissions(
+    asset_ids: Iterable[int] = (), user_ids: Iterable[int] = ()
+):
+    """
+    Bump the versions of `asset_ids` and `user_ids` to make their cached
+    permissions unreachable. Versions are bumped again when the current
+    transaction is committed to void anything cached from a concurrent
+    request in between.
+    """
+    version_keys = [
+        f'{PERMISSIONS_CACHE_PREFIX}:version:asset:{pk}' for pk in set(asset_ids)
+    ] + [
+        f'{PERMISSIONS_CACHE_PREFIX}:version:user:{pk}' for pk in set(user_ids)
+    ]
+    if not version_keys:
+        return
+
+    def bump_versions():
+        cache.set_many(
+            {key: ShortUUID().random(12) for key in version_keys},
+            settings.OBJECT_PERMISSIONS_CACHE_TIMEOUT,
+        )
+
+    bump_versions()
+    transaction.on_commit(bump_versions)
+
+
+class ObjectPermissionQuerySet(models.QuerySet):
+    """
+    Invalidate cached permissions and assets hashes of the assets and users
+    affected by bulk operations.
+
+    Rows deleted in cascade do not go through the queryset, see `kpi.signals`.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        self._invalidate_caches(
+            {obj.asset_id for obj in objs}, {obj.user_id for obj in objs}
+        )
+        return objs
+
+    def delete(self):
+        affected = self._get_affected_asset_and_user_ids()
+        result = super().delete()
+        self._invalidate_caches(*affected)
+        return result
+
+    def update(self, **kwargs):
+        affected = self._get_affected_asset_and_user_ids()
+        result = super().update(**kwargs)
+        self._invalidate_caches(*affected)
+        return result
+
+    def _get_affected_asset_and_user_ids(self) -> tuple[set, set]:
+        asset_ids = set()
+        user_ids = set()
+        for asset_id, user_id in (
+            self.order_by().values_list('asset_id', 'user_id').distinct()
+        ):
+            asset_ids.add(asset_id)
+            user_ids.add(user_id)
+        return asset_ids, user_ids
+
+    @staticmethod
+    def _invalidate_caches(asset_ids: set, user_ids: set):
+        # Avoid circular import
+        from kpi.utils.assets_hash import invalidate_assets_hash
+
+        invalidate_cached_permissions(asset_ids=asset_ids, user_ids=user_ids)
+        invalidate_assets_hash(user_ids=user_ids)
+
 
 class ObjectPermission(models.Model):
     """
@@ -25,6 +135,8 @@ class ObjectPermission(models.Model):
     )
     uid = KpiUidField(uid_prefix='p')
 
+    objects = ObjectPermissionQuerySet.as_manager()
+
     @property
     def kind(self):
         return 'objectpermission'
@@ -48,11 +160,13 @@ class ObjectPermission(models.Model):
                 'not match that of the object.'
             )
         super().save(*args, **kwargs)
+        invalidate_cached_permissions([self.asset_id], [self.user_id])
 
     @void_cache_for_request(keys=('__get_all_object_permissions',
                                   '__get_all_user_permissions',))
     def delete(self, *args, **kwargs):
         super().delete(*args, **kwargs)
+        invalidate_cached_permissions([self.asset_id], [self.user_id])
 
     def __str__(self):
         for required_field in ('user', 'permission'):
@@ -16,6 +16,7 @@ from kpi.interfaces import (
     SyncBackendMediaInterface,
 )
 from kpi.models.asset_file import AssetFile
+from kpi.models.paired_data_fragment import PairedDataFragment
 from kpi.utils.hash import calculate_hash
 
 
@@ -130,6 +131,10 @@ class PairedData(OpenRosaManifestInterface,
             self.asset_file.delete()
             self._asset_file = None
 
+        PairedDataFragment.objects.filter(
+            paired_data_uid=self.paired_data_uid
+        ).delete()
+
         # Update asset
         del self.asset.paired_data[self.source_uid]
         self.asset.save(
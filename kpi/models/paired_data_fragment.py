@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Generator, Iterable
+
+from django.db import models
+
+from kpi.models.asset_file import AssetFile
+from kpi.utils.xml import NodeStripper, add_xml_declaration
+
+
+class PairedDataFragment(models.Model):
+    """
+    Stripped XML of one source submission, as it appears in the `external.xml`
+    of a paired data relationship.
+
+    Fragments are keyed by the instance id and the `xml_hash` of the
+    submission they were built from. On refresh, only submissions added,
+    edited or deleted since the last build are processed.
+    """
+
+    asset = models.ForeignKey(
+        'kpi.Asset', related_name='paired_data_fragments', on_delete=models.CASCADE
+    )
+    paired_data_uid = models.CharField(max_length=32)
+    # `Instance` lives in the KoboCAT database, no foreign key is possible
+    instance_id = models.IntegerField()
+    xml_hash = models.CharField(max_length=255, null=True)
+    fragment = models.TextField()
+
+    BATCH_SIZE = 1000
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['paired_data_uid', 'instance_id'],
+                name='unique_paired_data_fragment',
+            ),
+        ]
+
+    @staticmethod
+    def get_fields_hash(paired_data: 'kpi.models.PairedData') -> str:
+        """
+        Return a hash of everything, other than the submissions themselves,
+        that a fragment depends on.
+        """
+        hashable = '|'.join([paired_data.source_uid] + sorted(
+            paired_data.allowed_fields
+        ))
+        return hashlib.md5(hashable.encode()).hexdigest()
+
+    @classmethod
+    def refresh(
+        cls,
+        paired_data: 'kpi.models.PairedData',
+        asset_file: AssetFile,
+        submission_ids: Iterable[int],
+    ) -> int:
+        """
+        Bring fragments of `paired_data` in sync with `submission_ids`, the
+        source submissions the destination project is allowed to see.
+
+        The hash of the selected fields is stored in the (unsaved) metadata of
+        `asset_file`, the file which receives the generated XML.
+
+        Return the number of fragments `paired_data` has after refresh.
+        """
+        fragments = cls.objects.filter(
+            paired_data_uid=paired_data.paired_data_uid
+        )
+        fields_hash = cls.get_fields_hash(paired_data)
+        if asset_file.metadata.get('fields_hash') != fields_hash:
+            # Selected questions have changed, every fragment is stale
+            fragments.delete()
+            asset_file.metadata['fields_hash'] = fields_hash
+
+        # Use `rename_root_node_to='data'` to rename the root node of each
+        # submission to `data` so that form authors do not have to rewrite
+        # their `xml-external` formulas any time the asset UID changes,
+        # e.g. when cloning a form or creating a project from a template.
+        # Set `use_xpath=True` because `paired_data.fields` uses full group
+        # hierarchies, not just question names.
+        stripper = NodeStripper(
+            paired_data.allowed_fields,
+            use_xpath=True,
+            rename_root_node_to='data',
+        )
+        seen_ids = set()
+        batch = []
+
+        for submission_id in submission_ids:
+            seen_ids.add(submission_id)
+            batch.append(submission_id)
+            if len(batch) >= cls.BATCH_SIZE:
+                cls._refresh_batch(paired_data, batch, stripper)
+                batch = []
+
+        if batch:
+            cls._refresh_batch(paired_data, batch, stripper)
+
+        stored_ids = fragments.values_list('instance_id', flat=True)
+        deleted_ids = [
+            instance_id
+            for instance_id in stored_ids.iterator()
+            if instance_id not in seen_ids
+        ]
+        for idx in range(0, len(deleted_ids), cls.BATCH_SIZE):
+            fragments.filter(
+                instance_id__in=deleted_ids[idx:idx + cls.BATCH_SIZE]
+            ).delete()
+
+        return len(seen_ids)
+
+    @classmethod
+    def iter_xml(
+        cls, paired_data_uid: str, root_tag_name: str
+    ) -> Generator[bytes, None, None]:
+        """
+        Yield the content of the `external.xml` file of `paired_data_uid`
+        chunk by chunk, without holding all the fragments in memory.
+        """
+        yield add_xml_declaration(f'<{root_tag_name}>').encode()
+        queryset = (
+            cls.objects.filter(paired_data_uid=paired_data_uid)
+            .order_by('instance_id')
+            .values_list('fragment', flat=True)
+        )
+        for fragment in queryset.iterator(chunk_size=cls.BATCH_SIZE):
+            yield fragment.encode()
+        yield f'</{root_tag_name}>'.encode()
+
+    @classmethod
+    def _refresh_batch(
+        cls,
+        paired_data: 'kpi.models.PairedData',
+        submission_ids: list[int],
+        stripper: NodeStripper,
+    ):
+        # Avoid circular imports, `logger` models import `kpi.models`
+        from kobo.apps.openrosa.apps.logger.models import Instance
+
+        stored_hashes = dict(
+            cls.objects.filter(
+                paired_data_uid=paired_data.paired_data_uid,
+                instance_id__in=submission_ids,
+            ).values_list('instance_id', 'xml_hash')
+        )
+        current_hashes = Instance.objects.filter(
+            pk__in=submission_ids
+        ).values_list('pk', 'xml_hash')
+
+        stale_ids = [
+            instance_id
+            for instance_id, xml_hash in current_hashes
+            if instance_id not in stored_hashes
+            or stored_hashes[instance_id] != xml_hash
+        ]
+        if not stale_ids:
+            return
+
+        fragments = []
+        instances = Instance.objects.filter(pk__in=stale_ids).values_list(
+            'pk', 'xml_hash', 'xml'
+        )
+        for instance_id, xml_hash, xml in instances:
+            fragments.append(
+                cls(
+                    asset=paired_data.asset,
+                    paired_data_uid=paired_data.paired_data_uid,
+                    instance_id=instance_id,
+                    xml_hash=xml_hash,
+                    fragment=stripper.strip(xml),
+                )
+            )
+
+        cls.objects.bulk_create(
+            fragments,
+            update_conflicts=True,
+            unique_fields=['paired_data_uid', 'instance_id'],
+            update_fields=['xml_hash', 'fragment'],
+        )
@@ -1,18 +1,25 @@
 # coding: utf-8
+import base64
+import binascii
 from collections import OrderedDict
-from typing import Union
+from typing import Optional, Union
 
 from django.conf import settings
 from django.db.models.query import QuerySet
+from django.utils.translation import gettext_lazy as t
 from django_request_cache import cache_for_request
 from rest_framework.pagination import (
     LimitOffsetPagination,
     PageNumberPagination,
 )
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.reverse import reverse_lazy
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework.serializers import SerializerMethodField
 
+from kpi.constants import SUBMISSION_COUNT_STRATEGY_EXACT
+
 
 class Paginated(LimitOffsetPagination):
     """ Adds 'root' to the wrapping response object. """
@@ -116,10 +123,109 @@ class AssetUsagePagination(PageNumberPagination):
 class DataPagination(LimitOffsetPagination):
     """
     Pagination class for submissions.
+
+    Submissions are already paginated by MongoDB, thus this class only builds
+    the links of the response. `paginate_queryset()` expects the total count
+    of submissions (or `None` when it has not been computed) instead of a
+    queryset.
+
+    Offset/limit pagination is used by default. When `after` is present in the
+    query string (even empty), keyset pagination is used instead: the `next`
+    link carries an opaque token of the last `_id` of the current page and
+    the next page is retrieved with a range query on `_id`, which keeps the
+    per-page cost flat no matter how deep the client goes.
+
+    When the count is not exact (i.e. estimated or skipped), the `next` link
+    relies on the size of the current page instead of the count.
     """
     default_limit = settings.SUBMISSION_LIST_LIMIT
     offset_query_param = 'start'
+    cursor_query_param = 'after'
     max_limit = settings.SUBMISSION_LIST_LIMIT
+    use_cursor = False
+    count_strategy = SUBMISSION_COUNT_STRATEGY_EXACT
+
+    @staticmethod
+    def decode_cursor(token: str) -> int:
+        """
+        Return the submission `_id` encoded in `token`, or 0 if `token` is
+        empty (i.e. first page).
+        """
+        if not token:
+            return 0
+        try:
+            return int(base64.urlsafe_b64decode(token.encode()).decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValidationError({'after': t('Invalid cursor')})
+
+    @staticmethod
+    def encode_cursor(submission_id: int) -> str:
+        return base64.urlsafe_b64encode(str(submission_id).encode()).decode()
+
+    def get_count(self, count: Optional[int]) -> Optional[int]:
+        return count
+
+    def get_next_link(self):
+        if (
+            not self.use_cursor
+            and self.count_strategy == SUBMISSION_COUNT_STRATEGY_EXACT
+        ):
+            return super().get_next_link()
+
+        if len(self.page) < self.limit:
+            return None
+
+        url = self.request.build_absolute_uri()
+        if self.use_cursor:
+            url = remove_query_param(url, self.offset_query_param)
+            return replace_query_param(
+                url,
+                self.cursor_query_param,
+                self.encode_cursor(self.page[-1]['_id']),
+            )
+
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_response(
+        self, data, count_strategy: str = SUBMISSION_COUNT_STRATEGY_EXACT
+    ):
+        self.count_strategy = count_strategy
+        if self.use_cursor or count_strategy != SUBMISSION_COUNT_STRATEGY_EXACT:
+            # The page is bounded by `limit`, it is safe to load it in memory
+            # to find out its size and its last `_id`.
+            data = self.page = list(data)
+
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_strategy', self.count_strategy),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_previous_link(self):
+        if self.use_cursor:
+            # Keyset pagination only walks forward
+            return None
+        return super().get_previous_link()
+
+    def paginate_queryset(self, count, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = 0 if self.use_cursor else self.get_offset(request)
+        self.count = self.get_count(count)
+        if (
+            self.count is not None
+            and self.count > self.limit
+            and self.template is not None
+        ):
+            self.display_page_controls = True
+        self.page = []
+        return self.page
 
 
 class FastAssetPagination(Paginated):
@@ -17,10 +17,10 @@ from formpack.constants import (
     REQUIRED_EXPORT_SETTINGS,
     VALID_DEFAULT_LANGUAGES,
     VALID_EXPORT_SETTINGS,
-    VALID_EXPORT_TYPES,
     VALID_MULTIPLE_SELECTS,
 )
 
+from kpi.constants import VALID_EXPORT_TYPES
 from kpi.fields import WritableJSONField
 from kpi.models import Asset, AssetExportSettings
 from kpi.utils.export_task import format_exception_values
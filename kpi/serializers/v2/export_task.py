@@ -21,13 +21,13 @@ from formpack.constants import (
     REQUIRED_EXPORT_SETTINGS,
     VALID_DEFAULT_LANGUAGES,
     VALID_EXPORT_SETTINGS,
-    VALID_EXPORT_TYPES,
     VALID_MULTIPLE_SELECTS,
 )
 from rest_framework import serializers
 from rest_framework.request import Request
 from rest_framework.reverse import reverse
 
+from kpi.constants import VALID_EXPORT_TYPES
 from kpi.fields import ReadOnlyJSONField
 from kpi.models import Asset, SubmissionExportTask
 from kpi.tasks import export_in_background
@@ -2,13 +2,16 @@ from typing import Union
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from taggit.models import Tag
 
+from kobo.apps.kobo_auth.shortcuts import User
 from kpi.constants import PERM_ADD_SUBMISSIONS
 from kpi.exceptions import DeploymentNotFound
-from kpi.models import Asset, TagUid
+from kpi.models import Asset, AssetVersion, ObjectPermission, TagUid
+from kpi.models.object_permission import invalidate_cached_permissions
+from kpi.utils.assets_hash import invalidate_assets_hash
 from kpi.utils.object_permission import post_assign_perm, post_remove_perm
 from kpi.utils.permissions import (
     is_user_anonymous,
@@ -41,6 +44,56 @@ def post_delete_asset(sender, instance, **kwargs):
             parent.update_languages()
 
 
+@receiver(pre_delete, sender=Asset)
+def pre_delete_asset(sender, instance, **kwargs):
+    # Permissions are deleted in cascade along with the asset, without going
+    # through `ObjectPermissionQuerySet.delete()`. The users who could see it
+    # must be looked up beforehand
+    user_ids = set(
+        ObjectPermission.objects.filter(asset_id=instance.pk)
+        .order_by()
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    invalidate_cached_permissions(asset_ids=[instance.pk], user_ids=user_ids)
+    invalidate_assets_hash(user_ids=user_ids)
+
+
+@receiver(pre_delete, sender=User)
+def pre_delete_user(sender, instance, **kwargs):
+    # Same for the permissions of a user
+    asset_ids = set(
+        ObjectPermission.objects.filter(user_id=instance.pk)
+        .order_by()
+        .values_list('asset_id', flat=True)
+        .distinct()
+    )
+    invalidate_cached_permissions(asset_ids=asset_ids, user_ids=[instance.pk])
+
+
+@receiver([post_save, post_delete], sender=AssetVersion)
+def invalidate_assets_hash_on_version_change(sender, instance, **kwargs):
+    """
+    `Asset.version_id` is the `uid` of the latest version, which changes every
+    time the asset is saved with a new version or gets deployed.
+    """
+    if kwargs.get('raw'):
+        return
+    invalidate_assets_hash(asset_ids=[instance.asset_id])
+
+
+@receiver([post_assign_perm, post_remove_perm], sender=Asset)
+def invalidate_asset_permissions_cache(
+    sender,
+    instance,
+    user: Union[settings.AUTH_USER_MODEL, 'AnonymousUser'],
+    **kwargs
+):
+    user_ids = [user.pk] if user.pk is not None else []
+    invalidate_cached_permissions(asset_ids=[instance.pk], user_ids=user_ids)
+    invalidate_assets_hash(user_ids=user_ids)
+
+
 @receiver(post_assign_perm, sender=Asset)
 def post_assign_asset_perm(
     sender,
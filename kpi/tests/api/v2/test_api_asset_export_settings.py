@@ -126,6 +126,20 @@ class AssetExportSettingsApiTest(BaseTestCase):
         assert data['name'] == self.name
         assert data['export_settings'] == export_settings
 
+    def test_api_create_attachments_asset_export_settings_for_owner(self):
+        export_settings = {**self.valid_export_settings, 'type': 'attachments'}
+        response = self.client.post(
+            self.export_settings_list_url,
+            data={
+                'name': self.name,
+                'export_settings': export_settings,
+            },
+            format='json',
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert self.asset_export_settings.count() == 1
+        assert response.json()['export_settings'] == export_settings
+
     def test_api_create_invalid_asset_export_settings_for_owner(self):
         invalid_export_settings = {**self.valid_export_settings, 'type': 'pdf'}
         response = self.client.post(
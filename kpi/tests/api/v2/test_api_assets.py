@@ -1,9 +1,13 @@
 import copy
 import json
 import os
+from unittest.mock import patch
 
 import dateutil.parser
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from model_bakery import baker
@@ -13,6 +17,7 @@ from kobo.apps.kobo_auth.shortcuts import User
 from kobo.apps.project_ownership.models import Invite, InviteStatusChoices, Transfer
 from kobo.apps.project_views.models.project_view import ProjectView
 from kpi.constants import (
+    ASSET_TYPE_COLLECTION,
     PERM_CHANGE_ASSET,
     PERM_CHANGE_METADATA_ASSET,
     PERM_MANAGE_ASSET,
@@ -20,7 +25,7 @@ from kpi.constants import (
     PERM_VIEW_ASSET,
     PERM_VIEW_SUBMISSIONS,
 )
-from kpi.models import Asset, AssetFile, AssetVersion
+from kpi.models import Asset, AssetFile, AssetVersion, UserAssetSubscription
 from kpi.models.asset import AssetDeploymentStatus
 from kpi.serializers.v2.asset import AssetListSerializer
 from kpi.tests.base_test_case import (
@@ -31,6 +36,7 @@ from kpi.tests.base_test_case import (
 from kpi.tests.kpi_test_case import KpiTestCase
 from kpi.tests.utils.mixins import AssetFileTestCaseMixin
 from kpi.urls.router_api_v2 import URL_NAMESPACE as ROUTER_URL_NAMESPACE
+from kpi.utils.assets_hash import ASSETS_HASH_CACHE_PREFIX
 from kpi.utils.hash import calculate_hash
 from kpi.utils.object_permission import get_anonymous_user
 from kpi.utils.project_views import get_region_for_view
@@ -87,6 +93,40 @@ class AssetListApiTests(BaseAssetTestCase):
         self.assertIsNotNone(list_result_detail)
         self.assertDictEqual(expected_list_data, dict(list_result_detail))
 
+    def test_list_query_count_does_not_grow_with_assets(self):
+        someuser = User.objects.get(username='someuser')
+        anotheruser = User.objects.get(username='anotheruser')
+
+        def make_assets(quantity):
+            for _ in range(quantity):
+                self.create_asset()
+                # Subscriptions to collections out of the list should not be
+                # loaded
+                collection = Asset.objects.create(
+                    asset_type=ASSET_TYPE_COLLECTION,
+                    owner=anotheruser,
+                    name='Not listed',
+                )
+                UserAssetSubscription.objects.create(
+                    asset=collection, user=anotheruser
+                )
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.list_url, {'limit': 2})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), 2)
+            return len(context.captured_queries)
+
+        make_assets(2)
+        # Warm up caches
+        count_queries()
+        expected_query_count = count_queries()
+
+        make_assets(10)
+        self.assertTrue(Asset.objects.filter(owner=someuser).count() > 10)
+        self.assertEqual(count_queries(), expected_query_count)
+
     def test_asset_owner_label(self):
         """
         Test the behavior of the owner_label field in the Asset API.
@@ -181,6 +221,83 @@ class AssetListApiTests(BaseAssetTestCase):
         hash_response = self.client.get(hash_url)
         self.assertEqual(hash_response.data.get('hash'), expected_hash)
 
+    def test_assets_hash_is_cached_until_assets_change(self):
+        another_user = User.objects.get(username='anotheruser')
+        user_asset = Asset.objects.get(pk=1)
+        user_asset.save()
+        user_asset.assign_perm(another_user, 'view_asset')
+        cache.delete(f'{ASSETS_HASH_CACHE_PREFIX}:user:{another_user.pk}')
+
+        self.client.logout()
+        self.client.login(username='anotheruser', password='anotheruser')
+        hash_url = reverse('asset-hash')
+        first_hash = self.client.get(hash_url).data['hash']
+        self.assertEqual(first_hash, calculate_hash(user_asset.version_id))
+
+        # Served from the cache
+        with patch(
+            'kpi.utils.assets_hash.calculate_assets_hash'
+        ) as calculate_assets_hash:
+            self.assertEqual(self.client.get(hash_url).data['hash'], first_hash)
+            calculate_assets_hash.assert_not_called()
+
+        # A new version voids the hash
+        user_asset.save()
+        second_hash = self.client.get(hash_url).data['hash']
+        self.assertNotEqual(second_hash, first_hash)
+        self.assertEqual(second_hash, calculate_hash(user_asset.version_id))
+
+        # So does a permission change
+        user_asset.remove_perm(another_user, 'view_asset')
+        self.assertEqual(self.client.get(hash_url).data['hash'], '')
+
+    def test_list_metadata(self):
+        someuser = User.objects.get(username='someuser')
+        facets = [
+            (
+                {'languages': ['French (fr)', 'English (en)', '']},
+                {
+                    'country': {'value': 'FRA', 'label': 'France'},
+                    'sector': {'value': 'Health', 'label': 'Health'},
+                    'organization': 'Kobo',
+                },
+            ),
+            (
+                {'languages': ['English (en)']},
+                {
+                    'country': [{'value': 'CAN', 'label': 'Canada'}],
+                    'sector': {'value': 'Education', 'label': 'Education'},
+                    'organization': '',
+                },
+            ),
+            (
+                {'languages': []},
+                {
+                    'country': {'value': 'CAN', 'label': 'Canada'},
+                    'sector': {'value': 'Health', 'label': 'Health'},
+                    'organization': 'Another organization',
+                },
+            ),
+        ]
+        for summary, settings_ in facets:
+            asset = Asset.objects.create(owner=someuser, asset_type='survey')
+            # Bypass `Asset.save()` which standardizes settings
+            Asset.objects.filter(pk=asset.pk).update(
+                summary=summary, settings=settings_
+            )
+
+        response = self.client.get(self.list_url, {'metadata': 'on'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['metadata'],
+            {
+                'languages': ['English (en)', 'French (fr)'],
+                'countries': [('CAN', 'Canada'), ('FRA', 'France')],
+                'sectors': [('Education', 'Education'), ('Health', 'Health')],
+                'organizations': ['Another organization', 'Kobo'],
+            },
+        )
+
     def test_assets_search_query(self):
         someuser = User.objects.get(username='someuser')
         question = Asset.objects.create(
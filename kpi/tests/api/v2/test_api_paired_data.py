@@ -1,5 +1,6 @@
 import unittest
 
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.exceptions import ErrorDetail
@@ -12,7 +13,7 @@ from kpi.constants import (
     PERM_VIEW_ASSET,
     PERM_VIEW_SUBMISSIONS,
 )
-from kpi.models import Asset
+from kpi.models import Asset, PairedDataFragment
 from kpi.tests.base_test_case import BaseAssetTestCase
 from kpi.urls.router_api_v2 import URL_NAMESPACE as ROUTER_URL_NAMESPACE
 
@@ -422,6 +423,49 @@ class PairedDataExternalApiTests(BasePairedDataTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.content, expected_xml)
 
+    @override_settings(PAIRED_DATA_EXPIRATION=0)
+    def test_get_external_only_processes_new_submissions(self):
+        self.deploy_source()
+        self.source_asset.deployment.mock_submissions(
+            [{'city_name': 'Montréal'}, {'city_name': 'Tokyo'}]
+        )
+        response = self.client.get(self.external_xml_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Tokyo', b''.join(response.streaming_content).decode())
+        fragments = PairedDataFragment.objects.filter(
+            asset=self.destination_asset
+        )
+        first_fragment_ids = set(fragments.values_list('pk', flat=True))
+        self.assertEqual(len(first_fragment_ids), 2)
+
+        self.source_asset.deployment.mock_submissions([{'city_name': 'Lima'}])
+        response = self.client.get(self.external_xml_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('Tokyo', content)
+        self.assertIn('Lima', content)
+        fragment_ids = set(fragments.values_list('pk', flat=True))
+        self.assertEqual(len(fragment_ids), 3)
+        self.assertTrue(first_fragment_ids.issubset(fragment_ids))
+
+    def test_get_external_not_modified(self):
+        self.deploy_source()
+        self.source_asset.deployment.mock_submissions([{'city_name': 'Tokyo'}])
+        response = self.client.get(self.external_xml_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(
+            self.external_xml_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(
+            self.external_xml_url, HTTP_IF_NONE_MATCH='"md5:outdated"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def deploy_source(self):
         # Refresh source asset from DB, it has been altered by
         # `self.toggle_source_sharing()`
@@ -39,6 +39,7 @@ from kpi.constants import (
     SUBMISSION_FORMAT_TYPE_JSON,
     SUBMISSION_FORMAT_TYPE_XML,
 )
+from kpi.deployment_backends.openrosa_backend import OpenRosaDeploymentBackend
 from kpi.models import Asset
 from kpi.tests.base_test_case import BaseTestCase
 from kpi.tests.utils.mixins import (
@@ -56,6 +57,7 @@ from kpi.tests.utils.mock import (
 from kpi.tests.utils.transaction import immediate_on_commit
 from kpi.tests.utils.xml import get_form_and_submission_tag_names
 from kpi.urls.router_api_v2 import URL_NAMESPACE as ROUTER_URL_NAMESPACE
+from kpi.utils.mongo_helper import MongoHelper
 from kpi.utils.object_permission import get_anonymous_user
 from kpi.utils.xml import (
     edit_submission_xml,
@@ -495,6 +497,86 @@ class SubmissionApiTests(SubmissionDeleteTestCaseMixin, BaseSubmissionTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), limit)
 
+    def test_list_submissions_with_cursor_pagination(self):
+        """
+        someuser is the owner of the project.
+        They can walk through all their data with cursor pagination
+        """
+        response = self.client.get(
+            self.submission_list_url, {'format': 'json', 'after': '', 'limit': 4}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], len(self.submissions))
+        self.assertIsNone(response.data['previous'])
+        first_page_ids = [r['_id'] for r in response.data['results']]
+        self.assertEqual(len(first_page_ids), 4)
+        self.assertEqual(first_page_ids, sorted(first_page_ids))
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['next'])
+        second_page_ids = [r['_id'] for r in response.data['results']]
+
+        submissions_ids = [s['_id'] for s in self.submissions]
+        self.assertEqual(
+            first_page_ids + second_page_ids, sorted(submissions_ids)
+        )
+
+    def test_list_submissions_with_cursor_pagination_invalid_params(self):
+        for params in [
+            {'after': 'not-a-cursor'},
+            {'after': '', 'start': 1},
+            {'after': '', 'sort': '{"q1": -1}'},
+        ]:
+            params['format'] = 'json'
+            response = self.client.get(self.submission_list_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_submissions_with_count_strategy(self):
+        """
+        someuser is the owner of the project.
+        They can choose how the submissions are counted
+        """
+        response = self.client.get(self.submission_list_url, {'format': 'json'})
+        self.assertEqual(response.data['count'], len(self.submissions))
+        self.assertEqual(response.data['count_strategy'], 'exact')
+
+        response = self.client.get(
+            self.submission_list_url, {'format': 'json', 'count_strategy': 'none'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['count'])
+        self.assertEqual(response.data['count_strategy'], 'none')
+        self.assertEqual(len(response.data['results']), len(self.submissions))
+
+        response = self.client.get(
+            self.submission_list_url,
+            {'format': 'json', 'count_strategy': 'estimated'},
+        )
+        self.assertEqual(response.data['count_strategy'], 'estimated')
+        self.assertEqual(
+            response.data['count'], self.asset.deployment.xform.num_of_submissions
+        )
+
+        # Falls back on an exact count when results are narrowed down
+        response = self.client.get(
+            self.submission_list_url,
+            {
+                'format': 'json',
+                'count_strategy': 'estimated',
+                'query': '{"_submitted_by": "someuser"}',
+            },
+        )
+        self.assertEqual(response.data['count_strategy'], 'exact')
+        self.assertEqual(
+            response.data['count'], len(self.submissions_submitted_by_someuser)
+        )
+
+        response = self.client.get(
+            self.submission_list_url, {'format': 'json', 'count_strategy': 'foo'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_list_submissions_not_shared_as_anotheruser(self):
         """
         someuser is the owner of the project.
@@ -668,6 +750,74 @@ class SubmissionApiTests(SubmissionDeleteTestCaseMixin, BaseSubmissionTestCase):
             response_count = response.data.get('count')
         self.assertEqual(response_count, 1)
 
+    def test_list_xml_submissions_filtered_with_mongo_in_batches(self):
+        """
+        Ensure XML of submissions matching a Mongo query is read from
+        PostgreSQL batch by batch, sorted by `_id`
+        """
+        submissions_by_uuid = {
+            f"uuid:{submission['_uuid']}": submission['_id']
+            for submission in self.submissions
+        }
+        submission_ids = sorted(submissions_by_uuid.values())
+        query = {
+            '_submitted_by': {'$in': ['unknownuser', 'someuser', 'anotheruser']}
+        }
+
+        get_xml_batch = (
+            OpenRosaDeploymentBackend._OpenRosaDeploymentBackend__get_xml_batch
+        )
+
+        def get_xml_submission_ids(query: dict, **kwargs) -> tuple[list, int]:
+            """
+            Return ids of XML submissions matching `query` and the number of
+            batches they have been read in
+            """
+            with mock.patch.object(
+                MongoHelper, 'DEFAULT_BATCHSIZE', 2
+            ), mock.patch.object(
+                OpenRosaDeploymentBackend,
+                '_OpenRosaDeploymentBackend__get_xml_batch',
+                autospec=True,
+                side_effect=get_xml_batch,
+            ) as patched_get_xml_batch:
+                # Consume the stream while the batch size is patched
+                xml_submissions = list(
+                    self.asset.deployment.get_submissions(
+                        user=self.someuser,
+                        format_type=SUBMISSION_FORMAT_TYPE_XML,
+                        query=query,
+                        **kwargs,
+                    )
+                )
+            xml_submission_ids = [
+                submissions_by_uuid[
+                    fromstring_preserve_root_xmlns(xml_submission)
+                    .find('./meta/instanceID')
+                    .text
+                ]
+                for xml_submission in xml_submissions
+            ]
+            return xml_submission_ids, patched_get_xml_batch.call_count
+
+        # Three full batches
+        assert get_xml_submission_ids(query) == (submission_ids, 3)
+
+        # The last batch is partial
+        filtered_ids = submission_ids[:1] + submission_ids[2:]
+        assert get_xml_submission_ids(
+            query, submission_ids=list(reversed(filtered_ids))
+        ) == (filtered_ids, 3)
+
+        # Only submissions matching both the query and `submission_ids`
+        someuser_ids = [
+            submission['_id']
+            for submission in self.submissions_submitted_by_someuser
+        ]
+        assert get_xml_submission_ids(
+            {'_submitted_by': 'someuser'}, submission_ids=submission_ids[:3]
+        ) == (someuser_ids[:1], 1)
+
     def test_retrieve_submission_as_owner(self):
         """
         someuser is the owner of the project.
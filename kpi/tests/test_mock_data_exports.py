@@ -8,7 +8,7 @@ from zoneinfo import ZoneInfo
 
 import openpyxl
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from kobo.apps.kobo_auth.shortcuts import User
@@ -478,6 +478,22 @@ class MockDataExports(MockDataExportsBase):
                 ]
                 assert result_row == expected_row
 
+    def test_formpack_is_cached(self):
+        with mock.patch(
+            'kpi.models.AssetVersion.to_formpack_schema'
+        ) as to_formpack_schema:
+            pack, _ = report_data.build_formpack(self.asset, submission_stream=[])
+            to_formpack_schema.assert_not_called()
+        assert list(pack.versions.keys()) == list(self.formpack.versions.keys())
+
+        # Deploying a new version invalidates the cache
+        self.asset = Asset.objects.get(pk=self.asset.pk)
+        self.asset.content.setdefault('settings', {})['style'] = 'pages'
+        self.asset.save()
+        self.asset.deploy(backend='mock', active=True)
+        pack, _ = report_data.build_formpack(self.asset, submission_stream=[])
+        assert len(pack.versions) == len(self.formpack.versions) + 1
+
     def test_csv_export_default_options(self):
         submissions = self.forms[self.form_names[0]]['submissions']
         version_uid = self.asset.latest_deployed_version.uid
@@ -1369,6 +1385,32 @@ class MockDataExports(MockDataExportsBase):
         }
         self.run_xls_export_test(expected_data, asset=asset, repeat_group=True)
 
+    @override_settings(EXPORT_UPLOAD_CHUNK_SIZE=1024)
+    def test_xls_export_is_uploaded_by_chunks(self):
+        export_task = SubmissionExportTask()
+        export_task.user = self.user
+        export_task.data = {
+            'source': reverse('asset-detail', args=[self.asset.uid]),
+            'type': 'xls',
+        }
+        messages = defaultdict(list)
+        with mock.patch.object(
+            SubmissionExportTask,
+            '_report_progress',
+            autospec=True,
+            side_effect=SubmissionExportTask._report_progress,
+        ) as report_progress:
+            export_task._run_task(messages)
+
+        assert not messages
+        result_size = export_task.result.size
+        assert result_size > 1024
+        # Progress is reported after each chunk
+        assert report_progress.call_count == -(-result_size // 1024)
+        assert export_task.data['bytes_written'] == result_size
+        # The workbook is still valid
+        assert openpyxl.load_workbook(export_task.result).sheetnames
+
     def test_export_spss_labels(self):
         export_task = SubmissionExportTask()
         export_task.user = self.user
@@ -1596,6 +1638,33 @@ class MockDataExports(MockDataExportsBase):
         self.run_csv_export_test(
             expected_lines, {'fields_from_all_versions': 'false'})
 
+    def test_export_attachments(self):
+        asset = self.assets['Simple media']
+        submission = self.forms['Simple media']['submissions'][0]
+
+        def run_attachments_export(user):
+            export_task = SubmissionExportTask()
+            export_task.user = user
+            export_task.data = {
+                'source': reverse('asset-detail', args=[asset.uid]),
+                'type': 'attachments',
+            }
+            messages = defaultdict(list)
+            export_task._run_task(messages)
+            self.assertFalse(messages)
+            self.assertTrue(export_task.result.name.endswith('.zip'))
+            with export_task.result.open('rb') as result:
+                with zipfile.ZipFile(result) as zip_file:
+                    return zip_file.namelist()
+
+        # One folder per submission
+        self.assertEqual(
+            run_attachments_export(self.user),
+            [f"{submission['_id']}/audio_conversion_test_image.jpg"],
+        )
+        # `anotheruser` can only see their own submissions
+        self.assertEqual(run_attachments_export(self.anotheruser), [])
+
     def test_export_exceeding_api_submission_limit(self):
         """
         Make sure the limit on count of submissions returned by the API does
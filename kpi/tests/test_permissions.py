@@ -2,6 +2,7 @@
 import unittest
 
 from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
 from django.test import TestCase
 
 from kobo.apps.kobo_auth.shortcuts import User
@@ -256,6 +257,74 @@ class PermissionsTestCase(BasePermissionsTestCase):
         self._test_add_remove_inherited_perm(self.admin_collection, 'change_',
                                              self.someuser, self.admin_asset)
 
+    def test_nested_collections_inherited_permissions(self):
+        sub_collection = Asset.objects.create(
+            asset_type=ASSET_TYPE_COLLECTION,
+            owner=self.admin,
+            parent=self.admin_collection,
+        )
+        self.admin_asset.parent = sub_collection
+        self.admin_asset.save()
+        self.assertFalse(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+
+        self.admin_collection.assign_perm(self.someuser, PERM_VIEW_ASSET)
+        self.assertTrue(self.someuser.has_perm(PERM_VIEW_ASSET, sub_collection))
+        self.assertTrue(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+        inherited_uids = set(
+            ObjectPermission.objects.filter(
+                asset=self.admin_asset, inherited=True
+            ).values_list('uid', flat=True)
+        )
+
+        # Denying the permission on the intermediate collection stops
+        # inheritance for its descendants only
+        sub_collection.assign_perm(self.someuser, PERM_VIEW_ASSET, deny=True)
+        self.assertTrue(
+            self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_collection)
+        )
+        self.assertFalse(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+
+        # Unchanged inherited permissions (i.e. the owner's) are kept as is
+        remaining_uids = set(
+            ObjectPermission.objects.filter(
+                asset=self.admin_asset, inherited=True
+            ).values_list('uid', flat=True)
+        )
+        self.assertTrue(remaining_uids)
+        self.assertTrue(remaining_uids < inherited_uids)
+
+    def test_shared_permissions_cache_is_invalidated(self):
+        self.assertFalse(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+        self.admin_asset.assign_perm(self.someuser, PERM_VIEW_ASSET)
+        self.assertTrue(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+
+        self.admin_asset.remove_perm(self.someuser, PERM_VIEW_ASSET)
+        self.assertFalse(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+
+        # Bulk deletions invalidate the cache too
+        self.admin_asset.assign_perm(self.someuser, PERM_VIEW_ASSET)
+        self.assertTrue(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+        ObjectPermission.objects.filter(
+            asset=self.admin_asset, user=self.someuser
+        ).delete()
+        self.assertFalse(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+
+    def test_bulk_operations_invalidate_affected_permissions(self):
+        self.admin_asset.assign_perm(self.someuser, PERM_VIEW_ASSET)
+        self.assertTrue(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+
+        queryset = ObjectPermission.objects.filter(
+            Q(asset=self.admin_asset) & ~Q(user=self.admin)
+        )
+        with self.assertNumQueries(1):
+            asset_ids, user_ids = queryset._get_affected_asset_and_user_ids()
+        self.assertEqual(asset_ids, {self.admin_asset.pk})
+        self.assertIn(self.someuser.pk, user_ids)
+        self.assertNotIn(self.admin.pk, user_ids)
+
+        queryset.delete()
+        self.assertFalse(self.someuser.has_perm(PERM_VIEW_ASSET, self.admin_asset))
+
     def test_implied_asset_grant_permissions(self):
         implications = {
             PERM_CHANGE_ASSET: (PERM_VIEW_ASSET,),
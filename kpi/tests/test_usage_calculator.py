@@ -13,7 +13,9 @@ from kobo.apps.kobo_auth.shortcuts import User
 from kobo.apps.organizations.models import Organization
 from kobo.apps.stripe.constants import USAGE_LIMIT_MAP
 from kobo.apps.stripe.tests.utils import generate_mmo_subscription
-from kobo.apps.trackers.models import NLPUsageCounter
+from kobo.apps.trackers.models import NLPUsageCounter, UsageRollup
+from kobo.apps.trackers.tasks import reconcile_usage_rollups
+from kobo.apps.trackers.utils import update_nlp_counter
 from kpi.models import Asset
 from kpi.tests.base_test_case import BaseAssetTestCase
 from kpi.urls.router_api_v2 import URL_NAMESPACE as ROUTER_URL_NAMESPACE
@@ -228,3 +230,77 @@ class ServiceUsageCalculatorTestCase(BaseServiceUsageTestCase):
         submission_counters = calculator.get_submission_counters()
         assert submission_counters['current_period'] == 5
         assert submission_counters['all_time'] == 5
+
+    @override_settings(USAGE_ROLLUPS=True)
+    def test_usage_rollup_is_incremented(self):
+        calculator = ServiceUsageCalculator(self.anotheruser, disable_cache=True)
+        submission_counters = calculator.get_submission_counters()
+        assert submission_counters['current_period'] == 5
+        assert submission_counters['all_time'] == 5
+        assert UsageRollup.objects.filter(user=self.anotheruser).count() == 1
+
+        self.add_submissions(count=2)
+        update_nlp_counter(
+            'google_asr_seconds', 10, self.anotheruser.pk, self.asset.pk
+        )
+
+        submission_counters = calculator.get_submission_counters()
+        assert submission_counters['current_period'] == 7
+        assert submission_counters['all_time'] == 7
+        nlp_usage = calculator.get_nlp_usage_counters()
+        assert nlp_usage['asr_seconds_current_period'] == 4596
+        assert nlp_usage['asr_seconds_all_time'] == 4738
+        assert nlp_usage['mt_characters_current_period'] == 5473
+
+    @override_settings(USAGE_ROLLUPS=True)
+    def test_usage_rollup_ignores_usage_of_other_periods(self):
+        calculator = ServiceUsageCalculator(self.anotheruser, disable_cache=True)
+        calculator.get_submission_counters()
+
+        last_month = timezone.now().date() - relativedelta(months=1)
+        UsageRollup.increment(
+            self.anotheruser.pk, last_month, submissions=3, asr_seconds=10
+        )
+
+        submission_counters = calculator.get_submission_counters()
+        assert submission_counters['current_period'] == 5
+        assert submission_counters['all_time'] == 8
+        nlp_usage = calculator.get_nlp_usage_counters()
+        assert nlp_usage['asr_seconds_current_period'] == 4586
+        assert nlp_usage['asr_seconds_all_time'] == 4738
+
+    @override_settings(USAGE_ROLLUPS=True, USAGE_ROLLUPS_MAX_AGE=60)
+    def test_stale_usage_rollup_is_summed_again(self):
+        calculator = ServiceUsageCalculator(self.anotheruser, disable_cache=True)
+        calculator.get_submission_counters()
+        UsageRollup.objects.filter(user=self.anotheruser).update(
+            submissions_current_period=0, submissions_all_time=0
+        )
+
+        # Still fresh, drift is not corrected yet
+        assert calculator.get_submission_counters()['all_time'] == 0
+
+        UsageRollup.objects.filter(user=self.anotheruser).update(
+            date_modified=timezone.now() - relativedelta(minutes=2)
+        )
+        submission_counters = calculator.get_submission_counters()
+        assert submission_counters['current_period'] == 5
+        assert submission_counters['all_time'] == 5
+        assert UsageRollup.objects.filter(user=self.anotheruser).count() == 1
+
+    @override_settings(USAGE_ROLLUPS=True)
+    def test_reconcile_usage_rollups(self):
+        calculator = ServiceUsageCalculator(self.anotheruser, disable_cache=True)
+        calculator.get_submission_counters()
+        UsageRollup.objects.filter(user=self.anotheruser).update(
+            submissions_current_period=1,
+            submissions_all_time=1,
+            asr_seconds_all_time=0,
+        )
+
+        reconcile_usage_rollups()
+
+        rollup = UsageRollup.objects.get(user=self.anotheruser)
+        assert rollup.submissions_current_period == 5
+        assert rollup.submissions_all_time == 5
+        assert rollup.asr_seconds_all_time == 4728
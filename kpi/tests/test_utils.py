@@ -22,6 +22,7 @@ from kpi.utils.query_parser import parse
 from kpi.utils.sluggify import sluggify, sluggify_label
 from kpi.utils.strings import split_lines_to_list
 from kpi.utils.xml import (
+    NodeStripper,
     edit_submission_xml,
     fromstring_preserve_root_xmlns,
     get_or_create_element,
@@ -622,6 +623,41 @@ class XmlUtilsTestCase(TestCase):
 
         )
 
+    def test_strip_xml_nodes_by_xpaths_in_repeat_groups(self):
+        source = (
+            '<root>'
+            '    <repeat><question_1>A</question_1><question_2>B</question_2></repeat>'
+            '    <repeat><question_1>C</question_1><question_2>D</question_2></repeat>'
+            '    <question_3>E</question_3>'
+            '</root>'
+        )
+        expected = (
+            '<root>'
+            '    <repeat><question_1>A</question_1></repeat>'
+            '    <repeat><question_1>C</question_1></repeat>'
+            '</root>'
+        )
+        self.__compare_xml(
+            strip_nodes(source, ['repeat/question_1'], use_xpath=True),
+            expected,
+        )
+
+    def test_strip_many_xml_documents(self):
+        stripper = NodeStripper(
+            ['group1/question_5'], use_xpath=True, rename_root_node_to='data'
+        )
+        expected = (
+            '<data>'
+            '    <group1>'
+            '        <question_5>Answer 5</question_5>'
+            '    </group1>'
+            '</data>'
+        )
+        results = list(stripper.strip_many([self.__submission] * 2))
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.__compare_xml(result, expected)
+
     def test_get_or_create_element(self):
         initial_xml_with_ns = """
             <hello xmlns="http://opendatakit.org/submissions">
@@ -0,0 +1,97 @@
+from typing import Iterable
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from kpi.constants import ASSET_TYPE_SURVEY, PERM_VIEW_ASSET
+from kpi.utils.hash import calculate_hash
+from kpi.utils.object_permission import get_objects_for_user
+
+ASSETS_HASH_CACHE_PREFIX = 'assets_hash'
+
+
+def get_assets_hash(user: settings.AUTH_USER_MODEL) -> str:
+    """
+    Return the hash of `version_id` of all surveys `user` can view.
+
+    The hash is stored in the shared cache and only recalculated when it is
+    missing, i.e. after it has been voided by `invalidate_assets_hash()` or
+    has expired.
+    """
+    if not settings.ASSETS_HASH_CACHE_TIMEOUT:
+        return calculate_assets_hash(user)
+
+    key = f'{ASSETS_HASH_CACHE_PREFIX}:user:{user.pk}'
+    if (hash_ := cache.get(key)) is None:
+        hash_ = calculate_assets_hash(user)
+        cache.set(key, hash_, settings.ASSETS_HASH_CACHE_TIMEOUT)
+    return hash_
+
+
+def calculate_assets_hash(user: settings.AUTH_USER_MODEL) -> str:
+    """
+    Calculate the hash of `version_id` of all surveys `user` can view, or
+    return an empty string if there are none.
+    """
+    # Referencing models this way avoids a circular import
+    Asset = apps.get_model('kpi', 'Asset')  # noqa
+    AssetVersion = apps.get_model('kpi', 'AssetVersion')  # noqa
+
+    # Fetch the `uid` of each latest version within the same query instead of
+    # reading `Asset.version_id` asset by asset
+    latest_version_uid = (
+        AssetVersion.objects.filter(asset_id=OuterRef('pk'))
+        .order_by('-date_modified')
+        .values('uid')[:1]
+    )
+    assets_version_ids = sorted(
+        version_id
+        for version_id in (
+            get_objects_for_user(user, PERM_VIEW_ASSET, Asset)
+            .filter(asset_type=ASSET_TYPE_SURVEY)
+            .annotate(latest_version_uid=Subquery(latest_version_uid))
+            .values_list('latest_version_uid', flat=True)
+        )
+        if version_id is not None
+    )
+
+    if not assets_version_ids:
+        return ''
+
+    return calculate_hash(''.join(assets_version_ids), algorithm='md5')
+
+
+def invalidate_assets_hash(
+    asset_ids: Iterable[int] = (), user_ids: Iterable[int] = ()
+):
+    """
+    Void the cached assets hash of `user_ids` and of every user who has a
+    permission on one of `asset_ids`. Entries are voided again when the
+    current transaction is committed to discard anything calculated from a
+    concurrent request in between.
+    """
+    if not settings.ASSETS_HASH_CACHE_TIMEOUT:
+        return
+
+    user_ids = set(user_ids)
+    if asset_ids := set(asset_ids):
+        ObjectPermission = apps.get_model('kpi', 'ObjectPermission')  # noqa
+        user_ids.update(
+            ObjectPermission.objects.filter(asset_id__in=asset_ids)
+            .order_by()
+            .values_list('user_id', flat=True)
+            .distinct()
+        )
+
+    keys = [f'{ASSETS_HASH_CACHE_PREFIX}:user:{pk}' for pk in user_ids]
+    if not keys:
+        return
+
+    def delete_keys():
+        cache.delete_many(keys)
+
+    delete_keys()
+    transaction.on_commit(delete_keys)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 
-from django.db.models import Field, Lookup
+from django.db.models import CharField, Field, Lookup, TextField
 from django.db.models.expressions import Func, Value
 
 
@@ -64,6 +64,31 @@ class DeductUsageValue(Func):
         )
 
 
+class JSONBArrayElementsText(Func):
+    """
+    Expand a JSON array into a set of text values, one row per element.
+
+    Being a set-returning function, it cannot be used in `WHERE` clauses.
+    Rows must be restricted to arrays beforehand (see `JSONBTypeOf`), other
+    JSON types raise an error.
+    """
+
+    function = 'jsonb_array_elements_text'
+    arity = 1
+    output_field = TextField()
+
+
+class JSONBTypeOf(Func):
+    """
+    Return the type of a JSON value as a string, e.g. `'object'`, `'array'`,
+    `'string'`, etc.
+    """
+
+    function = 'jsonb_typeof'
+    arity = 1
+    output_field = CharField()
+
+
 class OrderCustomCharField(Func):
     """
     DO NOT use on fields other than CharField while the application maintains
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Optional, Union
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def get_etag(md5_hash: Optional[str]) -> Optional[str]:
+    """
+    Build a strong ETag from a stored hash, e.g. `AssetFile.md5_hash` or
+    `MetaData.file_hash`. Return `None` if the hash is empty.
+    """
+    if not md5_hash or md5_hash == 'md5:':
+        return None
+    return quote_etag(md5_hash)
+
+
+def get_not_modified_response(
+    request: Union[HttpRequest, 'rest_framework.request.Request'],
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    headers: Optional[dict] = None,
+) -> Optional[HttpResponse]:
+    """
+    Return a "304 Not Modified" (or "412 Precondition Failed") response if
+    `request` conditional headers (`If-None-Match`, `If-Modified-Since`, etc.)
+    match `etag` and `last_modified`. Otherwise, return `None` and let the
+    caller send the whole content.
+    """
+    if etag is None and last_modified is None:
+        return None
+
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=(
+            int(last_modified.timestamp()) if last_modified else None
+        ),
+    )
+    if response is None:
+        return None
+
+    add_conditional_headers(response, etag, last_modified)
+    for key, value in (headers or {}).items():
+        if key != 'Content-Type':
+            response[key] = value
+    return response
+
+
+def add_conditional_headers(
+    response: HttpResponse,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+) -> HttpResponse:
+    """
+    Add `ETag` and `Last-Modified` headers to `response` to let clients send
+    conditional requests next time.
+    """
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
@@ -139,7 +139,15 @@ class MongoHelper:
         submission_ids: Optional[list] = None,
         permission_filters: Optional[list] = None,
         skip_count=False,
+        after: Optional[int] = None,
     ):
+        """
+        Return a cursor on matching submissions and their total count.
+
+        If `after` is provided, only submissions whose `_id` is greater than
+        `after` are returned (i.e. keyset pagination). It is applied to the
+        cursor only, the total count still reflects the whole result set.
+        """
         cursor, total_count = cls._get_cursor_and_count(
             mongo_userform_id,
             fields=fields,
@@ -147,6 +155,7 @@ class MongoHelper:
             submission_ids=submission_ids,
             permission_filters=permission_filters,
             skip_count=skip_count,
+            after=after,
         )
 
         cursor.skip(start)
@@ -345,6 +354,7 @@ class MongoHelper:
         submission_ids: Optional[list] = None,
         permission_filters=None,
         skip_count=False,
+        after: Optional[int] = None,
     ):
         if query is None:
             query = {}
@@ -384,8 +394,18 @@ class MongoHelper:
             # Retrieve all fields except `cls.USERFORM_ID`
             fields_to_select = {cls.USERFORM_ID: 0}
 
+        cursor_query = query
+        if after is not None:
+            # Range query on `_id` to let Mongo walk the `{_userform_id, _id}`
+            # index instead of skipping documents.
+            after_filter = {'$gt': after}
+            if '_id' in query:
+                cursor_query = {cls.AND_OPERATOR: [query, {'_id': after_filter}]}
+            else:
+                cursor_query = {**query, '_id': after_filter}
+
         cursor = settings.MONGO_DB.instances.find(
-            query, fields_to_select, max_time_ms=cls.get_max_time_ms()
+            cursor_query, fields_to_select, max_time_ms=cls.get_max_time_ms()
         )
         count = None
         if not skip_count:
@@ -1,3 +1,4 @@
+from datetime import timedelta
 from json import dumps, loads
 
 from django.apps import apps
@@ -7,7 +8,11 @@ from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from kobo.apps.kobo_auth.shortcuts import User
-from kobo.apps.openrosa.apps.logger.models import DailyXFormSubmissionCounter, XForm
+from kobo.apps.openrosa.apps.logger.models import (
+    DailyXFormSubmissionCounter,
+    SubmissionCounterDelta,
+    XForm,
+)
 from kobo.apps.organizations.utils import get_billing_dates
 from kpi.utils.cache import CachedClass, cached_class_property
 
@@ -50,10 +55,26 @@ class ServiceUsageCalculator(CachedClass):
     def get_last_updated(self):
         return self._cache_last_updated()
 
+    def get_nlp_usage_counters(self):
+        if settings.USAGE_ROLLUPS:
+            rollup = self._get_usage_rollup()
+            return {
+                'asr_seconds_current_period': rollup.asr_seconds_current_period,
+                'mt_characters_current_period': (
+                    rollup.mt_characters_current_period
+                ),
+                'asr_seconds_all_time': rollup.asr_seconds_all_time,
+                'mt_characters_all_time': rollup.mt_characters_all_time,
+            }
+        return self._get_cached_nlp_usage_counters()
+
     @cached_class_property(
         key='nlp_usage_counters', serializer=dumps, deserializer=loads
     )
-    def get_nlp_usage_counters(self):
+    def _get_cached_nlp_usage_counters(self):
+        return self._sum_nlp_usage_counters()
+
+    def _sum_nlp_usage_counters(self):
         NLPUsageCounter = apps.get_model('trackers', 'NLPUsageCounter')  # noqa
 
         nlp_tracking = (
@@ -100,31 +121,104 @@ class ServiceUsageCalculator(CachedClass):
 
         return total_storage_bytes['bytes_sum'] or 0
 
-    @cached_class_property(
-        key='submission_counters', serializer=dumps, deserializer=loads
-    )
     def get_submission_counters(self):
         """
         Calculate submissions for all users' projects even their deleted ones
 
         Users are represented by their ids with `self._user_ids`
         """
-        submission_count = (
-            DailyXFormSubmissionCounter.objects.only('counter', 'user_id')
-            .filter(user_id=self._user_id)
-            .aggregate(
-                all_time=Coalesce(Sum('counter'), 0),
-                current_period=Coalesce(
-                    Sum('counter', filter=self.current_period_filter), 0
-                ),
+        if settings.USAGE_ROLLUPS:
+            rollup = self._get_usage_rollup()
+            submission_counters = {
+                'all_time': rollup.submissions_all_time,
+                'current_period': rollup.submissions_current_period,
+            }
+            # Rollups are incremented when deltas are folded
+            if settings.BUFFERED_SUBMISSION_COUNTERS:
+                pending = self._sum_submission_counters(
+                    models=[SubmissionCounterDelta]
+                )
+                for submission_key, count in pending.items():
+                    submission_counters[submission_key] += count
+            return submission_counters
+
+        return self._get_cached_submission_counters()
+
+    @cached_class_property(
+        key='submission_counters', serializer=dumps, deserializer=loads
+    )
+    def _get_cached_submission_counters(self):
+        return self._sum_submission_counters()
+
+    def _sum_submission_counters(self, models: list = None):
+        # Increments which are not folded yet into the daily counters must be
+        # counted too. See `BUFFERED_SUBMISSION_COUNTERS`
+        if models is None:
+            models = [DailyXFormSubmissionCounter, SubmissionCounterDelta]
+
+        total_submission_count = {'all_time': 0, 'current_period': 0}
+        for model in models:
+            submission_count = (
+                model.objects.only('counter', 'user_id')
+                .filter(user_id=self._user_id)
+                .aggregate(
+                    all_time=Coalesce(Sum('counter'), 0),
+                    current_period=Coalesce(
+                        Sum('counter', filter=self.current_period_filter), 0
+                    ),
+                )
             )
+            for submission_key, count in submission_count.items():
+                total_submission_count[submission_key] += count or 0
+
+        return total_submission_count
+
+    def reseed_usage_rollup(self):
+        """
+        Recalculate the usage rollup of the current billing period from the
+        counters, to correct any drift. See `reconcile_usage_rollups()`
+        """
+        UsageRollup = apps.get_model('trackers', 'UsageRollup')  # noqa
+        return UsageRollup.seed(
+            self._user_id,
+            self.current_period_start,
+            self.current_period_end,
+            self._seed_usage_rollup,
         )
 
-        total_submission_count = {}
-        for submission_key, count in submission_count.items():
-            total_submission_count[submission_key] = count if count is not None else 0
+    def _get_usage_rollup(self):
+        """
+        Return the usage of the current billing period, which is kept up to
+        date by the counters themselves. See `UsageRollup`
 
-        return total_submission_count
+        Rollups which have not been modified for `USAGE_ROLLUPS_MAX_AGE`
+        seconds, e.g. because they are not reconciled anymore, are summed
+        from the counters again.
+        """
+        UsageRollup = apps.get_model('trackers', 'UsageRollup')  # noqa
+        return UsageRollup.get_or_seed(
+            self._user_id,
+            self.current_period_start,
+            self.current_period_end,
+            self._seed_usage_rollup,
+            max_age=timedelta(seconds=settings.USAGE_ROLLUPS_MAX_AGE),
+        )
+
+    def _seed_usage_rollup(self):
+        submissions = self._sum_submission_counters(
+            models=[DailyXFormSubmissionCounter]
+        )
+        nlp_usage = self._sum_nlp_usage_counters()
+        return {
+            'submissions_all_time': submissions['all_time'],
+            'submissions_current_period': submissions['current_period'],
+            'asr_seconds_all_time': nlp_usage['asr_seconds_all_time'],
+            'asr_seconds_current_period': nlp_usage['asr_seconds_current_period'],
+            'mt_characters_all_time': nlp_usage['mt_characters_all_time'],
+            'mt_characters_current_period': nlp_usage[
+                'mt_characters_current_period'
+            ],
+        }
 
     def _get_cache_hash(self):
         if self.organization is None:
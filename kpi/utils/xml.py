@@ -1,16 +1,15 @@
 from __future__ import annotations
 
 import re
-from typing import Optional, Union
+from functools import lru_cache
+from typing import Generator, Iterable, Optional, Union
 from xml.dom import Node
 
 from defusedxml import minidom
 from defusedxml.lxml import fromstring
 from django.db.models import F, Q
 from django.db.models.query import QuerySet
-from django_request_cache import cache_for_request
 from lxml import etree
-from shortuuid import ShortUUID
 
 from kobo.apps.form_disclaimer.models import FormDisclaimer
 from kpi.exceptions import DTDForbiddenException, EntitiesForbiddenException
@@ -174,6 +173,160 @@ def get_or_create_element(
     return el
 
 
+class NodeStripper:
+    """
+    Keep only `nodes_to_keep` in XML documents, e.g. submissions sent to
+    REST Services or exposed as paired data.
+
+    Kept nodes are compiled once into a trie (or a set of names if
+    `use_xpath` is `False`) which is reused for every document. Each document
+    is then pruned in a single iterative pass over its tree, without
+    computing the XPath of any node.
+
+    If `use_xpath` is `True`, `nodes_to_keep` contains XPaths relative to the
+    root node, e.g. `group1/question_1`. Otherwise, it contains node names
+    and every node with one of these names is kept, wherever it is.
+    In both cases, the descendants and ancestors of kept nodes are kept too.
+    """
+
+    # Marks the end of a kept XPath in the trie
+    KEEP = object()
+
+    def __init__(
+        self,
+        nodes_to_keep: Iterable[str],
+        use_xpath: bool = False,
+        xml_declaration: bool = False,
+        rename_root_node_to: Optional[str] = None,
+    ):
+        self.use_xpath = use_xpath
+        self.xml_declaration = xml_declaration
+        self.rename_root_node_to = rename_root_node_to
+        self._names = set()
+        self._trie = {}
+
+        if use_xpath:
+            for xpath in nodes_to_keep:
+                trie_node = self._trie
+                for name in xpath.strip('/').split('/'):
+                    trie_node = trie_node.setdefault(name, {})
+                trie_node[self.KEEP] = True
+        else:
+            self._names = set(nodes_to_keep)
+
+        self._strip = bool(self._trie or self._names)
+
+    def strip(self, source: Union[str, bytes]) -> str:
+        """
+        Return a stripped version of `source`.
+        """
+        # Force `source` to be bytes in case it contains an XML declaration
+        # `etree` does not support strings with xml declarations.
+        if isinstance(source, str):
+            source = source.encode()
+
+        root_element = etree.fromstring(source)
+
+        if self._strip:
+            if self.use_xpath:
+                self._prune_by_xpath(root_element)
+            else:
+                self._prune_by_name(root_element)
+
+        if self.rename_root_node_to:
+            root_element.tag = self.rename_root_node_to
+
+        return etree.tostring(
+            etree.ElementTree(root_element),
+            pretty_print=True,
+            encoding='utf-8',
+            xml_declaration=self.xml_declaration,
+        ).decode()
+
+    def strip_many(
+        self, sources: Iterable[Union[str, bytes]]
+    ) -> Generator[str, None, None]:
+        """
+        Yield a stripped version of each document of `sources`.
+        """
+        for source in sources:
+            yield self.strip(source)
+
+    def _prune(self, root_element: etree._Element, get_child_state):
+        """
+        Walk the tree top-down. `get_child_state()` tells, for each child,
+        whether its whole subtree is kept (`True`), removed (`None`), or
+        depends on its descendants (any other value, passed down to its own
+        children).
+
+        Nodes which depend on their descendants are visited again bottom-up
+        and removed if none of their children have been kept.
+        """
+        stack = [(root_element, self._trie)]
+        undecided = []
+        while stack:
+            node, state = stack.pop()
+            for child in list(node):
+                child_state = (
+                    get_child_state(child.tag, state)
+                    if isinstance(child.tag, str)
+                    else None
+                )
+                if child_state is True:
+                    continue
+                if child_state is None:
+                    node.remove(child)
+                    continue
+                undecided.append(child)
+                stack.append((child, child_state))
+
+        # Children are always appended after their ancestors; walk the list
+        # backwards to process the most nested nodes first
+        for node in reversed(undecided):
+            if not len(node):
+                node.getparent().remove(node)
+
+    def _prune_by_name(self, root_element: etree._Element):
+        names = self._names
+
+        def get_child_state(tag, state):
+            return True if tag in names else state
+
+        self._prune(root_element, get_child_state)
+
+    def _prune_by_xpath(self, root_element: etree._Element):
+        keep = self.KEEP
+
+        def get_child_state(tag, trie_node):
+            child_trie_node = trie_node.get(tag)
+            if child_trie_node is None:
+                return None
+            if keep in child_trie_node:
+                return True
+            return child_trie_node
+
+        self._prune(root_element, get_child_state)
+
+
+@lru_cache(maxsize=128)
+def get_node_stripper(
+    nodes_to_keep: tuple,
+    use_xpath: bool = False,
+    xml_declaration: bool = False,
+    rename_root_node_to: Optional[str] = None,
+) -> NodeStripper:
+    """
+    Return a compiled `NodeStripper`, shared by all callers using the same
+    parameters.
+    """
+    return NodeStripper(
+        nodes_to_keep,
+        use_xpath=use_xpath,
+        xml_declaration=xml_declaration,
+        rename_root_node_to=rename_root_node_to,
+    )
+
+
 def strip_nodes(
     source: Union[str, bytes],
     nodes_to_keep: list,
@@ -188,135 +341,19 @@ def strip_nodes(
     If `rename_root_node_to` is provided, the root node will be renamed to the
     value of that parameter in the returned XML string.
 
-    A random string can be passed to `bulk_action_cache_key` to get the
-    XPaths only once if calling `strip_nodes()` several times in a loop.
-    """
-    # Force `source` to be bytes in case it contains an XML declaration
-    # `etree` does not support strings with xml declarations.
-    if isinstance(source, str):
-        source = source.encode()
-
-    # Build xml to be parsed
-    xml_doc = etree.fromstring(source)
-    tree = etree.ElementTree(xml_doc)
-    root_element = tree.getroot()
-    root_path = tree.getpath(root_element)
-
-    # `@cache_for_request` uses the parameters of the function it decorates
-    # to generate the key under which the returned value of the function is
-    # stored for cache purpose.
-    # `cache_key` is only there to serve that purpose and ensure
-    # `@cache_for_request` uniqueness.
-    @cache_for_request
-    def get_xpath_matches(cache_key: str):
-        if use_xpath:
-            xpaths_ = []
-            for xpath_ in nodes_to_keep:
-                xpaths_.append(f"/{xpath_.strip('/')}/")
-            return xpaths_
-
-        xpath_matches = []
-        # Retrieve XPaths of all nodes we need to keep
-        for node_to_keep in nodes_to_keep:
-            for node in tree.iter(node_to_keep):
-                xpath_match = remove_root_path(tree.getpath(node))
-                # To make a difference between XPaths with same beginning
-                # string, we need to add a trailing slash for later comparison
-                # in `process_node()`.
-                # For example, `subgroup1` would match both `subgroup1/` and
-                # `subgroup11/`, but `subgroup1/` correctly excludes
-                # `subgroup11/`
-                xpath_matches.append(f'{xpath_match}/')
-
-        return xpath_matches
-
-    def process_node(node_: etree._Element, xpath_matches_: list):
-        """
-        `process_node()` is a recursive function.
-
-        First, it loops through all children of the root element.
-        Then for each child, it loops through its children if any, etc...
-        When all children are processed, it checks whether the node should be
-        removed or not.
-
-        The most nested children are processed first in order to know which
-        parents must be kept.
-
-        For example:
-        With `nodes_to_keep = ['question_2', 'question_3']` and this XML:
-        <root>
-          <group>
-              <question_1>Value1</question_1>
-              <question_2>Value2</question_2>
-          </group>
-          <question_3>Value3</question_3>
-        </root>
-
-         Nodes are processed in this order:
-         - `<question_1>`: Removed because not in `nodes_to_keep`
-
-         - `<question_2>`: Kept. Parent node `<group>` is tagged `do_not_delete`
-
-         - `<group>`: Kept even if it is not in `nodes_to_keep` because
-                      it is tagged `do_not_delete` by its child `<question_2>`
-
-         - `<question_3>`: Kept.
-
-        Results:
-        <root>
-          <group>
-              <question_2>Value2</question1>
-          </group>
-          <question3>Value3</question3>
-        </root>
-        """
-        for child in node_.getchildren():
-            process_node(child, xpath_matches_)
-
-        # Get XPath of current node
-        node_xpath = remove_root_path(tree.getpath(node_))
-
-        # If `node_path` does not start with one of the occurrences previously
-        # found, it must be removed.
-        if (
-            not f'{node_xpath}/'.startswith(tuple(xpath_matches_))
-            and node_.get('do_not_delete') != 'true'
-        ):
-            if node_ != root_element:
-                node_.getparent().remove(node_)
-        elif node_xpath != '':
-            # node matches, keep its parent too.
-            node_.getparent().set('do_not_delete', 'true')
-
-        # All children have been processed and `node_` seems to be a parent we
-        # need to keep. Remove `do_not_delete` flag to avoid rendering it in
-        # final xml
-        if node_.attrib.get('do_not_delete'):
-            del node_.attrib['do_not_delete']
-
-    def remove_root_path(path_: str) -> str:
-        return path_.replace(root_path, '')
-
-    if len(nodes_to_keep):
-        # Always sends an unique string to `get_xpath_matches()`
-        # See comments above the function
-        if bulk_action_cache_key is None:
-            cache_key = ShortUUID().random(24)
-        else:
-            cache_key = bulk_action_cache_key
-
-        xpath_matches = get_xpath_matches(cache_key=cache_key)
-        process_node(root_element, xpath_matches)
+    `bulk_action_cache_key` is not used anymore: compiled nodes to keep are
+    always reused across calls. To strip many documents, prefer
+    `NodeStripper.strip_many()`.
 
-    if rename_root_node_to:
-        tree.getroot().tag = rename_root_node_to
-
-    return etree.tostring(
-        tree,
-        pretty_print=True,
-        encoding='utf-8',
+    See `NodeStripper` for details.
+    """
+    stripper = get_node_stripper(
+        tuple(nodes_to_keep),
+        use_xpath=use_xpath,
         xml_declaration=xml_declaration,
-    ).decode()
+        rename_root_node_to=rename_root_node_to,
+    )
+    return stripper.strip(source)
 
 
 def xml_tostring(el: ET.Element) -> str:
@@ -1,9 +1,10 @@
 import copy
 import json
-from collections import OrderedDict, defaultdict
+from collections import defaultdict
 from operator import itemgetter
 
-from django.db.models import Count
+from django.db.models import Count, Min
+from django.db.models.fields.json import KT, KeyTransform
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import exceptions, renderers, status
@@ -49,9 +50,10 @@ from kpi.serializers.v2.asset import (
 from kpi.serializers.v2.deployment import DeploymentSerializer
 from kpi.serializers.v2.reports import ReportsDetailSerializer
 from kpi.utils.bugfix import repair_file_column_content_and_save
-from kpi.utils.hash import calculate_hash
+from kpi.utils.django_orm_helper import JSONBArrayElementsText, JSONBTypeOf
+from kpi.utils.assets_hash import get_assets_hash
 from kpi.utils.kobo_to_xlsform import to_xlsform_structure
-from kpi.utils.object_permission import get_database_user, get_objects_for_user
+from kpi.utils.object_permission import get_database_user
 from kpi.utils.ss_structure_to_mdtable import ss_structure_to_mdtable
 
 
@@ -589,70 +591,52 @@ class AssetViewSet(
 
         :return: dict
         """
-        metadata = {
-            'languages': set(),
-            'countries': OrderedDict(),
-            'sectors': OrderedDict(),
-            'organizations': set(),
-        }
-
-        records = queryset.values('summary', 'settings').exclude(
+        records = queryset.exclude(
             summary__languages=[],
             settings__country_codes=[],
             settings__sector={},
             settings__organization='',
+        ).order_by()
+
+        # Facets are aggregated by the database to avoid loading `summary`
+        # and `settings` of every asset in memory.
+        # Set-returning functions (i.e. `jsonb_array_elements_text`) cannot be
+        # filtered in SQL, empty languages are skipped below.
+        languages = (
+            records.alias(
+                languages_type=JSONBTypeOf(KeyTransform('languages', 'summary'))
+            )
+            .filter(languages_type='array')
+            .annotate(
+                language=JSONBArrayElementsText(
+                    KeyTransform('languages', 'summary')
+                )
+            )
+            .values_list('language', flat=True)
+            .distinct()
         )
 
-        # Languages
-        records = records.order_by()
-
-        for record in records.all():
-            try:
-                languages = record['summary']['languages']
-            except (ValueError, KeyError):
-                pass
-            else:
-                for language in languages:
-                    if language:
-                        metadata['languages'].add(language)
-
-            try:
-                country = record['settings']['country']
-                value = country['value']
-                label = country['label']
-            except (KeyError, TypeError):
-                pass
-            else:
-                if value and value not in metadata['countries']:
-                    metadata['countries'][value] = label
-
-            try:
-                sector = record['settings']['sector']
-                value = sector['value']
-                label = sector['label']
-            except (KeyError, TypeError):
-                pass
-            else:
-                if value and value not in metadata['sectors']:
-                    metadata['sectors'][value] = label
-
-            try:
-                organization = record['settings']['organization']
-            except KeyError:
-                pass
-            else:
-                if organization:
-                    metadata['organizations'].add(organization)
-
-        metadata['languages'] = sorted(list(metadata['languages']))
-
-        metadata['countries'] = sorted(metadata['countries'].items(),
-                                       key=itemgetter(1))
-
-        metadata['sectors'] = sorted(metadata['sectors'].items(),
-                                     key=itemgetter(1))
-
-        metadata['organizations'] = sorted(list(metadata['organizations']))
+        metadata = {
+            'languages': sorted(language for language in languages if language),
+            'countries': sorted(
+                self._get_metadata_choices(records, 'country').items(),
+                key=itemgetter(1),
+            ),
+            'sectors': sorted(
+                self._get_metadata_choices(records, 'sector').items(),
+                key=itemgetter(1),
+            ),
+            'organizations': sorted(
+                records.alias(
+                    organization_type=JSONBTypeOf('settings__organization')
+                )
+                .filter(organization_type='string')
+                .annotate(organization=KT('settings__organization'))
+                .exclude(organization='')
+                .values_list('organization', flat=True)
+                .distinct()
+            ),
+        }
 
         return metadata
 
@@ -684,16 +668,19 @@ class AssetViewSet(
             # The serializer will be able to pick what it needs from that dict
             # and narrow down data according to users' permissions.
 
-            # self.__filtered_queryset is set in the `list()` method that
-            # DRF automatically calls and is overridden below. This is
-            # to prevent double calls to `filter_queryset()` as described in
-            # the issue here: https://github.com/kobotoolbox/kpi/issues/2576
-            queryset = self.__filtered_queryset
+            # self.__listed_assets is set in the `list()` method that
+            # DRF automatically calls and is overridden below. It contains
+            # only the assets of the current page (if the list is paginated),
+            # thus related objects are fetched only for the assets about to be
+            # serialized, whatever the size of the filtered queryset.
 
-            # 1) Retrieve all asset IDs of the current list
-            asset_ids = AssetPagination.get_all_asset_ids_from_queryset(
-                queryset
-            )
+            # 1) Retrieve all asset IDs of the current page
+            if isinstance(self.__listed_assets, list):
+                asset_ids = [asset.pk for asset in self.__listed_assets]
+            else:
+                asset_ids = AssetPagination.get_all_asset_ids_from_queryset(
+                    self.__listed_assets
+                )
 
             # 2) Get object permissions per asset
             context_[
@@ -703,7 +690,8 @@ class AssetViewSet(
 
             # 3) Get the collection subscriptions per asset
             subscriptions_queryset = (
-                UserAssetSubscription.objects.values('asset_id', 'user_id')
+                UserAssetSubscription.objects.filter(asset_id__in=asset_ids)
+                .values('asset_id', 'user_id')
                 .distinct()
                 .order_by('asset_id')
             )
@@ -749,16 +737,19 @@ class AssetViewSet(
     def list(self, request, *args, **kwargs):
         # assigning global filtered query set to prevent additional,
         # unnecessary calls to `filter_queryset`
+        # (see https://github.com/kobotoolbox/kpi/issues/2576)
         self.__filtered_queryset = self.filter_queryset(self.get_queryset())
 
         page = self.paginate_queryset(self.__filtered_queryset)
         if page is not None:
+            self.__listed_assets = page
             serializer = self.get_serializer(page, many=True)
             metadata = None
             if request.GET.get('metadata') == 'on':
                 metadata = self.get_metadata(self.__filtered_queryset)
             return self.get_paginated_response(serializer.data, metadata)
 
+        self.__listed_assets = self.__filtered_queryset
         serializer = self.get_serializer(self.__filtered_queryset, many=True)
         return Response(serializer.data)
 
@@ -769,35 +760,19 @@ class AssetViewSet(
         Creates an hash of `version_id` of all accessible assets by the user.
         Useful to detect changes between each request.
 
+        The hash is cached per user and only recalculated after one of their
+        assets or permissions has changed.
+
         :param request:
         :return: JSON
         """
         user = self.request.user
         if user.is_anonymous:
             raise exceptions.NotAuthenticated()
-        else:
-            accessible_assets = (
-                get_objects_for_user(user, 'view_asset', Asset)
-                .filter(asset_type=ASSET_TYPE_SURVEY)
-                .order_by('uid')
-            )
-
-            assets_version_ids = [
-                asset.version_id
-                for asset in accessible_assets
-                if asset.version_id is not None
-            ]
-            # Sort alphabetically
-            assets_version_ids.sort()
-
-            if len(assets_version_ids) > 0:
-                hash_ = calculate_hash(''.join(assets_version_ids), algorithm='md5')
-            else:
-                hash_ = ''
 
-            return Response({
-                'hash': hash_
-            })
+        return Response({
+            'hash': get_assets_hash(user)
+        })
 
     @action(detail=False, methods=['GET'],
             renderer_classes=[renderers.JSONRenderer])
@@ -919,6 +894,31 @@ class AssetViewSet(
         else:
             return self.get_serializer(data=cloned_data)
 
+    @staticmethod
+    def _get_metadata_choices(records, setting: str) -> dict:
+        """
+        Return the labels of the choice stored in `settings[setting]` (e.g.
+        `country`, `sector`) across all `records`, by value.
+        """
+        choices = (
+            records.alias(
+                setting_type=JSONBTypeOf(KeyTransform(setting, 'settings'))
+            )
+            .filter(
+                setting_type='object',
+                **{f'settings__{setting}__has_key': 'label'},
+            )
+            .annotate(
+                choice_value=KT(f'settings__{setting}__value'),
+                choice_label=KT(f'settings__{setting}__label'),
+            )
+            .exclude(choice_value='')
+            .filter(choice_value__isnull=False)
+            .values_list('choice_value')
+            .annotate(Min('choice_label'))
+        )
+        return dict(choices)
+
     def _prepare_cloned_data(self, original_asset, source_version, partial_update):
         """
         Some business rules must be applied when cloning an asset to another with a different type.
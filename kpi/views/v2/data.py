@@ -94,6 +94,35 @@ class DataViewSet(
     >
     >       curl -X GET https://[kpi]/api/v2/assets/aSAvYreNzVEkrWg5Gdcvg/data/?start=0&limit=10
 
+    Clients which walk through all the submissions of big projects should use
+    cursor pagination instead. Add `after` (empty for the first page) to the
+    query string and follow the `next` link until it is `null`.
+    Response time stays the same whatever the page. `after` cannot be combined
+    with `start`, is only supported in JSON, and results are always sorted by
+    `_id`.
+
+    * `after`: Opaque cursor returned in the `next` link of the previous page
+
+    > Example: The first ten results with cursor pagination
+    >
+    >       curl -X GET https://[kpi]/api/v2/assets/aSAvYreNzVEkrWg5Gdcvg/data/ \\
+    >            -G -d after= -d limit=10
+
+    Counting submissions can be more expensive than retrieving the page itself.
+    Use `count_strategy` to choose how `count` is computed:
+
+    * `exact`: Count all matching submissions (default)
+    * `estimated`: Use cached counters when no `query` narrows down the
+      results, fall back on `exact` otherwise
+    * `none`: Do not count; `count` is `null`
+
+    The strategy which has been used is returned in `count_strategy`.
+
+    > Example
+    >
+    >       curl -X GET https://[kpi]/api/v2/assets/aSAvYreNzVEkrWg5Gdcvg/data/ \\
+    >            -G -d count_strategy=estimated
+
     ## Query submitted data
     Provides a list of submitted data for a specific form. Use `query`
     parameter to apply form data specific, see
@@ -102,7 +131,8 @@ class DataViewSet(
 
     For more details see
     <a href="https://github.com/SEL-Columbia/formhub/wiki/Formhub-Access-Points-(API)#api-parameters">API Parameters</a>.
-    <span class='label label-warning'>API parameter `count` is not implemented</span>
+    <span class='label label-warning'>API parameter `count` is not implemented,
+    see `count_strategy`</span>
 
 
     <pre class="prettyprint">
@@ -468,13 +498,14 @@ class DataViewSet(
                 raise serializers.ValidationError(message)
             logging.warning(message, exc_info=True)
             raise serializers.ValidationError('Unsupported query')
-        # Create a dummy list to let the Paginator do all the calculation
+        # Only pass the count to let the Paginator do all the calculation
         # for pagination because it does not need the list of real objects.
         # It avoids retrieving all the objects from MongoDB
-        dummy_submissions_list = [None] * deployment.current_submission_count
-        page = self.paginate_queryset(dummy_submissions_list)
+        page = self.paginate_queryset(deployment.current_submission_count)
         if page is not None:
-            return self.get_paginated_response(submissions)
+            return self.paginator.get_paginated_response(
+                submissions, deployment.current_submission_count_strategy
+            )
 
         return Response(list(submissions))
 
@@ -650,6 +681,13 @@ class DataViewSet(
 
         # Remove `format` from filters. No need to use it
         filters.pop('format', None)
+
+        # Convert opaque cursor into the `_id` to start after
+        cursor_query_param = self.pagination_class.cursor_query_param
+        if cursor_query_param in filters:
+            filters['after'] = self.pagination_class.decode_cursor(
+                filters.pop(cursor_query_param)
+            )
         # Do not allow requests to retrieve more than `SUBMISSION_LIST_LIMIT`
         # submissions at one time
         limit = filters.get('limit', settings.SUBMISSION_LIST_LIMIT)
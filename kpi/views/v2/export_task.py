@@ -99,6 +99,8 @@ class ExportTaskViewSet(
         * "summary", or
         * "details"
     * "type" (required) specifies the export format. Valid export formats include:
+        * "attachments", a zip archive of the attachments of the exported
+          submissions, with one folder per submission,
         * "csv",
         * "geojson",
         * "spss_labels", or
@@ -1,24 +1,29 @@
 # coding: utf-8
+import hashlib
+import tempfile
+
 from django.conf import settings
-from django.core.files.base import ContentFile
-from django.http import Http404
+from django.core.files import File
+from django.http import FileResponse, Http404, HttpResponse
 from django.utils import timezone
 from rest_framework import renderers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework_extensions.mixins import NestedViewSetMixin
-from shortuuid import ShortUUID
 
 from kobo.apps.audit_log.base_views import AuditLoggedModelViewSet
 from kobo.apps.audit_log.models import AuditType
-from kpi.constants import SUBMISSION_FORMAT_TYPE_XML
-from kpi.models import Asset, AssetFile, PairedData
+from kpi.models import Asset, AssetFile, PairedData, PairedDataFragment
 from kpi.permissions import AssetEditorPermission, XMLExternalDataPermission
 from kpi.renderers import SubmissionXMLRenderer
 from kpi.serializers.v2.paired_data import PairedDataSerializer
-from kpi.utils.hash import calculate_hash
+from kpi.utils.http import (
+    add_conditional_headers,
+    get_etag,
+    get_not_modified_response,
+)
 from kpi.utils.viewset_mixins import AssetNestedObjectViewsetMixin
-from kpi.utils.xml import add_xml_declaration, strip_nodes
+from kpi.utils.xml import add_xml_declaration
 
 
 class PairedDataViewset(
@@ -214,6 +219,9 @@ class PairedDataViewset(
                 pass
             else:
                 asset_file.delete()
+            PairedDataFragment.objects.filter(
+                paired_data_uid=paired_data_uid
+            ).delete()
 
             raise Http404
 
@@ -250,65 +258,73 @@ class PairedDataViewset(
                     timedelta.total_seconds() > settings.PAIRED_DATA_EXPIRATION
                 )
 
-        # ToDo evaluate adding headers for caching and a HTTP 304 status code
         if not has_expired:
-            return Response(asset_file.content.file.read().decode())
+            return self._get_file_response(request, asset_file)
 
-        # If the content of `asset_file' has expired, let's regenerate the XML
+        # If the content of `asset_file' has expired, let's refresh the stripped
+        # fragments of submissions added, edited or deleted since last time.
         submissions = source_asset.deployment.get_submissions(
-            self.asset.owner,
-            format_type=SUBMISSION_FORMAT_TYPE_XML
+            self.asset.owner, fields=['_id'], skip_count=True
         )
-        parsed_submissions = []
-        allowed_fields = paired_data.allowed_fields
-        random_uuid = ShortUUID().random(24)
-
-        for submission in submissions:
-            # Use `rename_root_node_to='data'` to rename the root node of each
-            # submission to `data` so that form authors do not have to rewrite
-            # their `xml-external` formulas any time the asset UID changes,
-            # e.g. when cloning a form or creating a project from a template.
-            # Set `use_xpath=True` because `paired_data.fields` uses full group
-            # hierarchies, not just question names.
-            parsed_submissions.append(
-                strip_nodes(
-                    submission,
-                    allowed_fields,
-                    use_xpath=True,
-                    rename_root_node_to='data',
-                    bulk_action_cache_key=random_uuid,
-                )
-            )
-
-        filename = paired_data.filename
-        parsed_submissions_to_str = ''.join(parsed_submissions)
-        root_tag_name = SubmissionXMLRenderer.root_tag_name
-        xml_ = add_xml_declaration(
-            f'<{root_tag_name}>'
-            f'{parsed_submissions_to_str}'
-            f'</{root_tag_name}>'
+        fragment_count = PairedDataFragment.refresh(
+            paired_data,
+            asset_file,
+            (submission['_id'] for submission in submissions),
         )
+        root_tag_name = SubmissionXMLRenderer.root_tag_name
 
-        if not parsed_submissions:
+        if not fragment_count:
             # We do not want to cache an empty file
-            return Response(xml_)
+            return Response(
+                add_xml_declaration(f'<{root_tag_name}></{root_tag_name}>')
+            )
 
         # We need to delete the current file (if it exists) when filename
         # has changed. Otherwise, it would leave an orphan file on storage
+        filename = paired_data.filename
         if asset_file.pk and asset_file.content.name != filename:
             asset_file.content.delete()
 
-        asset_file.content = ContentFile(xml_.encode(), name=filename)
-
-        # `xml_` is already there in memory, let's use its content to get its
-        # hash and store it within `asset_file` metadata
-        asset_file.set_md5_hash(calculate_hash(xml_, prefix=True))
+        # Stream fragments to a temporary file, then to storage, to avoid
+        # holding the whole XML in memory
+        md5 = hashlib.md5()
+        with tempfile.TemporaryFile() as xml_file:
+            for chunk in PairedDataFragment.iter_xml(
+                paired_data.paired_data_uid, root_tag_name
+            ):
+                md5.update(chunk)
+                xml_file.write(chunk)
+            xml_file.seek(0)
+            asset_file.content.save(filename, File(xml_file), save=False)
+
+        asset_file.set_md5_hash(f'md5:{md5.hexdigest()}')
         asset_file.save()
         if old_hash != asset_file.md5_hash:
             # resync paired data to the deployment backend
             self.asset.deployment.sync_media_files(AssetFile.PAIRED_DATA)
 
-        return Response(xml_)
+        return self._get_file_response(request, asset_file)
+
+    @staticmethod
+    def _get_file_response(request, asset_file: AssetFile) -> HttpResponse:
+        """
+        Stream the content of `asset_file`, or return a "304 Not Modified"
+        response if the client already has it.
+        """
+        etag = get_etag(asset_file.md5_hash)
+        if not_modified_response := get_not_modified_response(
+            request, etag, asset_file.date_modified
+        ):
+            return not_modified_response
+
+        content_type = (
+            f'{SubmissionXMLRenderer.media_type}; '
+            f'charset={SubmissionXMLRenderer.charset}'
+        )
+        response = FileResponse(
+            asset_file.content.open('rb'), content_type=content_type
+        )
+        return add_conditional_headers(response, etag, asset_file.date_modified)
 
     def get_object_override(self):
         obj = self.get_queryset(as_list=False).get(